@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of `Surge.backtest` over a range of end dates.
+
+The counties of one state of a synthetic file (1000 counties) are fitted for
+each of the last 120 end dates. The reference refits every end date from
+scratch (one `backtest` call per end date, as setting `end_date` and calling
+`multi_fit_data` does). `Surge.backtest` warm starts each fit from the fit
+of an earlier end date and fits 7 end dates per batch.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from asserts import assert_true
+
+from covid_surge import Surge
+
+from synthetic_data import write_us_csv
+
+N_END_DATES = 120
+
+def summary(label, wall_time, backtest):
+    """Print out the wall time, iterations and failures of a backtest."""
+    k_mtrx = backtest['k']
+    fitted = k_mtrx > 0
+    print('%-12s %7.2f s  fits %6i  iterations %5.2f  failures %5.2f %%  '
+          'median |forecast error| %6.2f %%'%
+          (label, wall_time, np.sum(fitted), np.mean(k_mtrx[fitted] - 1),
+           100*np.mean(np.isnan(backtest['tcc'][fitted])),
+           100*np.nanmedian(np.abs(backtest['forecast_error'] /
+                                   backtest['forecast']))))
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=1000)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+        end_dates = c_surge.dates[-N_END_DATES:]
+
+        start = time.perf_counter()
+        rows = [c_surge.backtest(start=end_date, stop=end_date)
+                for end_date in end_dates]
+        t_scratch = time.perf_counter() - start
+        scratch = {key: np.concatenate([row[key] for row in rows])
+                   for key in ('k', 'tcc', 'dtc', 'rr2', 'forecast',
+                               'forecast_error')}
+
+        start = time.perf_counter()
+        warm = c_surge.backtest(start=end_dates[0])
+        t_warm = time.perf_counter() - start
+
+        summary('scratch', t_scratch, scratch)
+        summary('warm start', t_warm, warm)
+
+        both = ~np.isnan(scratch['rr2']) & ~np.isnan(warm['rr2'])
+        rr2_diff = warm['rr2'][both] - scratch['rr2'][both]
+        tcc_diff = np.abs(warm['tcc'][both] - scratch['tcc'][both])
+        print('both converge %i: R2 lower with warm starts by more than 1e-3 '
+              'in %i; median |tcc difference| %.1e d'%
+              (np.sum(both), np.sum(rr2_diff < -1e-3), np.median(tcc_diff)))
+
+        assert_true(np.mean(warm['k'][warm['k'] > 0]) <
+                    np.mean(scratch['k'][scratch['k'] > 0]))
+        assert_true(np.sum(rr2_diff < -1e-3) <= 1e-3*np.sum(both))
+        assert_true(np.median(tcc_diff) < 1e-2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the residual bootstrap of a sigmoid fit.
+
+The replicates of a synthetic series (scaled as in `Surge.multi_fit_data`)
+are fitted with one `newton_nlls_batch_solve` call by
+`bootstrap_fit_sigmoid` and with one `newton_nlls_solve` call per replicate.
+"""
+
+import time
+
+import numpy as np
+from asserts import assert_equal, assert_true
+
+from covid_surge.src.surge import (bootstrap_fit_sigmoid, newton_nlls_solve,
+                                   sigmoid_residual_jacobian)
+
+from synthetic_data import sigmoid_cases
+
+N_REPLICATES = 1000
+K_MAX = 25
+REL_TOL = 1e-4
+
+def main():
+    """Main function executed at the bottom."""
+
+    rng = np.random.default_rng(5)
+
+    cases = sigmoid_cases(rng, 20000, 250, noise=0.02)
+    cases = cases[cases > 0.005*cases[-1]].astype(np.float64)
+    cases /= cases.max()
+    times = np.array(range(cases.size), dtype=np.float64)
+
+    (param_vec, _, _) = newton_nlls_solve(
+        times, cases, None, None,
+        np.array([cases[-1], cases[-1]/cases[0] - 1, -0.15]), K_MAX,
+        REL_TOL, verbose=False, kernel=sigmoid_residual_jacobian)
+
+    start = time.perf_counter()
+    param_mtrx = bootstrap_fit_sigmoid(cases, param_vec, N_REPLICATES, K_MAX,
+                                       REL_TOL)
+    t_batch = time.perf_counter() - start
+
+    # same replicates, one solve each
+    fit = param_vec[0] / (1 + param_vec[1]*np.exp(param_vec[2]*times))
+    y_mtrx = fit + np.random.default_rng(0).choice(
+        cases - fit, (N_REPLICATES, cases.size))
+
+    start = time.perf_counter()
+    loop_param_mtrx = np.array([
+        newton_nlls_solve(times, y_vec, None, None, param_vec, K_MAX,
+                          REL_TOL, verbose=False,
+                          kernel=sigmoid_residual_jacobian)[0]
+        for y_vec in y_mtrx])
+    t_loop = time.perf_counter() - start
+
+    assert_equal(param_mtrx.shape, loop_param_mtrx.shape)
+    assert_true(np.allclose(param_mtrx, loop_param_mtrx, rtol=1e-8))
+
+    surge_periods = -2*np.log(2+np.sqrt(3))/param_mtrx[:, 2]
+    print('%i replicates of %i days: surge period 95%% CI [%.2f, %.2f] day'%
+          ((N_REPLICATES, cases.size) +
+           tuple(np.percentile(surge_periods, [2.5, 97.5]))))
+    print('one by one %8.3f s  batched %8.3f s  speedup %6.1fx'%
+          (t_loop, t_batch, t_loop/t_batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of `critical_times` over the fits of many communities.
+
+The counties of one state of a synthetic file (3000 counties) are fitted
+once. Their critical times and delta method standard errors are computed by
+`Surge.report_critical_times` and `Surge.report_critical_times_se` one
+community at a time and by one `critical_times` call over the parameter
+matrix; with the self-checks of the `debug` flag on and off.
+"""
+
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+from asserts import assert_true
+
+from covid_surge import Surge
+from covid_surge.src.surge import critical_times
+
+from synthetic_data import write_us_csv
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=3000)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+        fit_data = c_surge.multi_fit_data()
+
+    param_covs = [extras['param_cov'] for extras in fit_data.extras]
+
+    for debug in (False, True):
+
+        c_surge.debug = debug
+
+        start = time.perf_counter()
+        loop = np.array([c_surge.report_critical_times(param_vec) +
+                         c_surge.report_critical_times_se(param_vec,
+                                                          param_cov)
+                         for (param_vec, param_cov) in
+                         zip(fit_data.param_mtrx, param_covs)])
+        t_loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        times = critical_times(fit_data.param_mtrx, c_surge.model,
+                               fit_data.dates[fit_data.offsets],
+                               gradients=True, debug=debug)
+        tcc_se = [math.sqrt(grad @ param_cov @ grad) for (grad, param_cov) in
+                  zip(times['tcc_grad'], param_covs)]
+        t_vec = time.perf_counter() - start
+
+        assert_true(np.array_equal(times['tcc'], loop[:, 0]))
+        assert_true(np.array_equal(times['dtc'], loop[:, 1]))
+        assert_true(np.array_equal(tcc_se, loop[:, 2]))
+
+        print('%i fits debug = %-5r: one by one %8.4f s  one pass %8.4f s  '
+              'speedup %6.1fx'%(len(fit_data), debug, t_loop, t_vec,
+                                t_loop/t_vec))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of daily refits of `Surge.multi_fit_data` with a `FitCache`.
+
+The counties of one state of a synthetic file (3000 counties) are refitted
+as the end date moves by one day, as with daily data updates: from scratch
+and warm started from the cached fits of the day before. The data of the
+last day are then refitted unchanged, with all fits from the cache.
+Iterations are read from the cache entries.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from asserts import assert_equal, assert_true
+
+from covid_surge import Surge
+from covid_surge.src.surge import FitCache
+
+from synthetic_data import write_us_csv
+
+N_DAYS = 5
+
+def fit(surge, fit_cache):
+    """Wall time, results and mean iterations of `multi_fit_data`."""
+    start = time.perf_counter()
+    fit_data = surge.multi_fit_data(fit_cache=fit_cache)
+    wall_time = time.perf_counter() - start
+    n_iter = np.mean([entry['k'] - 1 for entry in fit_cache.entries.values()])
+    return (wall_time, fit_data, n_iter)
+
+def params(fit_data):
+    """Parameter vectors of `multi_fit_data` results by name."""
+    return {data[0]: data[3] for (key, data) in fit_data}
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=3000)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+        last_date = c_surge.dates[-1]
+
+        fit_cache = FitCache(os.path.join(tmp_dir, 'fit_cache.json'))
+        c_surge.end_date = last_date - np.timedelta64(N_DAYS, 'D')
+        c_surge.multi_fit_data(fit_cache=fit_cache)
+
+        for day in range(N_DAYS-1, -1, -1):
+            c_surge.end_date = last_date - np.timedelta64(day, 'D')
+
+            scratch_cache = FitCache(os.path.join(tmp_dir, 'scratch.json'))
+            (t_cold, cold, n_cold) = fit(c_surge, scratch_cache)
+            os.remove(scratch_cache.path)
+
+            fit_cache.stats = {'hit': 0, 'warm': 0, 'miss': 0}
+            (t_warm, warm, n_warm) = fit(c_surge, fit_cache)
+            assert_true(fit_cache.stats['warm'] > 0.9*len(fit_cache.entries))
+
+            (cold_params, warm_params) = (params(cold), params(warm))
+            common = sorted(set(cold_params) & set(warm_params))
+            rel_diff = np.max([np.abs(warm_params[n]/cold_params[n] - 1)
+                               for n in common])
+            assert_true(len(common) > 0.99*len(cold_params))
+            assert_true(rel_diff < 1e-3)
+
+            print('%s  scratch %6.3f s %5.2f iterations  warm start %6.3f s '
+                  '%5.2f iterations  max. rel. parameter difference %.1e'%
+                  (c_surge.end_date, t_cold, n_cold, t_warm, n_warm,
+                   rel_diff))
+
+        fit_cache.stats = {'hit': 0, 'warm': 0, 'miss': 0}
+        (t_hit, hit, _) = fit(c_surge, fit_cache)
+        assert_equal(fit_cache.stats['miss'], 0)
+        assert_equal([data[0] for (key, data) in hit],
+                     [data[0] for (key, data) in warm])
+        for ((key, data), (warm_key, warm_data)) in zip(hit, warm):
+            assert_true(np.array_equal(data[3], warm_data[3]))
+
+        print('%s  unchanged data, all fits cached %6.3f s'%
+              (c_surge.end_date, t_hit))
+
+
+if __name__ == '__main__':
+    main()
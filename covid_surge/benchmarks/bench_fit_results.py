@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the `FitResults` of `Surge.multi_fit_data`.
+
+The counties of one state of a synthetic file (3000 counties) are fitted
+once. The former list of `(surge period, [name, dates, cases, ...])` tuples,
+rebuilt from the results, is searched as the plotting functions did: a scan
+of the list per name and `list.index` per entry. `FitResults` finds a name
+through a dictionary and sorts and filters its columns with index arrays.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from asserts import assert_equal, assert_true
+
+from covid_surge import Surge
+
+from synthetic_data import write_us_csv
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=3000)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+        fit_data = c_surge.multi_fit_data()
+
+    fit_list = list(fit_data)
+    names = [data[0] for (key, data) in fit_list]
+    copied = sum(data[1].nbytes + data[2].nbytes for (key, data) in fit_list)
+    print('%i fits; the list copies %.1f MB of dates and cases'%
+          (len(fit_data), copied/1e6))
+
+    # the former lookups
+    start = time.perf_counter()
+    list_ids = [[i for (i, (key, data)) in enumerate(fit_list)
+                 if data[0] == name][0] for name in names]
+    list_ids += [fit_list.index(entry) for entry in fit_list[:300]]
+    t_list = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ids = [fit_data.row(name) for name in names]
+    ids += [fit_data.row(data[0]) for (key, data) in fit_list[:300]]
+    t_dict = time.perf_counter() - start
+
+    assert_equal(ids, list_ids)
+    print('lookups: list scans %8.4f s  dictionary %8.4f s  speedup %7.1fx'%
+          (t_list, t_dict, t_list/t_dict))
+
+    # sort by tcc; keep surge periods under the median
+    median = np.median(fit_data.surge_period)
+
+    start = time.perf_counter()
+    list_fast = sorted([entry for entry in fit_list if entry[0] < median],
+                       key=lambda entry: entry[1][4])
+    t_list = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = fit_data[fit_data.surge_period < median].sort('tcc')
+    t_columns = time.perf_counter() - start
+
+    assert_equal(list(fast.names), [data[0] for (key, data) in list_fast])
+    assert_true(len(fast) > 0)
+    print('filter and sort: list %8.4f s  columns %8.4f s'%
+          (t_list, t_columns))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the global data loader: row loop versus groupby aggregation.
+
+The row loop and the per-country gradient are the ones used by
+`get_covid_global_data` up to version 0.0.41; they are reproduced here for
+reference. Both variants read the same synthetic file of about 330 rows.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from asserts import assert_equal, assert_true
+
+from covid_surge.src.surge import DATASETS, get_covid_global_data
+
+from synthetic_data import write_global_csv
+
+def row_loop_global_data(path, distribution=True):
+    """Aggregation of the global data with a loop over rows (reference)."""
+
+    dtf = pd.read_csv(path)
+    dtf = dtf.drop(['Lat', 'Long'], axis=1)
+    dtf = dtf.rename(columns={'Province/State':'state/province',
+                              'Country/Region':'country/region'})
+
+    country_names = sorted(set(dtf['country/region']))
+
+    dates = np.array(list(dtf.columns[2:]))
+
+    cases = np.zeros((len(dtf.columns[2:]), len(country_names)))
+    for (i, icountry) in enumerate(dtf['country/region']):
+        country_id = country_names.index(icountry)
+        cases[:, country_id] += np.array(list(dtf.loc[i, dtf.columns[2:]]))
+
+    if distribution:
+        for j in range(cases.shape[1]):
+            cases[:, j] = np.round(np.gradient(cases[:, j]), 0)
+
+    return (country_names, dates, cases)
+
+def groupby_global_data(path, distribution=True):
+    """Current loader; the shared dataset is dropped to time the parsing."""
+    DATASETS.clear()
+    return get_covid_global_data(distribution=distribution, data_source=path)
+
+def best_time(func, n_repeat=3):
+    """Best wall time of `n_repeat` calls and the last result."""
+    times = list()
+    for _ in range(n_repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return (min(times), result)
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_global_csv(os.path.join(tmp_dir, 'deaths_global.csv'))
+
+        for distribution in (False, True):
+
+            (t_loop, ref) = best_time(
+                lambda: row_loop_global_data(path, distribution))
+            (t_new, new) = best_time(
+                lambda: groupby_global_data(path, distribution))
+
+            assert_equal(ref[0], new[0])
+            assert_true(np.array_equal(ref[1], new[1]))
+            assert_true(np.array_equal(ref[2], new[2]))
+
+            print('distribution = %-5r row loop %8.3f s  groupby %8.3f s  '
+                  'speedup %6.1fx'%(distribution, t_loop, t_new,
+                                    t_loop/t_new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of `Surge.compare_models` of all growth models.
+
+The counties of one state of a synthetic file (1000 counties) are fitted with
+each model of `GROWTH_MODELS`: one batched solve per model by
+`Surge.compare_models`, and one `fit_sigmoids` solve per county and model
+(`batch=False`) as the reference.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from asserts import assert_equal, assert_true
+
+from covid_surge import Surge
+from covid_surge.src.surge import GROWTH_MODELS, fit_sigmoids
+
+from synthetic_data import write_us_csv
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=1000)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+
+        start = time.perf_counter()
+        ranking = c_surge.compare_models()
+        t_batch = time.perf_counter() - start
+
+        names = sorted(ranking)
+        cases_list = list()
+        scalings = list()
+        for name in names:
+            cases = c_surge.cases[:, c_surge.names.index(name)]
+            cases = cases[cases > c_surge.trim_rel_small_n_cases/100*cases[-1]]
+            scalings.append(cases.max())
+            cases_list.append(np.array(cases, dtype=np.float64)/cases.max())
+
+        t_loop = 0.0
+        for (model, growth_model) in GROWTH_MODELS.items():
+            # rejected trial steps may leave the domain of the model
+            start = time.perf_counter()
+            with np.errstate(over='ignore', invalid='ignore'):
+                fits = fit_sigmoids(
+                    cases_list,
+                    [growth_model.initial_guess(cases)
+                     for cases in cases_list],
+                    25, 0.01/100, batch=False, model=model)
+            t_loop += time.perf_counter() - start
+
+            batch_params = {name: param_vec
+                            for name in names
+                            for (_, m, param_vec, _) in ranking[name]
+                            if m == model}
+            n_agree = 0
+            for (name, scaling, (param_vec, rr2, k)) in \
+                    zip(names, scalings, fits):
+                if name in batch_params:
+                    param_vec = np.array(param_vec)
+                    param_vec[0] *= scaling
+                    n_agree += np.allclose(param_vec, batch_params[name],
+                                           rtol=1e-3)
+            assert_true(n_agree > 0.99*len(batch_params))
+            print('%-9s converged %5i of %5i' %
+                  (model, len(batch_params), len(names)))
+
+        best = [ranking[name][0][1] for name in names]
+        for model in GROWTH_MODELS:
+            print('best by AIC %-9s %5i' % (model, best.count(model)))
+        assert_equal(len(best), len(names))
+
+        print('one by one %8.3f s  batched %8.3f s  speedup %6.1fx'%
+              (t_loop, t_batch, t_loop/t_batch))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the Levenberg-Marquardt solver on hard communities.
+
+The series of synthetic counties are cut at a random day, often before or
+close to the inflection point, as for an early `end_date`. The scaled data
+(as in `Surge.multi_fit_data`) are fitted with `newton_nlls_batch_solve` and
+with `levenberg_marquardt_batch_solve`. A fit fails if it does not converge
+or if its parameters are not those of a growing sigmoid (`Surge` asserts
+a_0 > 0, a_1 > 0, a_2 < 0). Function evaluations are counted per community:
+residuals and Jacobians separately.
+"""
+
+import time
+
+import numpy as np
+from asserts import assert_true
+
+from covid_surge.src.surge import (levenberg_marquardt_batch_solve,
+                                   newton_nlls_batch_solve,
+                                   sigmoid_residual_jacobian)
+
+from synthetic_data import sigmoid_cases
+
+K_MAX = 25
+
+def counting_kernel(counts):
+    """Fused sigmoid kernel counting residual and Jacobian evaluations."""
+    def kernel(x_vec, y_vec, param_vec, r_vec, j_mtrx=None, work=None):
+        counts['r'] += y_vec.shape[0]
+        if j_mtrx is not None:
+            counts['j'] += y_vec.shape[0]
+        return sigmoid_residual_jacobian(x_vec, y_vec, param_vec, r_vec,
+                                         j_mtrx, work)
+    return kernel
+
+def fit(solver, times, cases_mtrx, param_mtrx_0, mask):
+    """Wall time, evaluation counts and results of a batch solver."""
+    counts = {'r': 0, 'j': 0}
+    start = time.perf_counter()
+    (param_mtrx, rr2_vec, k_vec) = solver(times, cases_mtrx, None, None,
+                                          param_mtrx_0, mask, K_MAX, 1e-4,
+                                          kernel=counting_kernel(counts))
+    wall_time = time.perf_counter() - start
+    success = (k_vec <= K_MAX) & (param_mtrx[:, 0] > 0) & \
+              (param_mtrx[:, 1] > 0) & (param_mtrx[:, 2] < 0)
+    return (wall_time, counts, param_mtrx, rr2_vec, k_vec, success)
+
+def main():
+    """Main function executed at the bottom."""
+
+    rng = np.random.default_rng(7)
+
+    # scaled data as in `Surge.multi_fit_data`
+    cases_list = list()
+    while len(cases_list) < 2000:
+        cases = sigmoid_cases(rng, rng.uniform(50, 5000), 300,
+                              noise=rng.uniform(0.005, 0.05))
+        cases = cases[:rng.integers(90, 300)]
+        if cases[-1] < 20:
+            continue
+        cases = cases[cases > 0.005*cases[-1]].astype(np.float64)
+        cases_list.append(cases/cases.max())
+
+    sizes = np.array([cases.size for cases in cases_list])
+    times = np.array(range(sizes.max()), dtype=np.float64)
+    mask = times < sizes[:, np.newaxis]
+    cases_mtrx = np.zeros(mask.shape, dtype=np.float64)
+    cases_mtrx[mask] = np.concatenate(cases_list)
+    param_mtrx_0 = np.array([[c[-1], c[-1]/c[0] - 1, -0.15]
+                             for c in cases_list])
+
+    newton = fit(newton_nlls_batch_solve, times, cases_mtrx, param_mtrx_0,
+                 mask)
+    lm = fit(levenberg_marquardt_batch_solve, times, cases_mtrx,
+             param_mtrx_0, mask)
+
+    n_rows = len(cases_list)
+    for (label, (wall_time, counts, _, _, k_vec, success)) in \
+            (('newton', newton), ('lm', lm)):
+        print('%-7s success %4i of %i  iterations %5.1f  residuals %5.1f  '
+              'Jacobians %5.1f  per community;  %6.3f s'%
+              (label, np.sum(success), n_rows, np.mean(k_vec - 1),
+               counts['r']/n_rows, counts['j']/n_rows, wall_time))
+
+    # communities failing with Newton's method
+    hard = ~newton[5]
+    print('Newton failures %i: %i converge with LM in %5.1f iterations '
+          '(median)'%(np.sum(hard), np.sum(lm[5][hard]),
+                      np.median(lm[4][hard & lm[5]] - 1)))
+    print('LM failures %i: %i converge with Newton, with a lower R2 in %i'%
+          (np.sum(~lm[5]), np.sum(newton[5][~lm[5]]),
+           np.sum(newton[5][~lm[5]] & (newton[3] < lm[3])[~lm[5]])))
+
+    # same fits where both converge, except for Newton's early stops
+    both = newton[5] & lm[5]
+    rr2_diff = lm[3][both] - newton[3][both]
+    print('both converge %i: R2 higher with LM by more than 1e-3 in %i'%
+          (np.sum(both), np.sum(rr2_diff > 1e-3)))
+    assert_true(np.median(np.abs(rr2_diff)) < 1e-8)
+    assert_true(np.min(rr2_diff) > -1e-6)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of `Surge.multi_fit_data`: batched versus one-by-one fitting.
+
+The counties of one state of a synthetic file (3000 counties) are fitted
+with `newton_nlls_batch_solve` (batch=True) and with one `newton_nlls_solve`
+call per county (batch=False).
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from asserts import assert_equal, assert_true
+
+from covid_surge import Surge
+
+from synthetic_data import write_us_csv
+
+def fit(surge, batch):
+    """Wall time and results of `multi_fit_data`."""
+    start = time.perf_counter()
+    fit_data = surge.multi_fit_data(batch=batch)
+    return (time.perf_counter() - start, fit_data)
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=3000)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+
+        (t_loop, ref) = fit(c_surge, batch=False)
+        (t_batch, new) = fit(c_surge, batch=True)
+
+        assert_equal([data[0] for (key, data) in ref],
+                     [data[0] for (key, data) in new])
+
+        param_ref = np.array([data[3] for (key, data) in ref])
+        param_new = np.array([data[3] for (key, data) in new])
+        rel_diff = np.max(np.abs(param_new - param_ref)/np.abs(param_ref))
+        assert_true(rel_diff < 1e-6)
+
+        print('fitted %i of %i counties; max. rel. parameter difference '
+              '%.1e'%(len(new), len(c_surge.names), rel_diff))
+        print('one by one %8.3f s  batched %8.3f s  speedup %6.1fx'%
+              (t_loop, t_batch, t_loop/t_batch))
+
+
+if __name__ == '__main__':
+    main()
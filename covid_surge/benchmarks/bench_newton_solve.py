@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the per-fit latency of `newton_nlls_solve`.
+
+The reference is the iteration of versions up to 0.0.41 (its non-verbose
+path is reproduced here): J^T J and J^T r are formed several times per
+iteration and the rank of J^T J is computed with an SVD. It is compared with
+`mode='svd'`, with the default `mode='cholesky'` and with the fused kernel
+`sigmoid_residual_jacobian` used by `Surge`.
+"""
+
+import math
+import time
+
+import numpy as np
+import numpy.linalg
+from asserts import assert_true
+
+from covid_surge.src.surge import (GROWTH_MODELS, grad_p_sigmoid_func,
+                                   newton_nlls_solve,
+                                   sigmoid_residual_jacobian)
+
+from synthetic_data import sigmoid_cases
+
+def reference_newton_nlls_solve(x_vec, y_vec, fit_func, grad_p_fit_func,
+                                param_vec_0, k_max=10, rel_tol=1.0e-3):
+    """Newton's method of version 0.0.41 without print out (reference)."""
+
+    delta_vec_k = np.ones(param_vec_0.size, dtype=np.float64)*1e10
+    r_vec_k = np.ones(x_vec.size, dtype=np.float64)*1e10
+    j_mtrx_k = np.ones((x_vec.size, param_vec_0.size), dtype=np.float64)*1e10
+    param_vec = np.copy(param_vec_0)
+
+    k = 1
+    while (np.linalg.norm(delta_vec_k/param_vec) > rel_tol or
+           np.linalg.norm(j_mtrx_k.transpose()@r_vec_k) > 1e-3) and \
+          k <= k_max:
+
+        r_vec_k = y_vec - fit_func(x_vec, param_vec)
+        grad_p_f = grad_p_fit_func(x_vec, param_vec)
+
+        j_mtrx_k = np.zeros((x_vec.size, param_vec.size), dtype=np.float64)
+        for (i, grad_p_f_i) in enumerate(grad_p_f):
+            j_mtrx_k[:, i] = - grad_p_f_i
+
+        delta_vec_k_old = np.copy(delta_vec_k)
+
+        rank = numpy.linalg.matrix_rank(j_mtrx_k.transpose()@j_mtrx_k)
+
+        if rank == param_vec.size:
+            delta_vec_k = numpy.linalg.solve(j_mtrx_k.transpose()@j_mtrx_k,
+                                             -j_mtrx_k.transpose()@r_vec_k)
+        else:
+            a_mtrx_k = j_mtrx_k.transpose()@j_mtrx_k
+            b_vec_k = -j_mtrx_k.transpose()@r_vec_k
+            delta_vec_k = numpy.linalg.solve(a_mtrx_k.transpose()@a_mtrx_k +
+                                             1e-3*np.eye(param_vec.size),
+                                             a_mtrx_k.transpose()@b_vec_k)
+
+        r_vec_k_old = np.copy(r_vec_k)
+        step_size = 1.0
+        r_vec_k = y_vec - fit_func(x_vec, param_vec + delta_vec_k)
+
+        n_steps = 0
+        while (np.linalg.norm(r_vec_k) > np.linalg.norm(r_vec_k_old)) \
+              and n_steps <= 5:
+            step_size *= 0.5
+            r_vec_k = y_vec - fit_func(x_vec, param_vec +
+                                       step_size*delta_vec_k)
+            n_steps += 1
+
+        param_vec += step_size * delta_vec_k
+
+        if np.linalg.norm(delta_vec_k) != 0.0 and \
+           np.linalg.norm(delta_vec_k_old) != 0.0:
+            convergence_factor = math.log(np.linalg.norm(delta_vec_k), 10) / \
+                                 math.log(np.linalg.norm(delta_vec_k_old), 10)
+
+        k = k + 1
+
+    rr2 = 1.0 - np.sum(r_vec_k**2) / np.sum((y_vec-np.mean(y_vec))**2)
+
+    return (param_vec, rr2, k)
+
+def main():
+    """Main function executed at the bottom."""
+
+    rng = np.random.default_rng(3)
+    fit_func = GROWTH_MODELS['logistic'].func
+    grad_p_fit_func = grad_p_sigmoid_func
+
+    # scaled data as in `Surge.multi_fit_data`
+    problems = list()
+    for _ in range(300):
+        cases = sigmoid_cases(rng, rng.uniform(200, 20000), 200)
+        cases = cases[cases > 0.005*cases[-1]].astype(np.float64)
+        cases /= cases.max()
+        times = np.array(range(cases.size), dtype=np.float64)
+        param_vec_0 = np.array([cases[-1], cases[-1]/cases[0] - 1, -0.15])
+        problems.append((times, cases, param_vec_0))
+
+    solvers = {
+        'reference': lambda t, y, p_0: reference_newton_nlls_solve(
+            t, y, fit_func, grad_p_fit_func, p_0, 25, 1e-4),
+        "mode='svd'": lambda t, y, p_0: newton_nlls_solve(
+            t, y, fit_func, grad_p_fit_func, p_0, 25, 1e-4, verbose=False,
+            mode='svd'),
+        "mode='cholesky'": lambda t, y, p_0: newton_nlls_solve(
+            t, y, fit_func, grad_p_fit_func, p_0, 25, 1e-4, verbose=False,
+            mode='cholesky'),
+        'fused kernel': lambda t, y, p_0: newton_nlls_solve(
+            t, y, None, None, p_0, 25, 1e-4, verbose=False,
+            kernel=sigmoid_residual_jacobian)}
+
+    results = dict()
+    for (label, solver) in solvers.items():
+        times = list()
+        for _ in range(3):
+            start = time.perf_counter()
+            fits = [solver(t, y, p_0) for (t, y, p_0) in problems]
+            times.append(time.perf_counter() - start)
+        n_iter = np.mean([k - 1 for (p, rr2, k) in fits])
+        results[label] = np.array([p for (p, rr2, k) in fits])
+        print('%-16s %8.1f us/fit  %5.1f us/iteration'%
+              (label, min(times)/len(problems)*1e6,
+               min(times)/len(problems)/n_iter*1e6))
+
+    for params in results.values():
+        assert_true(np.allclose(params, results['reference'], rtol=1e-10))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of `Surge.multi_fit_data` over a pool of worker processes.
+
+The counties of one state of a synthetic file (3000 counties) are fitted
+serially and with `n_jobs` worker processes, up to the number of cores, one
+community at a time (batch=False) and batched. The results must be
+identical. Each spawned worker imports `covid_surge` (about 1 s), so a pool
+pays off on multi-core machines for fits taking a few seconds or more.
+"""
+
+import os
+import tempfile
+import time
+
+from asserts import assert_equal
+
+from covid_surge import Surge
+
+from synthetic_data import write_us_csv
+
+def fit(surge, batch, n_jobs):
+    """Wall time and results of `multi_fit_data`."""
+    start = time.perf_counter()
+    fit_data = surge.multi_fit_data(batch=batch, n_jobs=n_jobs)
+    return (time.perf_counter() - start,
+            [(data[0], data[3].tobytes(), data[4], data[5])
+             for (key, data) in fit_data])
+
+def main():
+    """Main function executed at the bottom."""
+
+    n_cores = os.cpu_count()
+    jobs = [n_jobs for n_jobs in (2, 4, 8, 16) if n_jobs <= n_cores] or [2]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=3000)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+
+        print('%i cores'%n_cores)
+        for batch in (False, True):
+            (t_serial, ref) = fit(c_surge, batch, 1)
+            print('batch = %-5r serial     %8.3f s'%(batch, t_serial))
+            for n_jobs in jobs:
+                (t_pool, new) = fit(c_surge, batch, n_jobs)
+                assert_equal(new, ref)
+                print('batch = %-5r n_jobs = %2i %8.3f s  speedup %5.2fx'%
+                      (batch, n_jobs, t_pool, t_serial/t_pool))
+
+
+if __name__ == '__main__':
+    main()
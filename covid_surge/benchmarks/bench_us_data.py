@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the US data loader: row loop versus groupby aggregation.
+
+The row loop is the aggregation used by `get_covid_us_data` up to version
+0.0.41; it is reproduced here for reference. Both variants read the same
+synthetic file of about 3300 county rows.
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from asserts import assert_equal, assert_true
+
+from covid_surge.src.surge import DATASETS, get_covid_us_data
+
+from synthetic_data import write_us_csv
+
+def row_loop_us_data(path, sub_locale=None):
+    """Aggregation of the US data with a loop over rows (reference)."""
+
+    dtf = pd.read_csv(path)
+    dtf = dtf.drop(['UID', 'iso2', 'iso3', 'Combined_Key', 'code3', 'FIPS',
+                    'Lat', 'Long_', 'Country_Region'], axis=1)
+    dtf = dtf.rename(columns={'Province_State':'state/province',
+                              'Admin2':'county'})
+
+    state_names = list()
+    for (i, istate) in enumerate(dtf['state/province']):
+        if istate.strip() == 'Wyoming' and dtf.loc[i, 'county'] == 'Weston':
+            break
+        state_names.append(istate)
+    state_names = sorted(set(state_names))
+
+    dates = np.array(list(dtf.columns[3:]))
+
+    if sub_locale is None:
+        population = [0]*len(state_names)
+        cases = np.zeros((len(dtf.columns[3:]), len(state_names)))
+        for (i, istate) in enumerate(dtf['state/province']):
+            if istate.strip() == 'Wyoming' and \
+               (dtf.loc[i, 'county']).strip() == 'Weston':
+                break
+            state_id = state_names.index(istate)
+            population[state_id] += int(dtf.loc[i, 'Population'])
+            cases[:, state_id] += np.array(list(dtf.loc[i, dtf.columns[3:]]))
+        return (state_names, population, dates, cases)
+
+    county_names = list()
+    for (i, istate) in enumerate(dtf['state/province']):
+        if istate.strip() == 'Wyoming' and dtf.loc[i, 'county'] == 'Weston':
+            break
+        if istate.strip() == sub_locale:
+            county_names.append(dtf.loc[i, 'county'])
+    county_names = sorted(set(county_names))
+
+    population = [0]*len(county_names)
+    cases = np.zeros((len(dtf.columns[3:]), len(county_names)))
+    for (i, istate) in enumerate(dtf['state/province']):
+        if istate.strip() == 'Wyoming' and dtf.loc[i, 'county'] == 'Weston':
+            break
+        if istate.strip() == sub_locale:
+            county_id = county_names.index(dtf.loc[i, 'county'])
+            population[county_id] += int(dtf.loc[i, 'Population'])
+            cases[:, county_id] = np.array(list(dtf.loc[i, dtf.columns[3:]]))
+    return (county_names, population, dates, cases)
+
+def groupby_us_data(path, sub_locale=None):
+    """Current loader; the shared dataset is dropped to time the parsing."""
+    DATASETS.clear()
+    return get_covid_us_data(sub_locale, data_source=path)
+
+def best_time(func, n_repeat=3):
+    """Best wall time of `n_repeat` calls and the last result."""
+    times = list()
+    for _ in range(n_repeat):
+        start = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - start)
+    return (min(times), result)
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'))
+
+        for sub_locale in (None, 'State 07'):
+
+            (t_loop, ref) = best_time(lambda: row_loop_us_data(path,
+                                                               sub_locale))
+            (t_new, new) = best_time(lambda: groupby_us_data(path,
+                                                             sub_locale))
+
+            assert_equal(ref[0], new[0])
+            assert_equal(ref[1], new[1])
+            assert_true(np.array_equal(ref[3], new[3]))
+
+            print('sub_locale = %-10r row loop %8.3f s  groupby %8.3f s  '
+                  'speedup %6.1fx'%(sub_locale, t_loop, t_new, t_loop/t_new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the variable projection solver against Newton's method.
+
+Synthetic counties, complete (past the inflection point) or cut at a random
+day, are scaled as in `Surge.multi_fit_data` and fitted with
+`newton_nlls_batch_solve` and `varpro_nlls_batch_solve` from several initial
+guesses of `a_2` (`Surge` uses -0.15). A fit fails if it does not converge
+or if its parameters are not those of a growing sigmoid.
+"""
+
+import time
+
+import numpy as np
+import numpy.linalg
+from asserts import assert_true
+
+from covid_surge.src.surge import (newton_nlls_batch_solve,
+                                   sigmoid_residual_jacobian,
+                                   varpro_nlls_batch_solve)
+
+from synthetic_data import sigmoid_cases
+
+K_MAX = 25
+
+def problems(rng, n_problems, cut):
+    """Padded scaled data, mask and initial guesses with `a_2 = -0.15`."""
+    cases_list = list()
+    while len(cases_list) < n_problems:
+        cases = sigmoid_cases(rng, rng.uniform(50, 5000), 300,
+                              noise=rng.uniform(0.005, 0.05))
+        if cut:
+            cases = cases[:rng.integers(90, 300)]
+        if cases[-1] < 20:
+            continue
+        cases = cases[cases > 0.005*cases[-1]].astype(np.float64)
+        cases_list.append(cases/cases.max())
+
+    sizes = np.array([cases.size for cases in cases_list])
+    times = np.array(range(sizes.max()), dtype=np.float64)
+    mask = times < sizes[:, np.newaxis]
+    cases_mtrx = np.zeros(mask.shape, dtype=np.float64)
+    cases_mtrx[mask] = np.concatenate(cases_list)
+    param_mtrx_0 = np.array([[c[-1], c[-1]/c[0] - 1, -0.15]
+                             for c in cases_list])
+
+    return (times, cases_mtrx, mask, param_mtrx_0)
+
+def main():
+    """Main function executed at the bottom."""
+
+    rng = np.random.default_rng(11)
+
+    solvers = {'newton': newton_nlls_batch_solve,
+               'varpro': varpro_nlls_batch_solve}
+
+    for cut in (False, True):
+
+        (times, cases_mtrx, mask, param_mtrx_0) = problems(rng, 1000, cut)
+
+        for a_2 in (-0.05, -0.15, -0.4):
+            param_mtrx_0[:, 2] = a_2
+            fits = dict()
+            for (label, solver) in solvers.items():
+                start = time.perf_counter()
+                try:
+                    (param_mtrx, rr2_vec, k_vec) = solver(
+                        times, cases_mtrx, None, None, param_mtrx_0, mask,
+                        K_MAX, 1e-4, kernel=sigmoid_residual_jacobian)
+                except numpy.linalg.LinAlgError as error:
+                    print('cut %-5r a_2 = %5.2f  %-7s %s'%(cut, a_2, label,
+                                                          error))
+                    continue
+                wall_time = time.perf_counter() - start
+                success = (k_vec <= K_MAX) & (param_mtrx[:, 0] > 0) & \
+                          (param_mtrx[:, 1] > 0) & (param_mtrx[:, 2] < 0)
+                fits[label] = (rr2_vec, success)
+                print('cut %-5r a_2 = %5.2f  %-7s success %4i of %i  '
+                      'iterations %5.1f  %6.3f s'%
+                      (cut, a_2, label, np.sum(success), k_vec.size,
+                       np.mean(k_vec - 1), wall_time))
+
+            # same fits of the complete series from the default guess
+            if not cut and a_2 == -0.15:
+                both = fits['newton'][1] & fits['varpro'][1]
+                assert_true(np.allclose(fits['varpro'][0][both],
+                                        fits['newton'][0][both], atol=1e-8))
+
+
+if __name__ == '__main__':
+    main()
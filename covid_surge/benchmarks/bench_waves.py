@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Benchmark of the wave detection and sum-of-sigmoids fits.
+
+The counties of one state of a synthetic file of three waves (1000 counties)
+are segmented by `detect_waves` on the whole data matrix and one county at a
+time, then fitted by `Surge.multi_fit_waves` (batched by number of waves)
+and by a single logistic per county (`fit_sigmoids`).
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+from asserts import assert_true
+
+from covid_surge import Surge
+from covid_surge.src.surge import GROWTH_MODELS, detect_waves, fit_sigmoids
+
+from synthetic_data import write_us_csv
+
+def main():
+    """Main function executed at the bottom."""
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        path = write_us_csv(os.path.join(tmp_dir, 'deaths_US.csv'),
+                            n_states=2, n_counties=1000, n_days=450,
+                            n_waves=3)
+
+        c_surge = Surge(locale='US', sub_locale='State 00', data_source=path)
+        c_surge.min_n_cases_abs = 0
+        c_surge.deaths_100k_minimum = 0
+        cases = c_surge.cases
+
+        start = time.perf_counter()
+        wave_starts = detect_waves(cases)
+        t_matrix = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loop_wave_starts = np.column_stack(
+            [detect_waves(cases[:, [j]]) for j in range(cases.shape[1])])
+        t_loop = time.perf_counter() - start
+
+        assert_true(np.array_equal(wave_starts, loop_wave_starts))
+        n_waves = 1 + np.sum(wave_starts, axis=0)
+        print('waves per county: %s' %
+              dict(zip(*np.unique(n_waves, return_counts=True))))
+        print('detection  one by one %8.3f s  matrix %8.3f s  speedup %6.1fx'%
+              (t_loop, t_matrix, t_loop/t_matrix))
+
+        start = time.perf_counter()
+        waves = c_surge.multi_fit_waves()
+        t_waves = time.perf_counter() - start
+
+        cases_list = [fit['cases']/fit['cases'].max()
+                      for fit in waves.values()]
+        logistic = GROWTH_MODELS['logistic']
+        start = time.perf_counter()
+        fits = fit_sigmoids(cases_list,
+                            [logistic.initial_guess(c) for c in cases_list],
+                            25, 0.01/100)
+        t_logistic = time.perf_counter() - start
+
+        rr2_waves = np.array([fit['rr2'] for fit in waves.values()])
+        rr2_logistic = np.array([rr2 for (_, rr2, k) in fits])
+        n_failed = sum(1 for (_, _, k) in fits if k > 25)
+        print('sum of sigmoids: %4i of %4i fitted %7.3f s  median R2 %.5f' %
+              (len(waves), cases.shape[1], t_waves, np.median(rr2_waves)))
+        print('one logistic:    %4i failures      %7.3f s  median R2 %.5f' %
+              (n_failed, t_logistic, np.nanmedian(rr2_logistic)))
+
+        assert_true(len(waves) > 0.95*cases.shape[1])
+        assert_true(np.median(rr2_waves) > np.nanmedian(rr2_logistic))
+
+
+if __name__ == '__main__':
+    main()
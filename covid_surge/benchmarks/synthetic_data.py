@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Synthetic data files in the Johns Hopkins format for the benchmarks.
+
+The files mimic the layout of the CSSE time series (one row per county or
+province, one column per date) so the benchmarks run without network access
+and on data of a controlled size.
+"""
+
+import numpy as np
+import pandas as pd
+
+def jhu_dates(n_days):
+    """Dates in the Johns Hopkins column format M/D/YY."""
+    dates = pd.date_range('2020-01-22', periods=n_days, freq='D')
+    return ['%i/%i/%s'%(d.month, d.day, d.strftime('%y')) for d in dates]
+
+def sigmoid_cases(rng, a_0, n_days, noise=0.01):
+    """Cumulative integer cases following a noisy sigmoid."""
+    a_2 = -rng.uniform(0.06, 0.2)
+    tcc = rng.uniform(0.4, 0.75)*n_days
+    times = np.arange(n_days)
+    cases = a_0/(1 + np.exp(-a_2*tcc)*np.exp(a_2*times))
+    cases *= 1 + rng.normal(0, noise, n_days)
+    return np.maximum.accumulate(np.maximum(np.floor(cases), 0)).astype(int)
+
+def waves_cases(rng, a_0, n_days, n_waves, noise=0.01):
+    """Cumulative integer cases following a noisy sigmoid per wave.
+
+    The waves split the days evenly; each adds up to `a_0` cases.
+    """
+    times = np.arange(n_days)
+    cases = np.zeros(n_days)
+    for wave in range(n_waves):
+        a_2 = -rng.uniform(0.06, 0.2)
+        tcc = (wave + rng.uniform(0.4, 0.6))*n_days/n_waves
+        cases += rng.uniform(0.3, 1)*a_0/(1 + np.exp(a_2*(times - tcc)))
+    cases *= 1 + rng.normal(0, noise, n_days)
+    return np.maximum.accumulate(np.maximum(np.floor(cases), 0)).astype(int)
+
+def write_us_csv(path, n_states=50, n_counties=66, n_days=300, seed=0,
+                 n_waves=1):
+    """Write a US deaths file with `n_states*n_counties` county rows.
+
+    The last state is Wyoming and its last county is Weston, the row at
+    which the loader stops reading, as in the Johns Hopkins file. With
+    `n_waves` > 1 the cases follow `waves_cases`.
+    """
+
+    rng = np.random.default_rng(seed)
+
+    columns = ['UID', 'iso2', 'iso3', 'code3', 'FIPS', 'Admin2',
+               'Province_State', 'Country_Region', 'Lat', 'Long_',
+               'Combined_Key', 'Population'] + jhu_dates(n_days)
+
+    states = ['State %02i'%i for i in range(n_states-1)] + ['Wyoming']
+
+    rows = list()
+    uid = 84000000
+    for state in states:
+        counties = ['County %03i'%j for j in range(n_counties-1)]
+        counties += ['Weston'] if state == 'Wyoming' else ['County X']
+        for county in counties:
+            uid += 1
+            population = int(rng.integers(5000, 2000000))
+            a_0 = population*rng.uniform(1e-4, 2e-3)
+            if n_waves == 1:
+                cases = sigmoid_cases(rng, a_0, n_days)
+            else:
+                cases = waves_cases(rng, a_0, n_days, n_waves)
+            rows.append([uid, 'US', 'USA', 840, float(uid%100000), county,
+                         state, 'US', 40.0, -70.0,
+                         county+', '+state+', US', population] + list(cases))
+
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+
+    return path
+
+def write_global_csv(path, n_countries=190, n_days=300, seed=1):
+    """Write a global deaths file; every tenth country has provinces."""
+
+    rng = np.random.default_rng(seed)
+
+    columns = ['Province/State', 'Country/Region', 'Lat', 'Long'] + \
+              jhu_dates(n_days)
+
+    rows = list()
+    for i in range(n_countries):
+        provinces = ['Province %i'%j for j in range(8)] if i%10 == 0 else \
+                    [None]
+        for province in provinces:
+            cases = sigmoid_cases(rng, rng.uniform(50, 50000), n_days)
+            rows.append([province, 'Country %03i'%i, 1.0, 2.0] + list(cases))
+
+    pd.DataFrame(rows, columns=columns).to_csv(path, index=False)
+
+    return path
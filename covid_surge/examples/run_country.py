@@ -6,6 +6,7 @@
 """Example of Surge usage for country data."""
 
 from covid_surge import Surge
+from covid_surge.src.surge import format_dates
 
 
 def main():
@@ -67,11 +68,13 @@ def main():
     total_deaths_predicted = int(
         g_surge.sigmoid_func(n_prediction_days + last_day, param_vec))
 
+    today = format_dates(g_surge.dates[-1])
+
     print('')
     print('Estimated cumulative deaths in %s days from %s = %6i'%\
-            (n_prediction_days, g_surge.dates[-1], total_deaths_predicted))
+            (n_prediction_days, today, total_deaths_predicted))
     print('# of cumulative deaths today, %s               = %6i'%\
-            (g_surge.dates[-1], g_surge.cases[-1, g_surge.names.index(name)]))
+            (today, g_surge.cases[-1, g_surge.names.index(name)]))
     print('')
 
 
@@ -6,6 +6,7 @@
 """Example of Surge usage for US state data."""
 
 from covid_surge import Surge
+from covid_surge.src.surge import format_dates
 
 def main():
     """Main function executed at the bottom."""
@@ -64,11 +65,13 @@ def main():
     total_deaths_predicted = int(us_surge.sigmoid_func(n_prediction_days +
                                                        last_day, param_vec))
 
+    today = format_dates(us_surge.dates[-1])
+
     print('')
     print('Estimated cumulative deaths in %s days from %s = %6i'%\
-            (n_prediction_days, us_surge.dates[-1], total_deaths_predicted))
+            (n_prediction_days, today, total_deaths_predicted))
     print('# of cumulative deaths today, %s               = %6i'%\
-          (us_surge.dates[-1], us_surge.cases[-1, us_surge.names.index(name)]))
+          (today, us_surge.cases[-1, us_surge.names.index(name)]))
     print('')
 
 
@@ -53,7 +53,8 @@ def main():
         print('                          ', state)
         print('**************************************************************')
 
-        c_surge = Surge(locale='US', sub_locale=state)
+        c_surge = Surge(locale='US', sub_locale=state,
+                        dataset=us_surge.dataset) # parsed data reused
 
         print('# of counties: ', len(c_surge.names))
 
@@ -3,7 +3,17 @@
 # This file is part of the COVID-surge application.
 # https://github/dpploy/covid-surge
 
+import concurrent.futures
+import datetime
+import hashlib
+import json
 import math
+import multiprocessing
+import os
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
 
 import matplotlib
 import matplotlib.pyplot as plt
@@ -13,6 +23,16 @@ import pandas as pd
 from asserts import (assert_equal, assert_in, assert_is_instance,
                      assert_is_none, assert_true)
 
+JHU_TIME_SERIES_URL = 'https://raw.githubusercontent.com/CSSEGISandData/'+\
+                      'COVID-19/master/csse_covid_19_data/'+\
+                      'csse_covid_19_time_series/'
+
+JHU_FILENAMES = {('US', 'deaths'): 'time_series_covid19_deaths_US.csv',
+                 ('US', 'confirmed'): 'time_series_covid19_confirmed_US.csv',
+                 ('global', 'deaths'): 'time_series_covid19_deaths_global.csv',
+                 ('global', 'confirmed'):
+                 'time_series_covid19_confirmed_global.csv'}
+
 
 class Surge:
     """Surge class for critical period analysis of COVID-19 data.
@@ -25,7 +45,10 @@ class Surge:
     """
 
     def __init__(self, locale='US', sub_locale=None,
-                 save_all_original_data_html=False):
+                 save_all_original_data_html=False,
+                 data_source=None, cache_dir=None, offline=False,
+                 dataset=None, dtype=np.float64, case_type='deaths',
+                 population_source=None):
         """Construct a Surge object.
 
         Parameters
@@ -43,6 +66,41 @@ class Surge:
         save_all_original_data_html: bool
             Save in a file, an `html` version of the entire data retrived
             from the repository.
+        data_source: str
+            Location of the data file. Either a local path, a `file://` URL,
+            or an `http(s)://` URL. `None` will use the Johns Hopkins CSSE
+            repository file for `locale`. A local directory is opened as a
+            binary store saved with `dataset.save`.
+            Default: None
+        cache_dir: str
+            Directory of the on-disk download cache. `None` will use the
+            `COVID_SURGE_CACHE_DIR` environment variable, if set, or
+            `~/.cache/covid-surge`. See `get_data_file`.
+            Default: None
+        offline: bool
+            Never access the network; only previously cached downloads or
+            local files are used.
+            Default: False
+        dataset: UsDataset or GlobalDataset
+            Parsed data of `locale` shared with other Surge objects. `None`
+            will use the dataset shared by all Surge objects of the same
+            data file; see `get_dataset`.
+            Default: None
+        dtype: numpy.dtype
+            Floating point type of `cases`. `numpy.float32` halves the
+            memory of large (county-level) data. Fits are always computed
+            in double precision.
+            Default: `numpy.float64`
+        case_type: str
+            Type of data. Deaths ('deaths') and confirmed cases
+            ('confirmed'). The population of US communities always comes
+            from the deaths data; see `get_us_population_table`.
+            Default: 'deaths'
+        population_source: str
+            Location of the US deaths data file with the population of the
+            communities of confirmed cases; e.g. a local file next to a
+            local `data_source`. Not used for deaths.
+            Default: None (Johns Hopkins CSSE repository)
         # TODO log_filename='covid_surge'):
         log_filename: str
             Name of the file to save logging information. Not used at the
@@ -52,27 +110,41 @@ class Surge:
         ----------
         names: list(str)
             List of names of communities; countries or states or towns, etc.
-            Created by `get_covid_us_data` or `get_covid_global_data`.
-        populations: list(int)
-            List of population for each community if available. Otherwise,
-            `None`. Created by `get_covid_us_data`.
-            Created by `get_covid_us_data` or `get_covid_global_data`.
-        dates: numpy.ndarray(str)
-            Vector of `str` for dates in the numeric form MM/DD/YY.
-            Created by `get_covid_us_data` or `get_covid_global_data`.
+            From `dataset`; see `UsDataset.states`, `UsDataset.counties` and
+            `GlobalDataset.countries`.
+        populations: numpy.ndarray(int)
+            Population of each community if available. Otherwise, `None`.
+            From a `UsDataset`.
+        dates: numpy.ndarray(numpy.datetime64)
+            Vector of `datetime64[D]` dates; see `format_dates` for the
+            numeric form M/D/YY. Read-only view of `__dates` within the
+            date range.
         cases: numpy.ndarray(float)
             Matrix of `float` for cases. Number of rows equal to dimension of
             `dates`. Number of columns equal to dimension of `names`.
-            Created by `get_covid_us_data` or `get_covid_global_data`.
-        __dates: numpy.ndarray(str)
-            Original copy of `dates`.
+            Read-only view of `__cases` within the date range.
+        __dates: numpy.ndarray(numpy.datetime64)
+            Original `dates`; read-only.
         __cases: numpy.ndarray(float)
-            Original copy of `cases`.
-        __end_date: str or None
+            Original `cases`; read-only, shared with `dataset`.
+        __name_ids: dict
+            Column of each name in `cases`.
+        __combined: tuple or None
+            Sum of the columns of `__cases` and of `populations`; computed
+            on first use. See `__community`.
+        __start: int
+            Start index of the date range `[__start, __stop)` in `__dates`.
+        __stop: int
+            Stop index of the date range `[__start, __stop)` in `__dates`.
+        __start_date: numpy.datetime64 or None
+            Start date of `dates`. The start date of `__dates` remains
+            original. Start case of `cases`.
+        __end_date: numpy.datetime64 or None
             End date of `dates`. The end date of `__dates` remains original.
             End case of `cases`. The end case of `__cases` remains original.
         __ignore_last_n_days: int
-            Ignore this many days from the end of cases and dates.
+            Ignore this many days from the end of cases and dates. Combined
+            with `__end_date`, the earlier of the two ends the date range.
         min_n_cases_abs: int
             Minimum number of cases before the analysis is carried on.
         trim_rel_small_n_cases: float
@@ -80,8 +152,18 @@ class Surge:
         deaths_100k_minimum: float
             Minimum number of deaths per 100k population per year before the
             analysis is carried on.
+        model: str
+            Growth model of the fits; a key of `GROWTH_MODELS`: 'logistic'
+            (default), 'gompertz' or 'richards'.
         sigmoid_formula: str
-            Formula of the sigmoid function as a `str`.
+            Formula of the growth model as a `str` (read-only).
+        debug: bool
+            Check the critical times of the fits against the derivatives of
+            the growth model; see `critical_times`. Default: False.
+        dataset: UsDataset or GlobalDataset
+            Parsed data shared with other Surge objects.
+        case_type: str
+            Type of data; 'deaths' or 'confirmed'.
 
         Examples
         --------
@@ -92,15 +174,35 @@ class Surge:
         >>> ny_surge = Surge(locale='US', sub_locale='New York')
 
         >>> global_surge = Surge(locale='global')
+
+        >>> us_surge = Surge(locale='US', case_type='confirmed')
+
+        >>> ny_surge = Surge(locale='US', sub_locale='New York',
+        ...                  data_source='file:///data/deaths_US.csv')
+        >>> us_surge = Surge(locale='US', offline=True)
+
+        >>> us_surge = Surge(locale='US')
+        >>> ny_surge = Surge(locale='US', sub_locale='New York',
+        ...                  dataset=us_surge.dataset)
+
+        >>> us_surge.end_date = '4/20/20'
+        >>> us_surge.start_date = datetime.date(2020, 3, 1)
+
+        >>> us_surge.dataset.save('us_deaths_store')
+        >>> us_surge = Surge(locale='US', data_source='us_deaths_store')
         """
 
         # Initializations
         if locale == 'global':
             assert_is_none(sub_locale)
 
+        assert_in(case_type, ('deaths', 'confirmed'))
+
         self.locale = locale
         self.sub_locale = sub_locale
+        self.case_type = case_type
 
+        self.__start_date = None
         self.__end_date = None
         self.__ignore_last_n_days = 0
 
@@ -114,76 +216,250 @@ class Surge:
 
         self.populations = None
 
-        self.sigmoid_formula = 'null-formula'
+        self.model = 'logistic'
+
+        self.debug = False
 
         # Read data
         if self.locale == 'US':
 
-            if self.sub_locale:
-
-                (county_names, populations, dates, cases) = \
-                 get_covid_us_data(self.sub_locale,
-                                   save_html=save_all_original_data_html)
-
-                assert_equal(dates.size, cases.shape[0])
-                assert_equal(len(county_names), cases.shape[1])
-
-                self.names = county_names
+            if dataset is None and save_all_original_data_html:
+                dataset = UsDataset(case_type, data_source, cache_dir,
+                                    offline, save_html=True, dtype=dtype,
+                                    population_source=population_source)
+            elif dataset is None:
+                dataset = get_covid_us_dataset(case_type, data_source,
+                                               cache_dir, offline, dtype,
+                                               population_source)
+            assert_is_instance(dataset, UsDataset)
+            assert_equal(dataset.case_type, case_type)
 
+            if self.sub_locale:
+                (names, populations, dates, cases) = \
+                        dataset.counties(self.sub_locale)
             else:
+                (names, populations, dates, cases) = dataset.states()
 
-                (state_names, populations, dates, cases) = \
-                 get_covid_us_data(save_html=save_all_original_data_html)
+            assert_equal(dates.size, cases.shape[0])
+            assert_equal(len(names), cases.shape[1])
 
-                assert_equal(dates.size, cases.shape[0])
-                assert_equal(len(state_names), cases.shape[1])
+            self.names = names
+            self.populations = np.array(populations)
 
-                self.names = state_names
+        elif self.locale == 'global':
 
-            self.populations = populations
+            if dataset is None and save_all_original_data_html:
+                dataset = GlobalDataset(case_type, data_source, cache_dir,
+                                        offline, save_html=True, dtype=dtype)
+            elif dataset is None:
+                dataset = get_covid_global_dataset(case_type, data_source,
+                                                   cache_dir, offline, dtype)
+            assert_is_instance(dataset, GlobalDataset)
+            assert_equal(dataset.case_type, case_type)
 
-        elif self.locale == 'global':
-            (country_names, dates, cases) = \
-             get_covid_global_data(cumulative=True)
+            (country_names, dates, cases) = dataset.countries()
             self.names = country_names
 
         else:
             assert_true(False, 'Bad locale: %r (US, global)'%(self.locale))
 
-        self.__dates = dates # preserve original
-        self.__cases = cases # preserve original
+        self.dataset = dataset
+
+        self.__dates = parse_dates(dates) # preserve original
+        self.__cases = cases.view() # preserve original
 
-        self.dates = None # modification of __dates
-        self.cases = None # modification of __cases
+        self.__dates.flags.writeable = False
+        self.__cases.flags.writeable = False
+
+        self.__start = 0
+        self.__stop = self.__dates.size
+
+        self.__name_ids = {name: i for (i, name) in enumerate(self.names)}
+        self.__combined = None
 
         self.__reset_data()
 
     def __reset_data(self):
-        """"Reset data to original values."""
+        """"Reset the date range `[__start, __stop)`; no data is copied."""
+
+        start = 0
+        if self.__start_date is not None:
+            start = np.searchsorted(self.__dates, self.__start_date, 'left')
+
+        stop = self.__dates.size - self.__ignore_last_n_days
+        if self.__end_date is not None:
+            stop = min(stop, np.searchsorted(self.__dates, self.__end_date,
+                                             'right'))
+
+        self.__start = int(start)
+        self.__stop = int(max(stop, start))
+
+    def __community(self, name):
+        """Cases and population of a community within the date range.
+
+        Parameters
+        ----------
+        name: str
+            Name of the community. `None` will combine all communities.
+
+        Returns
+        -------
+        community: tuple
+            `(cases, population)`; `population` is `None` if not available.
+            The combined cases are a view of the sum of the original cases,
+            computed once for all date ranges.
+        """
+
+        if name is None:
+            if self.__combined is None:
+                population = None
+                if self.populations is not None:
+                    population = np.sum(self.populations)
+                self.__combined = (np.sum(self.__cases, axis=1), population)
+            (cases, population) = self.__combined
+            return (cases[self.__start:self.__stop], population)
+
+        assert_in(name, self.__name_ids, msg_fmt='{first!r} not in names')
+        name_id = self.__name_ids[name]
+
+        population = None
+        if self.populations is not None:
+            population = self.populations[name_id]
+
+        return (self.cases[:, name_id], population)
+
+    def __select_cases(self, icases, population, n_params):
+        """Trimmed data of a community if it is to be fitted.
+
+        All fits of many communities select their data here: the last count
+        must reach `min_n_cases_abs`; the counts up to
+        `trim_rel_small_n_cases` percent of the last are trimmed; more than
+        `n_params` counts must remain (for the residual variance of
+        `sigmoid_param_covariance`); with a `population`, the deaths per
+        100k per year must reach `deaths_100k_minimum` (an unknown, `nan`,
+        population is rejected).
+
+        Parameters
+        ----------
+        icases: numpy.ndarray
+            Cases of the community within the date range.
+        population: int
+            Population of the community or `None`.
+        n_params: int
+            Number of parameters of the fit.
+
+        Returns
+        -------
+        selection: tuple
+            `(nz_cases_ids, cases, None)`: the ids of the trimmed data in
+            `icases` and the trimmed data (`float64`); or `(None, None,
+            (reason, value))` if rejected for 'abs_minimum' (last count),
+            'n_points' (number of trimmed counts), 'population' (unknown
+            population) or 'deaths_100k' (deaths per 100k per year).
+        """
+
+        if icases[-1] < self.min_n_cases_abs:
+            return (None, None, ('abs_minimum', icases[-1]))
+
+        (nz_cases_ids,) = np.where(
+            icases > self.trim_rel_small_n_cases/100*icases[-1])
+
+        if nz_cases_ids.size <= n_params:
+            return (None, None, ('n_points', nz_cases_ids.size))
+
+        icases = np.array(icases[nz_cases_ids], dtype=np.float64)
+
+        if population is not None and np.isnan(population):
+            return (None, None, ('population', population))
+
+        if population is not None:
+            deaths_100k = round(icases[-1]*100000/population *
+                                365/icases.size, 1)
+            if deaths_100k < self.deaths_100k_minimum:
+                return (None, None, ('deaths_100k', deaths_100k))
+
+        return (nz_cases_ids, icases, None)
+
+    def __get_dates(self):
+
+        return self.__dates[self.__start:self.__stop]
+    dates = property(__get_dates, None, None,
+                     'Read-only view of the dates within the date range.')
+
+    def __get_cases(self):
 
-        self.cases = np.copy(self.__cases)
-        self.dates = np.copy(self.__dates)
+        return self.__cases[self.__start:self.__stop]
+    cases = property(__get_cases, None, None,
+                     'Read-only view of the cases within the date range.')
+
+    def __set_model(self, v):
+
+        assert_in(v, GROWTH_MODELS)
+        self.__model = v
+
+    def __get_model(self):
+
+        return self.__model
+    model = property(__get_model, __set_model, None, None)
+
+    def __get_sigmoid_formula(self):
+
+        return GROWTH_MODELS[self.__model].formula
+    sigmoid_formula = property(__get_sigmoid_formula, None, None,
+                               'Formula of the growth model.')
+
+    def __datetime64(self, v):
+        """Convert a date to `datetime64[D]` within the original dates."""
+
+        if isinstance(v, str):
+            (date,) = parse_dates([v])
+        else:
+            assert_true(isinstance(v, (datetime.date, np.datetime64)),
+                        'Bad date: %r (str, date, datetime64)'%(v,))
+            date = np.datetime64(v, 'D')
+
+        assert_true(self.__dates[0] <= date <= self.__dates[-1],
+                    'Date %s not in %s-%s'%(format_dates(date),
+                                            format_dates(self.__dates[0]),
+                                            format_dates(self.__dates[-1])))
+
+        return date
+
+    def __set_start_date(self, v):
+        """Start date setter and `dates` and `cases` modifier.
+
+        Accepts a `str` in the form M/D/YY, a `datetime.date` or a
+        `numpy.datetime64`; `None` restores the original start date.
+        """
+
+        if v is not None:
+            v = self.__datetime64(v)
+            if self.__end_date is not None:
+                assert_true(v <= self.__end_date)
+
+        self.__start_date = v
+        self.__reset_data()
+
+    def __get_start_date(self):
+
+        return self.__start_date
+    start_date = property(__get_start_date, __set_start_date, None, None)
 
     def __set_end_date(self, v):
-        """End date setter and `dates` and `cases` modifier."""
+        """End date setter and `dates` and `cases` modifier.
+
+        Accepts a `str` in the form M/D/YY, a `datetime.date` or a
+        `numpy.datetime64`; `None` restores the original end date.
+        """
 
-        assert_true(isinstance(v, str) or v is None)
+        if v is not None:
+            v = self.__datetime64(v)
+            if self.__start_date is not None:
+                assert_true(self.__start_date <= v)
 
         self.__end_date = v
         self.__reset_data()
 
-        if self.__end_date is not None:
-            assert_is_instance(self.__end_date, str)
-            assert_is_instance(self.__cases, np.ndarray)
-            (ids,) = np.where(self.dates == self.__end_date)
-            assert_equal(ids.size, 1)
-            self.dates = np.copy(self.dates[:ids[0]+1])
-            self.cases = np.copy(self.cases[:ids[0]+1, :])
-        elif self.__ignore_last_n_days != 0:
-            self.__set_ignore_last_n_days(self.__ignore_last_n_days)
-        else:
-            pass
-
     def __get_end_date(self):
 
         return self.__end_date
@@ -198,11 +474,6 @@ class Surge:
         self.__ignore_last_n_days = val
         self.__reset_data()
 
-        if self.__ignore_last_n_days != 0:
-
-            self.dates = np.copy(self.dates[:-self.__ignore_last_n_days])
-            self.cases = np.copy(self.cases[:-self.__ignore_last_n_days])
-
     def __get_ignore_last_n_days(self):
 
         return self.__ignore_last_n_days
@@ -221,19 +492,7 @@ class Surge:
             Save the plot as a `png` image file.
         """
 
-        population = None
-
-        if name is None:  # Combine all column data in the surge
-            cases_plot = np.sum(self.cases, axis=1)
-            if self.populations:
-                population = np.sum(self.populations)
-        elif name in self.names:
-            name_id = self.names.index(name)
-            if self.populations:
-                population = self.populations[name_id]
-            cases_plot = self.cases[:, name_id]
-        else:
-            assert_in(name, self.names)
+        (cases_plot, population) = self.__community(name)
 
         # Select data with # of cases greater than the minimum
         (nz_cases_ids,) = np.where(cases_plot > self.trim_rel_small_n_cases/100*cases_plot[-1])
@@ -248,7 +507,7 @@ class Surge:
             deaths_100k_y = round(deaths_100k_y, 1)
 
         xlabel = 'Date'
-        ylabel = 'Cumulative Deaths []'
+        ylabel = self.__cases_label()
 
         if name is None:
             locale = self.locale+' Combined '
@@ -267,7 +526,8 @@ class Surge:
 
         ax.plot(range(len(dates_plot)), cases_plot, 'r*', label=source)
 
-        plt.xticks(range(len(dates_plot)), dates_plot, rotation=60, fontsize=14)
+        plt.xticks(range(len(dates_plot)), format_dates(dates_plot),
+                   rotation=60, fontsize=14)
 
         ax.set_ylabel(ylabel, fontsize=16)
         ax.set_xlabel(xlabel, fontsize=16)
@@ -289,69 +549,132 @@ class Surge:
 
         return
 
-    def fit_data(self, name=None):
-        """Fit a sigmoid curve to data in a Surge object.
+    def fit_data(self, name=None, solver='newton'):
+        """Fit a sigmoid curve (of `model`) to data in a Surge object.
 
         Parameters
         ----------
         name: str
             Name of the community. `None` will combine
             all communities. Default: `None`.
+        solver: str
+            Nonlinear least-squares method: 'newton' (`newton_nlls_solve`),
+            'lm' (`levenberg_marquardt_solve`) or 'varpro'
+            (`varpro_nlls_solve`). Default: 'newton'.
 
         Returns
         -------
         param_vec: numpy.ndarray(float)
             Vector of sigmoid parameters `a_0`, `a_1`, `a_0`.
 
+        See `bootstrap_intervals` for confidence intervals of the fit.
+
         """
 
-        if name is None:  # Combine all column data in the surge
-            cases = np.sum(self.cases, axis=1)
-        elif name in self.names:
-            name_id = self.names.index(name)
-            cases = self.cases[:, name_id]
-        else:
-            assert_in(name, self.names)
+        (_, param_vec, scaling, rr2, k) = self.__fit_community(name, solver)
 
-        # Select data with # of cases greater than the minimum
-        (nz_cases_ids,) = np.where(cases > self.trim_rel_small_n_cases/100*cases[-1])
-        cases = np.copy(cases[nz_cases_ids])
-        dates = self.dates[nz_cases_ids]
+        param_vec[0] *= scaling
 
-        scaling = cases.max()
-        cases /= scaling
+        print('')
+        np.set_printoptions(precision=3, threshold=20, edgeitems=12,
+                            linewidth=100)
+        print('Unscaled root =', param_vec)
+        print('R2            = %1.3f'%rr2)
+        print('k iterations  = %3i'%k)
 
-        a_0 = cases[-1]
-        a_1 = a_0/cases[0] - 1
-        a_2 = -0.15
+        return param_vec
 
-        param_vec_0 = np.array([a_0, a_1, a_2])
+    def bootstrap_intervals(self, name=None, n_replicates=1000,
+                            solver='newton'):
+        """Bootstrap confidence intervals of the fit of `fit_data`.
 
-        times = np.array(range(dates.size), dtype=np.float64)
+        Parameters
+        ----------
+        name: str
+            Name of the community. `None` will combine
+            all communities. Default: `None`.
+        n_replicates: int
+            Number of bootstrap replicates; see `bootstrap_fit_sigmoid`.
+            Default: 1000.
+        solver: str
+            Nonlinear least-squares method; see `fit_data`.
+            Default: 'newton'.
+
+        Returns
+        -------
+        intervals: dict
+            Number of converged replicates ('n_bootstrap') and 95%
+            confidence intervals of the time at maximum growth rate
+            ('tcc_ci'), the surge period ('surge_period_ci') and the 60-day
+            look-ahead ('forecast_ci'); cumulative cases 60 days after the
+            last date of the data.
+
+        """
+
+        assert_true(n_replicates >= 1)
+
+        (cases, param_vec, scaling, _, _) = self.__fit_community(name,
+                                                                   solver)
 
         k_max = 25
         rel_tol = 0.01 / 100.0  # (0.01%)
 
-        (param_vec, rr2, k) = \
-            newton_nlls_solve(times, cases,
-                              self.sigmoid_func,
-                              self.__grad_p_sigmoid_func,
-                              param_vec_0, k_max, rel_tol, verbose=False)
+        intervals = self.__bootstrap_intervals(cases, param_vec, scaling,
+                                               n_replicates, solver, k_max,
+                                               rel_tol)
 
-        assert_true(param_vec[0] > 0.0)
-        assert_true(param_vec[1] > 0.0)
-        assert_true(param_vec[2] < 0.0)
+        print('')
+        print('Bootstrap replicates converged = %i of %i'%
+              (intervals['n_bootstrap'], n_replicates))
+        print('95%% CI time at max. growth rate = [%3.1f, %3.1f] [day]'%
+              tuple(intervals['tcc_ci']))
+        print('95%% CI surge period             = [%3.1f, %3.1f] [day]'%
+              tuple(intervals['surge_period_ci']))
+
+        return intervals
+
+    def __fit_community(self, name, solver):
+        """Fit of the trimmed data of a community scaled to a maximum of 1.
+
+        The data are selected as in `multi_fit_data`; data rejected there or
+        a fit not converged fail an assertion. Returns
+        `(cases, param_vec, scaling, rr2, k)`: the scaled data, the scaled
+        parameters, the scaling and `rr2`, `k` of the solver.
+        """
 
-        param_vec[0] *= scaling
+        assert_in(solver, NLLS_SOLVERS)
 
-        print('')
-        np.set_printoptions(precision=3, threshold=20, edgeitems=12,
-                            linewidth=100)
-        print('Unscaled root =', param_vec)
-        print('R2            = %1.3f'%rr2)
-        print('k iterations  = %3i'%k)
+        growth_model = GROWTH_MODELS[self.model]
 
-        return param_vec
+        (cases, population) = self.__community(name)
+
+        (_, cases, rejection) = self.__select_cases(cases, population,
+                                                    growth_model.n_params)
+        assert_is_none(rejection,
+                       msg_fmt='data of %r rejected: {expr!r}'%(name,))
+
+        scaling = cases.max()
+        cases /= scaling
+
+        param_vec_0 = growth_model.initial_guess(cases)
+
+        times = np.array(range(cases.size), dtype=np.float64)
+
+        k_max = 25
+        rel_tol = 0.01 / 100.0  # (0.01%)
+
+        (param_vec, rr2, k) = \
+            NLLS_SOLVERS[solver][0](times, cases,
+                                    self.sigmoid_func, None,
+                                    param_vec_0, k_max, rel_tol,
+                                    verbose=False,
+                                    kernel=growth_model.kernel)
+
+        assert_true(k <= k_max, msg_fmt='no convergence of the fit of %r'%
+                    (name,))
+        assert_true(growth_model.valid(param_vec))
+
+        return (cases, param_vec, scaling, rr2, k)
 
     def plot_covid_nlfit(self, param_vec, name=None, save=False,
                          plot_prime=False, plot_double_prime=False,
@@ -387,19 +710,7 @@ class Surge:
 
         formula = self.sigmoid_formula
 
-        population = None
-
-        if name is None:  # Combine all column data in the surge
-            cases_plot = np.sum(self.cases, axis=1)
-            if self.populations:
-                population = np.sum(self.populations)
-        elif name in self.names:
-            name_id = self.names.index(name)
-            if self.populations:
-                population = self.populations[name_id]
-            cases_plot = self.cases[:, name_id]
-        else:
-            assert_in(name, self.names)
+        (cases_plot, population) = self.__community(name)
 
         # Select data with # of cases greater than the minimum
         (nz_cases_ids, ) = \
@@ -409,7 +720,7 @@ class Surge:
         cases_plot = cases_plot[nz_cases_ids]
         dates_plot = self.dates[nz_cases_ids]
 
-        ylabel = 'Cumulative Deaths []'
+        ylabel = self.__cases_label()
 
         if population:
             deaths_100k_y = \
@@ -430,7 +741,8 @@ class Surge:
         plt.figure(1, figsize=(15, 5))
 
         if option == 'dates':
-            plt.plot(dates_plot, cases_plot, 'r*', label=source)
+            plt.plot(format_dates(dates_plot), cases_plot, 'r*',
+                     label=source)
         elif option == 'days':
             plt.plot(range(len(dates_plot)), cases_plot, 'r*', label=source)
 
@@ -442,8 +754,8 @@ class Surge:
         plt.plot(dates_fit, cases_fit, 'b-', label='Covid-surge fitting')
 
         if option == 'dates':
-            plt.xticks(range(len(dates_plot)), dates_plot, rotation=60,
-                       fontsize=14)
+            plt.xticks(range(len(dates_plot)), format_dates(dates_plot),
+                       rotation=60, fontsize=14)
             plt.xlabel(r'Date', fontsize=16)
         elif option == 'days':
             plt.xlabel(r'Time [day]', fontsize=16)
@@ -454,10 +766,13 @@ class Surge:
         plt.ylabel(ylabel, fontsize=16)
         plt.title(title, fontsize=20)
 
+        growth_model = GROWTH_MODELS[self.model]
+
         (tcc, dtc) = self.report_critical_times(param_vec, name, verbose=False)
 
         time_max_prime = tcc
-        time_min_max_double_prime = [tcc-dtc, tcc+dtc]
+        time_min_max_double_prime = \
+            [float(t) for t in growth_model.critical_times(param_vec)[1:]]
 
         fit_func = self.sigmoid_func
 
@@ -548,7 +863,8 @@ class Surge:
         # Additional plot for first derivative
         if plot_prime:
 
-            fit_func_prime = self.__sigmoid_func_prime
+            def fit_func_prime(x, param_vec):
+                return growth_model.derivatives(x, param_vec)[0]
 
             plt.figure(2, figsize=(15, 5))
 
@@ -608,7 +924,8 @@ class Surge:
         # Additional plot for second derivative
         if plot_double_prime:
 
-            fit_func_double_prime = self.__sigmoid_func_double_prime
+            def fit_func_double_prime(x, param_vec):
+                return growth_model.derivatives(x, param_vec)[1]
 
             plt.figure(3, figsize=(15, 5))
 
@@ -674,14 +991,15 @@ class Surge:
         return
 
     def sigmoid_func(self, xval, param_vec):
-        """Compute the sigmoid function at x.
+        """Compute the sigmoid function (of `model`) at x.
 
         Parameters
         ----------
         xval: float, int, or numpy.ndarray
             Values of the argument of the function.
         param_vec: numpy.ndarray(float)
-            Vector of sigmoid parameters `a_0`, `a_1`, `a_0`.
+            Vector of sigmoid parameters `a_0`, `a_1`, `a_2` (and shape
+            parameters of `model`).
 
         Returns
         -------
@@ -689,62 +1007,16 @@ class Surge:
             Values of the function as a `numpy` vector.
         """
 
-        self.sigmoid_formula = r'$y = \frac{\alpha_0}{1 + \alpha_1 \, e^{\alpha_2\,t}  }$'
-
-        a_0 = param_vec[0]
-        a_1 = param_vec[1]
-        a_2 = param_vec[2]
-
-        f_x = a_0 / (1 + a_1 * np.exp(a_2*xval))
-
-        return f_x
-
-    def __sigmoid_func_prime(self, x, param_vec):
-
-        a_0 = param_vec[0]
-        a_1 = param_vec[1]
-        a_2 = param_vec[2]
-
-        f_x = a_0 / (1 + a_1 * np.exp(a_2*x))
-        g_x = (-1) * a_1 * a_2 * np.exp(a_2*x) / (1.0 + a_1 * np.exp(a_2*x))
-
-        fprime = g_x * f_x
-
-        return fprime
-
-    def __sigmoid_func_double_prime(self, x, param_vec):
-
-        a_0 = param_vec[0]
-        a_1 = param_vec[1]
-        a_2 = param_vec[2]
-
-        f_x = a_0 / (1 + a_1 * np.exp(a_2*x))
-        g_x = (-1) * a_1 * a_2 * np.exp(a_2*x) / (1.0 + a_1 * np.exp(a_2*x))
-        g_prime_x = (-1) * a_1 * a_2**2 * np.exp(a_2*x) / (1.0 + a_1 * np.exp(a_2*x))**2
-
-        double_prime = (g_prime_x + g_x**2)*f_x
-
-        return double_prime
-
-    def __grad_p_sigmoid_func(self, x, param_vec):
-
-        a_0 = param_vec[0]
-        a_1 = param_vec[1]
-        a_2 = param_vec[2]
-
-        grad_p_f_0 = 1./(1. + a_1 * np.exp(a_2*x))
-        grad_p_f_1 = - a_0/(1. + a_1 * np.exp(a_2*x))**2 * np.exp(a_2*x)
-        grad_p_f_2 = - a_0/(1. + a_1 * np.exp(a_2*x))**2 * a_1 * x*np.exp(a_2*x)
-
-        return (grad_p_f_0, grad_p_f_1, grad_p_f_2)
+        return GROWTH_MODELS[self.model].func(xval, param_vec)
 
     def report_critical_times(self, param_vec, name=None, verbose=False):
-        """Report critical times and errors.
+        """Report critical times.
 
         Parameters
         ----------
         param_vec: numpy.ndarray(float)
-            Vector of sigmoid parameters `a_0`, `a_1`, `a_0`.
+            Vector of sigmoid parameters `a_0`, `a_1`, `a_2` (and shape
+            parameters of `model`).
         name: str
             Name of the community for creating the report. `None` will combine
             all communities. Default: `None`.
@@ -756,131 +1028,158 @@ class Surge:
         time_max_prime: float
             Time of maximum surge rate.
         dtc: float
-            Time difference between either maximum or minimum curvature
-            points and `time_max_prime`.
+            Half the time between the maximum and minimum curvature points;
+            for the logistic model, the time between either point and
+            `time_max_prime`.
+
+        See `report_critical_times_se` for their standard errors.
+
+        Notes
+        -----
+        The times come from `critical_times`; its consistency checks run
+        if `debug` is set.
         """
 
         a_0 = param_vec[0]
-        a_1 = param_vec[1]
-        a_2 = param_vec[2]
-
-        if name is None: # Combine all column data in the surge
-            cases = np.sum(self.cases, axis=1)
-        elif name in self.names:
-            name_id = self.names.index(name)
-            cases = self.cases[:, name_id]
-        else:
-            #assert name in self.names, \
-            #  '\n\n Name: %r not in %r'%(name,self.names)
-            assert_in(name, self.names)
-
-        # Select data with non-zero cases only
-        (nz_cases_ids,) = np.where(cases > 0)
-        dates = self.dates[nz_cases_ids]
 
-        # Peak
-        (time_max_prime, prime_max) = self.__sigmoid_prime_max(param_vec)
+        times = critical_times(np.asarray(param_vec)[np.newaxis], self.model,
+                               debug=self.debug)
 
-        if time_max_prime%1:
-            time_max_id = int(time_max_prime) + 1
-        else:
-            time_max_id = int(time_max_prime)
+        time_max_prime = float(times['tcc'][0])
+        dtc = float(times['dtc'][0])
 
         if verbose:
+
+            (cases, _) = self.__community(name)
+
+            # Select data with non-zero cases only
+            (nz_cases_ids,) = np.where(cases > 0)
+            dates = self.dates[nz_cases_ids]
+
+            # Peak
+            prime_max = times['peak_rate'][0]
+            time_max_id = int(np.ceil(time_max_prime))
+
             print('Maximum growth rate            = %3.2e [case/day]'%(prime_max))
             print('Maximum normalized growth rate = %3.2e [%%/day]'%(prime_max/a_0*100))
             print('Time at maximum growth rate    = %3.1f [day]'%(time_max_prime))
             if time_max_id > dates.size-1:
                 print('WARNING: Ignore maximum growth rate; time at max. growth exceeds time length.')
             else:
-                print('Date at maximum growth rate = %s '%(dates[time_max_id]))
+                print('Date at maximum growth rate = %s '%(format_dates(dates[time_max_id])))
 
             print('')
 
-        # Maximum curvature
-        time_max_double_prime = -math.log(a_1/(2+math.sqrt(3)))/a_2 # time at maximum growth acceleration
-
-        if time_max_double_prime%1:
-            time_max_id = int(time_max_double_prime) + 1
-        else:
-            time_max_id = int(time_max_double_prime)
-
-        #assert abs( a_0*a_2**2*(5+3*math.sqrt(3))/(3+math.sqrt(3))**3 - self.__sigmoid_func_double_prime(time_max_double_prime,param_vec) ) <= 1.e-8
-        assert_true(abs(a_0*a_2**2*(5+3*math.sqrt(3))/(3+math.sqrt(3))**3 - self.__sigmoid_func_double_prime(time_max_double_prime, param_vec)) <= 1.e-8 )
+            # Maximum curvature
+            double_prime_max = times['max_accel'][0]
+            time_max_double_prime = times['t_max_accel'][0]
+            time_max_id = int(np.ceil(time_max_double_prime))
 
-        if verbose:
-            print('Maximum growth acceleration            = %3.2e [case/day^2]'%(a_0*a_2**2*(5+3*math.sqrt(3))/(3+math.sqrt(3))**3))
-            print('Maximum normalized growth acceleration = %3.2e [%%/day^2]'%(a_2**2*(5+3*math.sqrt(3))/(3+math.sqrt(3))**3*100))
+            print('Maximum growth acceleration            = %3.2e [case/day^2]'%(double_prime_max))
+            print('Maximum normalized growth acceleration = %3.2e [%%/day^2]'%(double_prime_max/a_0*100))
             print('Time at maximum growth accel.          = %3.1f [day]'%(time_max_double_prime))
             print('Shifted time at maximum growth accel.  = %3.1f [day]'%(time_max_double_prime-time_max_prime))
             if time_max_id > dates.size-1:
                 print('WARNING: Ignore maximum growth accel.; time at max. growth accel. exceeds time length.')
             else:
-                print('Date at maximum growth accel. = %s '%(dates[time_max_id]))
+                print('Date at maximum growth accel. = %s '%(format_dates(dates[time_max_id])))
 
             print('')
 
-        # Minimum curvature
-        # time at minimum growth acceration
-        time_min_double_prime = -math.log(a_1/(2-math.sqrt(3)))/a_2
-
-        if time_min_double_prime%1:
-            time_min_id = int(time_min_double_prime) + 1
-        else:
-            time_min_id = int(time_min_double_prime)
-
-        assert_true(abs(a_0*a_2**2*(5-3*math.sqrt(3))/(3-math.sqrt(3))**3 - self.__sigmoid_func_double_prime(time_min_double_prime, param_vec)) <= 1.e-8)
+            # Minimum curvature
+            double_prime_min = times['min_accel'][0]
+            time_min_double_prime = times['t_min_accel'][0]
+            time_min_id = int(np.ceil(time_min_double_prime))
 
-        if verbose:
             print('')
-            print('Minimum growth acceleration            = %3.2e [case/day^2]'%(a_0*a_2**2*(5-3*math.sqrt(3))/(3-math.sqrt(3))**3))
-            print('Minimum normalized growth acceleration = %3.2e [%%/day^2]'%(a_2**2*(5-3*math.sqrt(3))/(3-math.sqrt(3))**3*100))
+            print('Minimum growth acceleration            = %3.2e [case/day^2]'%(double_prime_min))
+            print('Minimum normalized growth acceleration = %3.2e [%%/day^2]'%(double_prime_min/a_0*100))
             print('Time at minimum growth accel.          = %3.1f [day]'%(time_min_double_prime))
             print('Shifted time at maximum growth accel.  = %3.1f [day]'%(time_min_double_prime-time_max_prime))
             if time_min_id > dates.size-1:
                 print('WARNING: Ignore maximum growth accel.; time at min. growth accel. exceeds time length.')
             else:
-                print('Date at minimum growth accel. = %s '%(dates[time_min_id]))
+                print('Date at minimum growth accel. = %s '%(format_dates(dates[time_min_id])))
 
             print('')
-            print('Surge period = %3.1f [day]'%(time_min_double_prime-time_max_double_prime))
+            print('Surge period = %3.1f [day]'%(2*dtc))
 
-        assert_true(abs((time_max_prime-time_max_double_prime) - (time_min_double_prime - time_max_prime)) <= 1.e-5)
+        return (time_max_prime, dtc)
 
+    def report_critical_times_se(self, param_vec, param_cov, verbose=False):
+        """Report standard errors of the critical times.
 
-        return (time_max_prime, time_max_prime-time_max_double_prime)
+        Delta method: the gradients of the critical times with respect to
+        the parameters are central differences (see `critical_times`).
 
-    def __sigmoid_prime_max(self, param_vec):
+        Parameters
+        ----------
+        param_vec: numpy.ndarray(float)
+            Vector of sigmoid parameters `a_0`, `a_1`, `a_2` (and shape
+            parameters of `model`).
+        param_cov: numpy.ndarray(float)
+            Covariance of `param_vec`; see `sigmoid_param_covariance`.
+        verbose: bool
+            Print out the standard errors.
 
-        a_0 = param_vec[0]
-        a_1 = param_vec[1]
-        a_2 = param_vec[2]
+        Returns
+        -------
+        time_max_prime_se: float
+            Standard error of the time of maximum surge rate.
+        dtc_se: float
+            Standard error of `dtc`; see `report_critical_times`.
+        """
 
-        tcc = -math.log(a_1)/a_2 # time at maximum growth rate
+        times = critical_times(np.asarray(param_vec)[np.newaxis], self.model,
+                               gradients=True)
 
-        prime_max = -a_0*a_2/4.0
+        grad_tcc = times['tcc_grad'][0]
+        grad_dtc = times['dtc_grad'][0]
 
-        assert_true(abs(prime_max -
-                        self.__sigmoid_func_prime(tcc, param_vec)) <= 1.e-8)
+        time_max_prime_se = math.sqrt(grad_tcc @ param_cov @ grad_tcc)
+        dtc_se = math.sqrt(grad_dtc @ param_cov @ grad_dtc)
 
-        return (tcc, prime_max)
+        if verbose:
+            print('')
+            print('Std. error time at maximum growth rate = %3.2f [day]'%(time_max_prime_se))
+            print('Std. error surge period                = %3.2f [day]'%(2*dtc_se))
 
-    def __sigmoid_double_prime_max(self, param_vec):
+        return (time_max_prime_se, dtc_se)
 
-        a_0 = param_vec[0]
-        a_1 = param_vec[1]
-        a_2 = param_vec[2]
+    def __bootstrap_intervals(self, cases, param_vec, scaling, n_replicates,
+                              solver, k_max, rel_tol):
+        """95% confidence intervals of a fit by bootstrap.
 
-        # time at maximum growth acceleration
-        time_max_double_prime = -math.log(a_1/(2+math.sqrt(3)))/a_2
+        See `bootstrap_fit_sigmoid`; `cases` and `param_vec` are scaled by
+        `scaling`. Returns a dictionary with the number of converged
+        replicates, and the intervals of the time at maximum growth rate,
+        the surge period and the 60-day look-ahead of `multi_fit_data`.
+        """
 
-        fdp = self.__sigmoid_func_double_prime(time_max_double_prime,
-                                               param_vec)
-        fdp_analytical = a_0*a_2**2*(5+3*math.sqrt(3))/(3+math.sqrt(3))**3
+        param_mtrx = bootstrap_fit_sigmoid(cases, param_vec, n_replicates,
+                                           k_max, rel_tol, solver,
+                                           model=self.model)
+        param_mtrx = param_mtrx.transpose()
+        param_mtrx[0] *= scaling
+        (tcc, t_max, t_min) = \
+            GROWTH_MODELS[self.model].critical_times(param_mtrx)
+
+        n_prediction_days = 60
+        intervals = {
+            'tcc_ci': tcc,
+            'surge_period_ci': t_min - t_max,
+            'forecast_ci': self.sigmoid_func(
+                cases.size - 1 + n_prediction_days, param_mtrx)}
+
+        for (key, values) in intervals.items():
+            if values.size == 0:
+                intervals[key] = np.array([np.nan, np.nan])
+            else:
+                intervals[key] = np.percentile(values, [2.5, 97.5])
 
-        assert_true(abs(fdp_analytical - fdp) <= 1.e-8)
+        intervals['n_bootstrap'] = tcc.size
 
-        return
+        return intervals
 
     def report_error_analysis(self, param_vec, tcc, dtc, name=None):
         """Report error of data fitting.
@@ -899,13 +1198,7 @@ class Surge:
 
         """
 
-        if name is None: # Combine all column data in the surge
-            cases = np.sum(self.cases, axis=1)
-        elif name in self.names:
-            name_id = self.names.index(name)
-            cases = self.cases[:, name_id]
-        else:
-            assert_in(name, self.names)
+        (cases, _) = self.__community(name)
 
         # Select data with # of cases greater than the minimum
         (nz_cases_ids,) = np.where(cases > self.trim_rel_small_n_cases/100*cases[-1])
@@ -964,8 +1257,10 @@ class Surge:
 
     def multi_fit_data(self,
                        blocked_list=None,
-                       verbose=False, plot=False, save_plots=False):
-        """Fit a sigmoid curve to multiple data in a Surge object.
+                       verbose=False, plot=False, save_plots=False,
+                       batch=True, solver='newton', n_jobs=1,
+                       fit_cache=None, bootstrap=0, rejected=False):
+        """Fit a sigmoid curve (of `model`) to multiple data in a Surge object.
 
         Parameters
         ----------
@@ -977,14 +1272,51 @@ class Surge:
             Plot various plots during the fitting procedure.
         save_plots: bool
             Save a `png` version of the plots.
+        batch: bool
+            Fit all communities simultaneously with
+            `newton_nlls_batch_solve`. Otherwise fit one community at a time
+            with `newton_nlls_solve`. Default: True.
+        solver: str
+            Nonlinear least-squares method: 'newton', 'lm'
+            (`levenberg_marquardt_batch_solve`, damped steps without line
+            search; more robust on noisy or flat data) or 'varpro'
+            (`varpro_nlls_batch_solve`, iterates on a_1, a_2 only; fewer
+            iterations and less sensitive to the initial a_2).
+            Default: 'newton'.
+        n_jobs: int
+            Number of worker processes sharing the fits; -1 uses all cores.
+            The results do not depend on it. The workers are spawned, so a
+            calling script needs the `if __name__ == '__main__':` guard.
+            See `parallel_fit_sigmoids`. Default: 1.
+        fit_cache: FitCache
+            Reuse the fits of unchanged data and warm start the fits of data
+            with one more day; the cache is updated and saved. Default: None.
+        bootstrap: int
+            Number of bootstrap replicates for confidence intervals of each
+            community; see `bootstrap_intervals`. Default: 0 (none).
+        rejected: bool
+            Keep the fits rejected for no convergence or for a peak surge
+            rate or minimum acceleration past the data, with their status
+            codes. Default: False.
 
         Returns
         -------
-        sorted_fit_data: list(tuple)
-            List of the data fit operation sorted by surge period.
+        sorted_fit_data: FitResults
+            Fits sorted by surge period. Iterating yields the surge period
+            and `[name, dates, cases, param_vec, tcc, dtc, extras]` of each
+            community. `extras` is a dictionary with the covariance of `param_vec`
+            ('param_cov'; see `sigmoid_param_covariance`), the standard
+            errors of `tcc` and `dtc` ('tcc_se', 'dtc_se'), the 60-day
+            look-ahead ('forecast'; cumulative cases 60 days after the last
+            date, as in `backtest`), its standard error ('forecast_se') and
+            95% prediction interval ('forecast_pi'); and the confidence
+            intervals of `bootstrap_intervals` if `bootstrap` > 0; it is empty for
+            rejected fits.
 
         """
 
+        assert_in(solver, NLLS_SOLVERS)
+
         if blocked_list is None:
             blocked_list = list()
 
@@ -992,8 +1324,8 @@ class Surge:
         cases = self.cases
 
         # Sort the states by descending number of total cases
-        sorted_list = sorted(zip(names, cases[-1, :]),
-                             key=lambda entry: entry[1], reverse=True)
+        sorted_list = sorted(zip(names, range(len(names)), cases[-1, :]),
+                             key=lambda entry: entry[2], reverse=True)
 
         # Post processing data storage
         fit_data = list()
@@ -1004,49 +1336,145 @@ class Surge:
 
         top_id = 0
 
-        for (name, dummy) in sorted_list:
+        k_max = 25
+        rel_tol = 0.01 / 100.0 # (0.1%)
+
+        growth_model = GROWTH_MODELS[self.model]
+
+        if fit_cache is not None:
+            settings = {'solver': solver, 'batch': batch, 'k_max': k_max,
+                        'rel_tol': rel_tol, 'model': self.model,
+                        'trim_rel_small_n_cases': self.trim_rel_small_n_cases}
+
+        # Prepare the data of each community
+        fit_inputs = list()
+        cached_fits = list()
+        cache_args = list()
+
+        for (name, name_id, dummy) in sorted_list:
 
             if name in blocked_list:
                 continue
 
-            #assert name in names, 'Name: %r not in %r'%(name,names)
-            assert_in(name, names)
-            name_id = names.index(name)
-            if self.populations:
+            population = None
+            if self.populations is not None:
                 population = self.populations[name_id]
-            icases = cases[:, name_id]
-
-            if icases[-1] < self.min_n_cases_abs:
-                if verbose:
-                    print('')
-                    print('WARNING: name %r # deaths: %r below absolute minimum'%(name, icases[-1]))
-                    print('')
-                names_below_deaths_abs_minimum.append((name, icases[-1]))
-                continue
 
             # Select data with # of cases greater than the minimum
-            (nz_cases_ids,) = np.where(icases > self.trim_rel_small_n_cases/100*icases[-1])
+            (nz_cases_ids, icases, rejection) = self.__select_cases(
+                cases[:, name_id], population, growth_model.n_params)
 
-            if nz_cases_ids.size == 0:
-                if verbose:
-                    print('')
-                    print('WARNING: No data for state %r. Continuing...'%name)
-                    print('')
+            if rejection is not None:
+                (reason, value) = rejection
+                if reason == 'abs_minimum':
+                    if verbose:
+                        print('')
+                        print('WARNING: name %r # deaths: %r below absolute minimum'%(name, value))
+                        print('')
+                    names_below_deaths_abs_minimum.append((name, value))
+                elif reason == 'n_points':
+                    if verbose:
+                        print('')
+                        print('WARNING: %r data points for state %r. Continuing...'%(value, name))
+                        print('')
+                elif reason == 'population':
+                    if verbose:
+                        print('')
+                        print('WARNING: name %r has no population. Continuing...'%name)
+                        print('')
+                else:
+                    if verbose:
+                        print('')
+                        print('WARNING: name %r deaths per 100k: %r below minimum'%(name, value))
+                        print('')
+                    names_below_deaths_100k_minimum.append((name, value))
                 continue
 
-            icases = np.copy(icases[nz_cases_ids])
             dates = self.dates[nz_cases_ids]
 
-            if self.populations:
-                deaths_100k = round(icases[-1]*100000/population * 365/dates.size, 1)
+            scaling = icases.max()
+            icases /= scaling
 
-                if deaths_100k < self.deaths_100k_minimum:
-                    if verbose:
-                        print('')
-                        print('WARNING: name %r deaths per 100k: %r below minimum'%(name, deaths_100k))
-                        print('')
-                    names_below_deaths_100k_minimum.append((name, deaths_100k))
-                    continue
+            param_vec_0 = growth_model.initial_guess(icases)
+            if name == 'Michigan':
+                param_vec_0[2] = -.1
+
+            cached_fit = None
+            if fit_cache is not None:
+                key = '/'.join((self.locale, str(self.sub_locale),
+                                self.case_type, name))
+                args = (key, self.dates, cases[:, name_id], nz_cases_ids[0],
+                        scaling, settings)
+                (cached_fit, warm_param_vec_0) = fit_cache.get(*args)
+                if warm_param_vec_0 is not None:
+                    param_vec_0 = warm_param_vec_0
+                cache_args.append(args)
+
+            fit_inputs.append((name, dates, icases, scaling, param_vec_0,
+                               name_id, nz_cases_ids[0]))
+            cached_fits.append(cached_fit)
+
+        # Fit all communities not in the cache
+        fit_ids = [i for (i, fit) in enumerate(cached_fits) if fit is None]
+
+        fits = parallel_fit_sigmoids(
+            [fit_inputs[i][2] for i in fit_ids],
+            [fit_inputs[i][4] for i in fit_ids],
+            k_max, rel_tol, batch, solver, n_jobs, self.model,
+            covariance=True)
+
+        if fit_cache is not None and fit_ids:
+            for (i, fit) in zip(fit_ids, fits):
+                fit_cache.put(*cache_args[i], fit)
+            fit_cache.save()
+
+        for (i, fit) in zip(fit_ids, fits):
+            cached_fits[i] = fit
+        fits = cached_fits
+
+        # Covariances of cached fits stored without them; one batched
+        # evaluation
+        cov_ids = [i for (i, fit) in enumerate(fits) if len(fit) == 3]
+        if cov_ids:
+            (times, cases_mtrx, mask) = pad_cases(
+                [fit_inputs[i][2] for i in cov_ids])
+            (param_covs, sigma2_vec) = sigmoid_param_covariances(
+                times, cases_mtrx,
+                np.array([fits[i][0] for i in cov_ids]), mask, self.model)
+            for (i, param_cov, sigma2) in zip(cov_ids, param_covs,
+                                              sigma2_vec):
+                fits[i] = fits[i] + (param_cov, sigma2)
+
+        # Critical times of all fits in one pass; independent of the
+        # scaling of a_0
+        critical = critical_times(
+            np.reshape([fit[0] for fit in fits],
+                       (-1, growth_model.n_params)),
+            self.model, gradients=True, debug=self.debug)
+
+        # 60-day look-ahead of all fits: 60 days after the last date (the
+        # time `times[-1] + 60`) as the 'forecast' of `backtest`, and its
+        # gradient (the kernel Jacobian at y = 0 is minus the gradient)
+        n_prediction_days = 60
+
+        param_mtrx = np.reshape([fit[0] for fit in fits],
+                                (-1, growth_model.n_params)).transpose()
+        param_mtrx[0] *= [fit_input[3] for fit_input in fit_inputs]
+        forecast_times = np.array([fit_input[1].size for fit_input in
+                                   fit_inputs], dtype=np.float64)
+        forecast_times = forecast_times[:, np.newaxis] - 1 + n_prediction_days
+        forecast_r = np.empty(forecast_times.shape)
+        forecast_j = np.empty(forecast_times.shape+(growth_model.n_params,))
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            forecasts = growth_model.func(forecast_times[:, 0], param_mtrx)
+            growth_model.kernel(forecast_times, np.zeros(forecast_r.shape),
+                                param_mtrx[:, :, np.newaxis], forecast_r,
+                                forecast_j)
+
+        # Post-process the fit of each community
+        for (fit_id, ((name, dates, icases, scaling, param_vec_0, name_id,
+                       offset), (param_vec, rr2, k, param_cov, sigma2))) in \
+                enumerate(zip(fit_inputs, fits)):
 
             if verbose:
                 print('')
@@ -1055,30 +1483,16 @@ class Surge:
                 print('******************************************************')
                 print('')
 
-            scaling = icases.max()
-            icases /= scaling
-
-            a_0 = icases[-1]
-            a_1 = a_0/icases[0] - 1
-            a_2 = -0.15
-            if name == 'Michigan':
-                a_2 = -.1
-
-            param_vec_0 = np.array([a_0, a_1, a_2])
-
             times = np.array(range(dates.size), dtype=np.float64)
 
-            k_max = 25
-            rel_tol = 0.01 / 100.0 # (0.1%)
-
-            (param_vec, rr2, k) = \
-                newton_nlls_solve(times, icases, self.sigmoid_func,
-                                  self.__grad_p_sigmoid_func,
-                                  param_vec_0, k_max,
-                                  rel_tol, verbose=False)
-
-            if k > k_max and verbose:
-                print(" NO Newton's method convergence")
+            if k > k_max:
+                if verbose:
+                    print(" NO Newton's method convergence")
+                param_vec = np.array(param_vec)
+                param_vec[0] *= scaling
+                fit_data.append((name, param_vec, rr2, k, np.nan, np.nan,
+                                 FitResults.NO_CONVERGENCE, name_id, offset,
+                                 dict()))
                 continue
 
             if verbose:
@@ -1086,20 +1500,33 @@ class Surge:
                 print('Fitting coeff. of det. R2 = %1.3f'%rr2)
                 print('')
 
-            assert_true(param_vec[0] > 0.0)
-            assert_true(param_vec[1] > 0.0)
-            assert_true(param_vec[2] < 0.0)
+            assert_true(growth_model.valid(param_vec))
 
             param_vec[0] *= scaling
             icases *= scaling
 
+            scaling_vec = np.ones(param_vec.size)
+            scaling_vec[0] = scaling
+            param_cov = param_cov * np.outer(scaling_vec, scaling_vec)
+            sigma2 = sigma2 * scaling**2
+
             if verbose:
                 print('')
                 print('Unscaled root =', param_vec)
                 print('')
 
-            # Compute critical times
-            (tcc, dtc) = self.report_critical_times(param_vec, name, verbose=verbose)
+            # Critical times and their standard errors
+            if verbose:
+                self.report_critical_times(param_vec, name, verbose=True)
+                self.report_critical_times_se(param_vec, param_cov,
+                                              verbose=True)
+
+            tcc = critical['tcc'][fit_id]
+            dtc = critical['dtc'][fit_id]
+            grad_tcc = critical['tcc_grad'][fit_id]
+            grad_dtc = critical['dtc_grad'][fit_id]
+            tcc_se = math.sqrt(grad_tcc @ param_cov @ grad_tcc)
+            dtc_se = math.sqrt(grad_dtc @ param_cov @ grad_dtc)
 
             if tcc > times[-1]:
                 if verbose:
@@ -1110,7 +1537,10 @@ class Surge:
                 #assert int(tcc-dtc)+1 <= dates.size,\
                         #'\n\n value = %r; dates.sizes = %r; times.size = %r'%(int(tcc-dtc)+1,dates.size,times.size)
 
-                names_no_peak_surge_period.append((name, tcc, dtc, times[-1], dates[-1]))
+                names_no_peak_surge_period.append((name, tcc, dtc, times[-1], format_dates(dates[-1])))
+                fit_data.append((name, param_vec, rr2, k, tcc, dtc,
+                                 FitResults.BEFORE_PEAK, name_id, offset,
+                                 dict()))
                 continue
 
             if tcc + dtc > times[-1]:
@@ -1119,7 +1549,10 @@ class Surge:
                     print('WARNING: Time at mininum acceleration exceeds time data.')
                     print('WARNING: Skipping this data set.')
                 assert_true(int(tcc)+1 <= dates.size)
-                names_past_peak_surge_period.append((name, tcc, dates[int(tcc)+1], dtc))
+                names_past_peak_surge_period.append((name, tcc, format_dates(dates[int(tcc)+1]), dtc))
+                fit_data.append((name, param_vec, rr2, k, tcc, dtc,
+                                 FitResults.PAST_PEAK, name_id, offset,
+                                 dict()))
                 continue
 
             top_id += 1
@@ -1144,24 +1577,33 @@ class Surge:
                 self.report_error_analysis(param_vec, tcc, dtc, name)
 
             # 60-day look-ahead
-            n_prediction_days = 60
+            total_deaths_predicted = int(forecasts[fit_id])
 
-            last_day = dates.size
-            total_deaths_predicted = int(self.sigmoid_func(n_prediction_days + last_day, param_vec))
+            # standard error of the look-ahead and 95% prediction interval
+            grad_p_f = -forecast_j[fit_id, 0]
+            forecast_se = math.sqrt(grad_p_f @ param_cov @ grad_p_f)
+            forecast_pi = total_deaths_predicted + \
+                1.96*math.sqrt(forecast_se**2 + sigma2)*np.array([-1, 1])
 
             if verbose:
                 print('')
-                print('Estimated cumulative deaths in %s days from %s = %6i'%(n_prediction_days, dates[-1], total_deaths_predicted))
-                print('# of cumulative deaths today, %s               = %6i'%(dates[-1], icases[-1]))
+                print('Estimated cumulative deaths in %s days from %s = %6i'%(n_prediction_days, format_dates(dates[-1]), total_deaths_predicted))
+                print('95%% prediction interval                          = [%6i, %6i]'%tuple(forecast_pi))
+                print('# of cumulative deaths today, %s               = %6i'%(format_dates(dates[-1]), icases[-1]))
                 print('')
 
+            extras = {'param_cov': param_cov, 'tcc_se': tcc_se,
+                      'dtc_se': dtc_se, 'forecast': total_deaths_predicted,
+                      'forecast_se': forecast_se, 'forecast_pi': forecast_pi}
+            if bootstrap:
+                scaled_param_vec = np.array(param_vec)
+                scaled_param_vec[0] /= scaling
+                extras.update(self.__bootstrap_intervals(
+                    icases/scaling, scaled_param_vec, scaling, bootstrap,
+                    solver, k_max, rel_tol))
 
-            fit_data.append([name,
-                             dates,
-                             icases,
-                             param_vec,
-                             tcc,
-                             dtc])
+            fit_data.append((name, param_vec, rr2, k, tcc, dtc,
+                             FitResults.OK, name_id, offset, extras))
 
         if verbose:
             print('Names with significant deaths past peak in surge period:')
@@ -1191,16 +1633,17 @@ class Surge:
                 print('%15s deaths = %5.2f'%(name, case))
 
         # Order fit_data
+        columns = list(zip(*fit_data)) if fit_data else [[]]*10
+        fit_data = FitResults(columns[0],
+                              np.array(columns[1]).reshape(
+                                  -1, growth_model.n_params),
+                              *columns[2:], self.dates, cases,
+                              self.trim_rel_small_n_cases)
 
-        #sorted_by_max_rel_death_rate = sorted(
-        #     [ (self.__sigmoid_func_prime(i[4],i[3])/i[3][0]*100, i )
-        #        for i in fit_data ], key = lambda entry: entry[0], reverse=True )
-
-        sorted_by_surge_period =\
-            sorted([(2*i[5], i) for i in fit_data],
-                   key=lambda entry: entry[0], reverse=False)
+        if not rejected:
+            fit_data = fit_data[fit_data.status == FitResults.OK]
 
-        sorted_fit_data = sorted_by_surge_period
+        sorted_fit_data = fit_data.sort('surge_period')
 
         if verbose:
             print('')
@@ -1210,13 +1653,448 @@ class Surge:
 
         return sorted_fit_data
 
+    def backtest(self, start=None, stop=None, step=1, n_forecast=60,
+                 n_batch_dates=7, solver='newton', n_jobs=1):
+        """Fit all communities for a range of end dates of the data.
+
+        The data of each community are selected, trimmed and scaled for each
+        end date as in `multi_fit_data`. The fits of `n_batch_dates`
+        consecutive end dates are solved together (see
+        `parallel_fit_sigmoids`), each warm started from the last converged
+        fit of its community at an earlier end date past the time at
+        maximum growth rate; failed warm started fits are fitted again from
+        the initial guess. Fits that do not converge or are not a growing
+        sigmoid are `nan`. Dates, data and critical times are relative to
+        the date range of the object.
+
+        Parameters
+        ----------
+        start: str, datetime.date or numpy.datetime64
+            First end date. Default: `None` (first date).
+        stop: str, datetime.date or numpy.datetime64
+            Last end date (included). Default: `None` (last date).
+        step: int
+            Days between end dates. Default: 1.
+        n_forecast: int
+            Days after the end date of the forecast. Default: 60.
+        n_batch_dates: int
+            Number of end dates fitted in each batch. Default: 7.
+        solver: str
+            Nonlinear least-squares method; see `multi_fit_data`.
+            Default: 'newton'.
+        n_jobs: int
+            Number of worker processes; see `multi_fit_data`. Default: 1.
+
+        Returns
+        -------
+        backtest: dict
+            'end_dates': numpy.ndarray(datetime64[D]) of the end dates;
+            'names': list of the communities (as in `names`); and arrays
+            (end date x community) of: 'tcc', time at maximum growth rate
+            in days since `dates[0]`; 'dtc', half surge period; 'rr2',
+            coefficient of determination; 'k', iterations (0 if not
+            fitted); 'forecast', cumulative cases `n_forecast` days after
+            the end date; 'forecast_error', forecast minus the data at that
+            date (`nan` past the last date).
+        """
+
+        assert_in(solver, NLLS_SOLVERS)
+        assert_true(step >= 1 and n_forecast >= 1 and n_batch_dates >= 1)
+
+        names = self.names
+        dates = self.dates
+        cases = self.cases
+
+        start_id = 0
+        if start is not None:
+            start_id = np.searchsorted(dates, self.__datetime64(start), 'left')
+        stop_id = dates.size - 1
+        if stop is not None:
+            stop_id = np.searchsorted(dates, self.__datetime64(stop),
+                                      'right') - 1
+        end_ids = np.arange(start_id, stop_id+1, step)
+
+        shape = (end_ids.size, len(names))
+        backtest = {'end_dates': dates[end_ids], 'names': list(names),
+                    'k': np.zeros(shape, dtype=int)}
+        for key in ('tcc', 'dtc', 'rr2', 'forecast', 'forecast_error'):
+            backtest[key] = np.full(shape, np.nan)
+
+        k_max = 25
+        rel_tol = 0.01 / 100.0 # (0.1%)
+
+        growth_model = GROWTH_MODELS[self.model]
+
+        def converged(param_vec, k):
+            """Converged to a growing sigmoid (asserted in `multi_fit_data`)."""
+            return k <= k_max and growth_model.valid(param_vec)
+
+        # last converged fit of each community past the time at maximum
+        # growth rate: scaled parameters, scaling and first date id of the
+        # trimmed data
+        warm_param_mtrx = np.full((len(names), growth_model.n_params), np.nan)
+        warm_scalings = np.ones(len(names))
+        warm_first_ids = np.zeros(len(names), dtype=int)
+
+        for batch_start in range(0, end_ids.size, n_batch_dates):
+
+            # Prepare the data of each end date and community
+            fit_inputs = list()
+
+            for row in range(batch_start,
+                             min(batch_start+n_batch_dates, end_ids.size)):
+                end_id = end_ids[row]
+
+                for (name_id, icases) in enumerate(cases[:end_id+1].T):
+
+                    population = None
+                    if self.populations is not None:
+                        population = self.populations[name_id]
+
+                    (nz_cases_ids, icases, rejection) = self.__select_cases(
+                        icases, population, growth_model.n_params)
+                    if rejection is not None:
+                        continue
+
+                    scaling = icases.max()
+                    icases /= scaling
+
+                    first_id = nz_cases_ids[0]
+                    param_vec_0 = growth_model.initial_guess(icases)
+                    warm_param_vec_0 = None
+                    if not np.isnan(warm_param_mtrx[name_id, 0]):
+                        warm_param_vec_0 = shift_sigmoid_params(
+                            warm_param_mtrx[name_id],
+                            warm_scalings[name_id]/scaling,
+                            first_id - warm_first_ids[name_id])
+
+                    fit_inputs.append((row, name_id, first_id, icases,
+                                       scaling, param_vec_0,
+                                       warm_param_vec_0))
+
+            # Fit all end dates and communities of the batch; warm started
+            # fits that fail are fitted again from the initial guess
+            fits = parallel_fit_sigmoids(
+                [icases for (_, _, _, icases, _, _, _) in fit_inputs],
+                [p_0 if w_p_0 is None else w_p_0
+                 for (_, _, _, _, _, p_0, w_p_0) in fit_inputs],
+                k_max, rel_tol, True, solver, n_jobs, self.model)
+
+            fit_ids = [i for (i, (param_vec, rr2, k)) in enumerate(fits)
+                       if fit_inputs[i][6] is not None and
+                       not converged(param_vec, k)]
+
+            refits = parallel_fit_sigmoids(
+                [fit_inputs[i][3] for i in fit_ids],
+                [fit_inputs[i][5] for i in fit_ids],
+                k_max, rel_tol, True, solver, n_jobs, self.model)
+
+            for (i, fit) in zip(fit_ids, refits):
+                fits[i] = fit
+
+            critical = critical_times(
+                np.reshape([param_vec for (param_vec, _, _) in fits],
+                           (-1, growth_model.n_params)),
+                self.model, debug=self.debug)
+
+            # Post-process in end date order; the last fit is the warm start
+            for (fit_id, ((row, name_id, first_id, icases, scaling, _, _),
+                          (param_vec, rr2, k))) in \
+                    enumerate(zip(fit_inputs, fits)):
+
+                backtest['k'][row, name_id] = k
+
+                if not converged(param_vec, k):
+                    continue
+
+                tcc = critical['tcc'][fit_id]
+
+                # only fits past the peak growth rate are warm starts
+                if tcc <= icases.size - 1:
+                    warm_param_mtrx[name_id] = param_vec
+                    warm_scalings[name_id] = scaling
+                    warm_first_ids[name_id] = first_id
+
+                backtest['tcc'][row, name_id] = first_id + tcc
+                backtest['dtc'][row, name_id] = critical['dtc'][fit_id]
+                backtest['rr2'][row, name_id] = rr2
+
+                forecast_id = end_ids[row] + n_forecast
+                forecast = self.sigmoid_func(icases.size - 1 + n_forecast,
+                                             shift_sigmoid_params(
+                                                 param_vec, scaling, 0.0))
+                backtest['forecast'][row, name_id] = forecast
+                if forecast_id < dates.size:
+                    backtest['forecast_error'][row, name_id] = \
+                        forecast - cases[forecast_id, name_id]
+
+        return backtest
+
+    def compare_models(self, models=None, blocked_list=None, solver='newton',
+                       n_jobs=1):
+        """Fit growth models to each community and rank them by AIC.
+
+        The data of each community are selected, trimmed and scaled as in
+        `multi_fit_data`. Each model fits all communities in one batch (see
+        `parallel_fit_sigmoids`) from its initial guess. The fits are ranked
+        by the Akaike information criterion `n ln(RSS/n) + 2 n_params` of
+        the `n` data and residual sum of squares `RSS`; fits that do not
+        converge or are not a growing sigmoid are left out.
+
+        Parameters
+        ----------
+        models: list(str)
+            Keys of `GROWTH_MODELS`. Default: `None` (all models).
+        blocked_list: list
+            List of names of communities to be blocked from fitting.
+        solver: str
+            Nonlinear least-squares method; see `multi_fit_data`.
+            Default: 'newton'.
+        n_jobs: int
+            Number of worker processes; see `multi_fit_data`. Default: 1.
+
+        Returns
+        -------
+        ranking: dict
+            For each community fitted, a list of `(aic, model, param_vec,
+            rr2)` sorted by increasing `aic` (best model first); `param_vec`
+            is unscaled.
+        """
+
+        if models is None:
+            models = list(GROWTH_MODELS)
+        for model in models:
+            assert_in(model, GROWTH_MODELS)
+        assert_in(solver, NLLS_SOLVERS)
+
+        if blocked_list is None:
+            blocked_list = list()
+
+        k_max = 25
+        rel_tol = 0.01 / 100.0 # (0.1%)
+
+        # Prepare the data of each community; the same communities for all
+        # models
+        n_params = max(GROWTH_MODELS[model].n_params for model in models)
+        fit_inputs = list()
+
+        for (name_id, name) in enumerate(self.names):
+
+            if name in blocked_list:
+                continue
+
+            population = None
+            if self.populations is not None:
+                population = self.populations[name_id]
+
+            (_, icases, rejection) = self.__select_cases(
+                self.cases[:, name_id], population, n_params)
+            if rejection is not None:
+                continue
+
+            scaling = icases.max()
+            fit_inputs.append((name, icases/scaling, scaling))
+
+        ranking = {name: list() for (name, _, _) in fit_inputs}
+
+        for model in models:
+
+            growth_model = GROWTH_MODELS[model]
+
+            fits = parallel_fit_sigmoids(
+                [icases for (_, icases, _) in fit_inputs],
+                [growth_model.initial_guess(icases)
+                 for (_, icases, _) in fit_inputs],
+                k_max, rel_tol, True, solver, n_jobs, model)
+
+            for ((name, icases, scaling), (param_vec, rr2, k)) in \
+                    zip(fit_inputs, fits):
+
+                if k > k_max or not growth_model.valid(param_vec):
+                    continue
+
+                r_vec = np.empty(icases.size)
+                growth_model.kernel(np.array(range(icases.size),
+                                             dtype=np.float64),
+                                    icases, param_vec, r_vec)
+                rss = (r_vec @ r_vec)*scaling**2
+                aic = icases.size*math.log(rss/icases.size) + \
+                      2*growth_model.n_params
+
+                param_vec = np.array(param_vec)
+                param_vec[0] *= scaling
+                ranking[name].append((aic, model, param_vec, rr2))
+
+        for name in list(ranking):
+            if ranking[name]:
+                ranking[name].sort(key=lambda entry: entry[0])
+            else:
+                del ranking[name]
+
+        return ranking
+
+    def multi_fit_waves(self, blocked_list=None, solver='newton', batch=True,
+                        n_jobs=1, window=7, min_wave_days=28):
+        """Fit a sum of sigmoids, one per wave, to each community.
+
+        The waves of all communities are detected at once by `detect_waves`.
+        The data of each community are then selected, trimmed and scaled as
+        in `multi_fit_data` and fitted by a `WavesModel` of its number of
+        waves from `WavesModel.initial_guess`. Communities with the same
+        number of waves are fitted in one batch (see
+        `parallel_fit_sigmoids`). Fits that do not converge or with a wave
+        that is not a growing sigmoid are left out.
+
+        Parameters
+        ----------
+        blocked_list: list
+            List of names of communities to be blocked from fitting.
+        solver: str
+            Nonlinear least-squares method: 'newton' or 'lm' (variable
+            projection needs a single linear parameter). Default: 'newton'.
+        batch: bool
+            Fit communities with the same number of waves simultaneously.
+            Default: True.
+        n_jobs: int
+            Number of worker processes; see `multi_fit_data`. Default: 1.
+        window: int
+            Days of the moving average of the daily cases; see
+            `detect_waves`. Default: 7.
+        min_wave_days: int
+            Days on each side of the start of a wave; see `detect_waves`.
+            Default: 28.
+
+        Returns
+        -------
+        waves: dict
+            For each community fitted, a dictionary of the 'dates' and
+            'cases' of the trimmed data, the unscaled 'param_vec' of the
+            `WavesModel` fit, 'rr2' and 'k' as in `newton_nlls_solve`, and
+            arrays over the waves of: 'start_dates', first date; 'tcc', time
+            at maximum growth rate in days since the first date; 'dtc', half
+            surge period.
+        """
+
+        if blocked_list is None:
+            blocked_list = list()
+
+        name_ids = [i for (i, name) in enumerate(self.names)
+                    if name not in blocked_list]
+        populations = None
+        if self.populations is not None:
+            populations = self.populations[name_ids]
+
+        return self.__fit_waves([self.names[i] for i in name_ids],
+                                self.cases[:, name_ids], populations, solver,
+                                batch, n_jobs, window, min_wave_days)
+
+    def fit_waves(self, name=None, solver='newton', window=7,
+                  min_wave_days=28):
+        """Fit a sum of sigmoids, one per wave, to one community.
+
+        Parameters
+        ----------
+        name: str
+            Name of the community. `None` will combine
+            all communities. Default: `None`.
+
+        Other parameters as in `multi_fit_waves`.
+
+        Returns
+        -------
+        waves: dict
+            Fit of the community as in `multi_fit_waves`; `None` if the fit
+            fails.
+        """
+
+        (cases, population) = self.__community(name)
+
+        populations = None if population is None else [population]
+        waves = self.__fit_waves([name], cases[:, np.newaxis], populations,
+                                 solver, False, 1, window, min_wave_days)
+
+        return waves.get(name)
+
+    def __fit_waves(self, names, cases_mtrx, populations, solver, batch,
+                    n_jobs, window, min_wave_days):
+        """Sum-of-sigmoids fits of the columns of `cases_mtrx`; see
+        `multi_fit_waves`."""
+
+        assert_in(solver, ('newton', 'lm'))
+
+        k_max = 25
+        rel_tol = 0.01 / 100.0 # (0.1%)
+
+        wave_starts = detect_waves(cases_mtrx, window, min_wave_days)
+
+        # Prepare the data of each community; grouped by number of waves
+        fit_inputs = dict()
+
+        for (name_id, name) in enumerate(names):
+
+            population = None
+            if populations is not None:
+                population = populations[name_id]
+
+            (nz_cases_ids, icases, rejection) = self.__select_cases(
+                cases_mtrx[:, name_id], population, 3)
+            if rejection is not None:
+                continue
+
+            starts = np.flatnonzero(wave_starts[nz_cases_ids, name_id])
+            starts = starts[starts > 0]
+
+            # the same rule for the parameters of all waves
+            if icases.size <= WavesModel(starts.size+1).n_params:
+                continue
+
+            scaling = icases.max()
+            icases /= scaling
+
+            param_vec_0 = WavesModel(starts.size+1).initial_guess(
+                icases, starts, window)
+
+            fit_inputs.setdefault(starts.size+1, list()).append(
+                (name, nz_cases_ids, icases, scaling, starts, param_vec_0))
+
+        # Fit each number of waves in one batch
+        waves = dict()
+
+        for (n_waves, inputs) in sorted(fit_inputs.items()):
+
+            growth_model = WavesModel(n_waves)
+
+            fits = parallel_fit_sigmoids(
+                [icases for (_, _, icases, _, _, _) in inputs],
+                [param_vec_0 for (_, _, _, _, _, param_vec_0) in inputs],
+                k_max, rel_tol, batch, solver, n_jobs, growth_model)
+
+            for ((name, nz_cases_ids, icases, scaling, starts, _),
+                 (param_vec, rr2, k)) in zip(inputs, fits):
+
+                if k > k_max or not growth_model.valid(param_vec):
+                    continue
+
+                (tcc, t_max, t_min) = growth_model.critical_times(param_vec)
+
+                param_vec = np.array(param_vec)
+                param_vec[0::3] *= scaling
+                dates = self.dates[nz_cases_ids]
+
+                waves[name] = {'dates': dates, 'cases': icases*scaling,
+                               'param_vec': param_vec, 'rr2': rr2, 'k': k,
+                               'start_dates': dates[np.append(0, starts)],
+                               'tcc': tcc, 'dtc': (t_min - t_max)/2}
+
+        return {name: waves[name] for name in names if name in waves}
+
     def plot_multi_fit_data(self, fit_data, option=None, save=False):
         """Plot joint experimental data or joint sigmoid fit for communities.
 
         Parameters
         ----------
-        fit_data: list(tuple)
-            List of tuples obtained from the `multi_fit_data` member function.
+        fit_data: FitResults
+            Fits obtained from the `multi_fit_data` member function.
         option: str
             Either `experimental` or `fit`. The default does nothing.
         save: bool
@@ -1233,8 +2111,7 @@ class Surge:
 
             colors = color_map(len(fit_data))
 
-            for (sort_key, data) in fit_data:
-                color = colors[fit_data.index((sort_key, data))]
+            for (color, (sort_key, data)) in zip(colors, fit_data):
                 state = data[0]
                 n_dates = data[1].size
                 param_vec = data[3]
@@ -1263,7 +2140,7 @@ class Surge:
                 data_name = 'Countries'
 
             plt.title('COVID-19 Pandemic 2020 for '+data_name+
-                      ' w/ Evolved Mortality ('+data[1][-1]+')', fontsize=20)
+                      ' w/ Evolved Mortality ('+format_dates(data[1][-1])+')', fontsize=20)
 
             plt.show()
             if save:
@@ -1284,15 +2161,16 @@ class Surge:
 
             colors = color_map(len(fit_data))
 
-            for (sort_key, data) in fit_data:
-                color = colors[fit_data.index((sort_key, data))]
+            critical = critical_times(fit_data.param_mtrx, self.model)
+
+            for (color, t1, t2, (sort_key, data)) in \
+                    zip(colors, critical['t_max_accel'],
+                        critical['t_min_accel'], fit_data):
                 state = data[0]
                 n_dates = data[1].size
                 param_vec = data[3]
                 tshift = data[4]
 
-                t1 = tshift - data[5]
-                t2 = tshift + data[5]
                 value = '%1.1f'%sort_key
 
                 ax1.plot(np.array(range(n_dates))-tshift, self.sigmoid_func(np.array(range(n_dates)), param_vec)/param_vec[0],
@@ -1320,7 +2198,7 @@ class Surge:
                 data_name = 'Countries'
 
             plt.title('COVID-19 Pandemic 2020 for '+ data_name+
-                      ' w/ Evolved Mortality ('+data[1][-1]+')', fontsize=20)
+                      ' w/ Evolved Mortality ('+format_dates(data[1][-1])+')', fontsize=20)
 
             plt.show()
             if save:
@@ -1338,10 +2216,10 @@ class Surge:
 
         Parameters
         ----------
-        sorted_fit_data: list(tuple)
-            List of tuples obtained from the `multi_fit_data` member function.
+        sorted_fit_data: FitResults
+            Fits obtained from the `multi_fit_data` member function.
         bin_width: float or int
-            Width of the sorting key in `sorted_fit_data` first elmenet.
+            Width of the bins of the surge periods in `sorted_fit_data`.
         option: str
             The `surge_period` option clusters the data in integer bins.
 
@@ -1359,8 +2237,8 @@ class Surge:
 
         """
 
-        max_value = max([key for (key, data) in sorted_fit_data])
-        min_value = min([key for (key, data) in sorted_fit_data])
+        max_value = sorted_fit_data.surge_period.max()
+        min_value = sorted_fit_data.surge_period.min()
 
         if len(sorted_fit_data) == 1:
             bins = {0:[float(int(min_value)), float(int(max_value)+1)]}
@@ -1426,8 +2304,8 @@ class Surge:
             Dictionary with keys equal to the group `id` and values equal
             to lists of names of communities. User must create this data
             structure. See `examples/`.
-        fit_data: list(tuple)
-            Fit data structure as created by `multi_fit_data`.
+        fit_data: FitResults
+            Fits as created by `multi_fit_data`.
 
         save: bool
             Save plot in a `png` image file.
@@ -1441,22 +2319,16 @@ class Surge:
             fig, ax1 = plt.subplots(1, figsize=(20, 8))
             colors = color_map(len(states))
 
-            for state in states:
-                color = colors[states.index(state)]
+            for (color, state) in zip(colors, states):
 
-                for (sort_key_i, data_i) in fit_data:
-
-                    if data_i[0] != state:
-                        continue
-                    else:
-                        sort_key = sort_key_i
-                        data = data_i
+                data = fit_data[state]
+                sort_key = 2*data[5]
 
                 n_dates = data[1].size
                 param_vec = data[3]
                 tshift = data[4]
-                ti1 = tshift - data[5]
-                ti2 = tshift + data[5]
+                (_, ti1, ti2) = \
+                    GROWTH_MODELS[self.model].critical_times(param_vec)
                 sort_value = '%1.1f'%sort_key
 
                 ax1.plot(np.array(range(n_dates))-tshift,
@@ -1492,7 +2364,7 @@ class Surge:
                 data_name = 'Countries'
 
             plt.title('COVID-19 Pandemic 2020 for '+data_name+
-                      ' w/ Evolved Mortality ('+data[1][-1]+')', fontsize=20)
+                      ' w/ Evolved Mortality ('+format_dates(data[1][-1])+')', fontsize=20)
 
             plt.show()
             if save:
@@ -1510,23 +2382,19 @@ class Surge:
 
         Parameters
         ----------
-        fit_data: list(tuple)
-            Fit data structure as created by `multi_fit_data`.
+        fit_data: FitResults
+            Fits as created by `multi_fit_data`.
         bins: dict(list)
         """
 
         #plt.rcParams['figure.figsize'] = [20, 4]
         fig, ax = plt.subplots(figsize=(20, 6))
 
-        surge_periods = list()
-        states = list()
+        surge_periods = fit_data.surge_period
+        states = fit_data.names
 
-        for (key, data) in fit_data:
-            surge_periods.append(2*data[5])
-            states.append(data[0])
-
-        mean = np.mean(np.array(surge_periods))
-        std  = np.std(np.array(surge_periods))
+        mean = np.mean(surge_periods)
+        std  = np.std(surge_periods)
 
         # created sorted list
         sorted_list = sorted(zip(states, surge_periods),
@@ -1582,7 +2450,7 @@ class Surge:
             data_name = 'Countries'
 
         plt.title('COVID-19 Pandemic 2020 for '+data_name+
-                  ' w/ Evolved Mortality ('+data[1][-1]+')', fontsize=20)
+                  ' w/ Evolved Mortality ('+format_dates(fit_data.dates[-1])+')', fontsize=20)
 
         plt.tight_layout(1)
 
@@ -1597,6 +2465,14 @@ class Surge:
 
         return
 
+    def __cases_label(self):
+        """Axis label of the cumulative cases."""
+
+        if self.case_type == 'confirmed':
+            return 'Cumulative Confirmed Cases []'
+
+        return 'Cumulative Deaths []'
+
     def __filename(self, name):
 
         filename = name.lower().strip().split(' ')
@@ -1613,221 +2489,1627 @@ class Surge:
 
         return filename
 
-def get_covid_us_data(sub_locale=None, case_type='deaths', save_html=False):
-    """COVID-19 data loader.
+def get_cache_dir(cache_dir=None):
+    """Return the directory of the on-disk download cache.
 
-    Load COVID-19 pandemic cumulative data from:
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Cache directory. `None` will use the `COVID_SURGE_CACHE_DIR`
+        environment variable, if set, or `~/.cache/covid-surge`.
 
-     `https://github.com/CSSEGISandData/COVID-19`.
+    Returns
+    -------
+    cache_dir: str
+        Absolute path of the (existing) cache directory.
+    """
+
+    if cache_dir is None:
+        cache_dir = os.environ.get('COVID_SURGE_CACHE_DIR',
+                                   os.path.join('~', '.cache', 'covid-surge'))
+
+    cache_dir = os.path.abspath(os.path.expanduser(cache_dir))
+    os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+
+    return cache_dir
+
+def get_data_file(source, cache_dir=None, offline=False, ttl=3600):
+    """Return a local path to the data file in `source`.
+
+    Remote files are kept in a content-addressed cache directory: the file
+    contents are stored under their SHA-256 digest and a small JSON record
+    per URL keeps the digest, the `ETag` and `Last-Modified` headers of the
+    server, and the time of the last check. A cached copy younger than `ttl`
+    seconds is used as is; otherwise the server is asked for the file with a
+    conditional request and the body is downloaded only if it changed.
 
     Parameters
     ----------
-    case_type:  str, optional
-            Type of data. Deaths ('deaths') and confirmed cases
-            ('confirmed'). Default: 'deaths'.
+    source: str
+        Local path, `file://` URL, or `http(s)://` URL.
+    cache_dir: str, optional
+        Cache directory. See `get_cache_dir`.
+    offline: bool, optional
+        Never access the network. A cached copy of a remote `source` must
+        exist. The `COVID_SURGE_OFFLINE` environment variable set to `1`
+        has the same effect.
+        Default: False
+    ttl: float, optional
+        Time to live of a cached copy in seconds. A negative value always
+        validates the cached copy with the server.
+        Default: 3600
 
     Returns
     -------
-    data: tuple(int, list(str), list(int))
-           (population, dates, cases)
+    path: str
+        Local path to the data file.
     """
-    if case_type == 'deaths':
 
-        dtf = pd.read_csv('https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_deaths_US.csv')
-        if save_html:
-            dtf.to_html('covid_19_deaths.html')
+    url = urllib.parse.urlparse(source)
+
+    if url.scheme == 'file':
+        return urllib.request.url2pathname(url.path)
+    if url.scheme not in ('http', 'https'):
+        return source
+
+    offline = offline or os.environ.get('COVID_SURGE_OFFLINE', '0') == '1'
+
+    cache_dir = get_cache_dir(cache_dir)
+
+    record_file = os.path.join(cache_dir,
+                               hashlib.sha1(source.encode()).hexdigest()+'.json')
+    record = None
+    if os.path.isfile(record_file):
+        with open(record_file, 'r') as fh:
+            record = json.load(fh)
+        cached_file = os.path.join(cache_dir, 'objects', record['sha256'])
+        if not os.path.isfile(cached_file):
+            record = None
+
+    if offline:
+        assert_true(record is not None,
+                    'offline mode: no cached copy of %r in %r'%(source,
+                                                                cache_dir))
+        return cached_file
+
+    if record is not None and time.time() - record['checked'] < ttl:
+        return cached_file
+
+    request = urllib.request.Request(source)
+    if record is not None:
+        if record.get('etag'):
+            request.add_header('If-None-Match', record['etag'])
+        if record.get('last_modified'):
+            request.add_header('If-Modified-Since', record['last_modified'])
+
+    try:
+        with urllib.request.urlopen(request) as response:
+            content = response.read()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+    except urllib.error.HTTPError as err:
+        if err.code != 304:
+            raise
+        content = None  # not modified
+    except urllib.error.URLError as err:
+        if record is None:
+            raise
+        print('WARNING: %r unreachable (%s); using cached copy.'%(source,
+                                                                 err.reason))
+        return cached_file
+
+    if content is None:
+        record['checked'] = time.time()
+    else:
+        sha256 = hashlib.sha256(content).hexdigest()
+        cached_file = os.path.join(cache_dir, 'objects', sha256)
+        if not os.path.isfile(cached_file):
+            tmp_file = cached_file+'.tmp%i'%os.getpid()
+            with open(tmp_file, 'wb') as fh:
+                fh.write(content)
+            os.replace(tmp_file, cached_file)
+        record = {'url': source, 'sha256': sha256, 'etag': etag,
+                  'last_modified': last_modified, 'checked': time.time()}
+
+    tmp_file = record_file+'.tmp%i'%os.getpid()
+    with open(tmp_file, 'w') as fh:
+        json.dump(record, fh)
+    os.replace(tmp_file, record_file)
+
+    return cached_file
+
+def read_covid_csv(locale, case_type, data_source=None, cache_dir=None,
+                   offline=False, **kwargs):
+    """Read a COVID-19 time series CSV file into a `pandas.DataFrame`.
 
-    elif case_type == 'confirmed':
+    Parameters
+    ----------
+    locale: str
+        Values: 'US' or 'global'.
+    case_type: str
+        Type of data. Deaths ('deaths') and confirmed cases ('confirmed').
+    data_source: str, optional
+        Location of the file; see `get_data_file`. `None` will use the
+        Johns Hopkins CSSE repository file for `locale` and `case_type`.
+    cache_dir: str, optional
+        See `get_data_file`.
+    offline: bool, optional
+        See `get_data_file`.
+    kwargs: dict
+        Additional arguments to `pandas.read_csv`.
 
-        dtf = pd.read_csv('https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_confirmed_US.csv')
-        dtf_pop = pd.read_csv('https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_deaths_US.csv')
-        if save_html:
-            dtf.to_html('covid_19_confirmed.html')
+    Returns
+    -------
+    dtf: pandas.DataFrame
+    """
 
-    else:
-        assert_true(False,
-        'invalid query type: %r (valid: "deaths", "confirmed"'%(case_type))
+    if data_source is None:
+        assert_in((locale, case_type), JHU_FILENAMES)
+        data_source = JHU_TIME_SERIES_URL + JHU_FILENAMES[(locale, case_type)]
 
-    dtf = dtf.drop(['UID', 'iso2', 'iso3', 'Combined_Key', 'code3', 'FIPS', 'Lat', 'Long_', 'Country_Region'], axis=1)
+    path = get_data_file(data_source, cache_dir=cache_dir, offline=offline)
 
-    dtf = dtf.rename(columns={'Province_State':'state/province', 'Admin2':'county'})
+    return pd.read_csv(path, **kwargs)
 
-    state_names = list()
-    state_names_tmp = list()
+def get_us_population_table(cache_dir=None, offline=False, data_source=None,
+                            update=False):
+    """Return the population of US counties keyed by UID.
 
-    for (i, istate) in enumerate(dtf['state/province']):
+    Only the deaths data file has a `Population` column. The table is
+    extracted from it once and saved in the cache directory under a digest
+    of the local deaths file (path, size and modification time); later
+    calls with the same deaths file, e.g. every load of confirmed cases,
+    read the small table instead. A new or updated deaths file gets its own
+    table.
 
-        if istate.strip() == 'Wyoming' and dtf.loc[i, 'county'] == 'Weston':
-            break
+    Parameters
+    ----------
+    cache_dir: str, optional
+        Directory of the download cache; see `get_cache_dir`.
+    offline: bool, optional
+        Use cached or local files only. Default: False.
+    data_source: str, optional
+        Location of the US deaths data file; see `get_data_file`.
+        Default: None (Johns Hopkins CSSE repository).
+    update: bool, optional
+        Extract the table again from the deaths data file.
+        Default: False
 
-        state_names_tmp.append(istate)
+    Returns
+    -------
+    population: pandas.Series
+        Population indexed by the UID of the counties.
+    """
 
-    state_names_set = set(state_names_tmp)
+    if data_source is None:
+        data_source = JHU_TIME_SERIES_URL + JHU_FILENAMES[('US', 'deaths')]
 
-    state_names = list(state_names_set)
-    state_names = sorted(state_names)
+    path = get_data_file(data_source, cache_dir=cache_dir, offline=offline)
+    stat = os.stat(path)
+    digest = hashlib.sha1(repr((os.path.abspath(path), stat.st_size,
+                                stat.st_mtime_ns)).encode()).hexdigest()
 
-    dates = np.array(list(dtf.columns[3:]))
+    table_file = os.path.join(get_cache_dir(cache_dir),
+                              'us_population_%s.csv'%digest[:16])
 
-    if sub_locale is None:
+    if update or not os.path.isfile(table_file):
+        dtf = read_covid_csv('US', 'deaths', path, cache_dir, offline,
+                             usecols=['UID', 'Population'])
+        tmp_file = table_file+'.tmp%i'%os.getpid()
+        dtf.to_csv(tmp_file, index=False)
+        os.replace(tmp_file, table_file)
+    else:
+        dtf = pd.read_csv(table_file)
 
-        population = [0]*len(state_names)
+    return dtf.set_index('UID')['Population']
 
-        cases = np.zeros((len(dtf.columns[3:]), len(state_names)),
-                         dtype=np.float64)
+def parse_dates(dates):
+    """Return dates in the Johns Hopkins form M/D/YY as `datetime64[D]`.
 
-        for (i, istate) in enumerate(dtf['state/province']):
+    Parameters
+    ----------
+    dates: numpy.ndarray(str)
+        Dates in the numeric form M/D/YY, as in the header of the data files.
 
-            if istate.strip() == 'Wyoming' and\
-                (dtf.loc[i, 'county']).strip() == 'Weston':
-                break
+    Returns
+    -------
+    dates: numpy.ndarray(numpy.datetime64)
+        Vector of `datetime64[D]`.
+    """
 
-            state_id = state_names.index(istate)
+    return pd.to_datetime(np.asarray(dates, dtype=str),
+                          format='%m/%d/%y').to_numpy().astype('datetime64[D]')
 
-            if case_type == 'confirmed':
-                population[state_id] += int(dtf_pop.loc[i, 'Population'])
-            else:
-                population[state_id] += int(dtf.loc[i, 'Population'])
+def format_dates(dates):
+    """Return `datetime64[D]` dates as `str` in the Johns Hopkins form M/D/YY.
 
-            # Add all counties/city/towns columnwise states
-            cases[:, state_id] += np.array(list(dtf.loc[i, dtf.columns[3:]]))
+    Parameters
+    ----------
+    dates: numpy.datetime64 or numpy.ndarray(numpy.datetime64)
+        A date or a vector of dates.
 
-        return (state_names, population, dates, cases)
+    Returns
+    -------
+    dates: str or numpy.ndarray(str)
+        A `str` for a single date, otherwise a vector of `str`.
+    """
 
-    elif sub_locale in state_names:
+    dates = np.asarray(dates, dtype='datetime64[D]')
 
-        county_names = list()
-        county_names_tmp = list()
+    years = dates.astype('datetime64[Y]')
+    months = dates.astype('datetime64[M]')
 
-        for (i, istate) in enumerate(dtf['state/province']):
+    year = np.ravel(years.astype(int) + 1970)
+    month = np.ravel((months - years).astype(int) + 1)
+    day = np.ravel((dates - months).astype(int) + 1)
 
-            if istate.strip() == 'Wyoming' and dtf.loc[i, 'county'] == 'Weston':
-                break
+    labels = np.array(['%i/%i/%02i'%(m, d, y%100)
+                       for (m, d, y) in zip(month, day, year)])
 
-            if istate.strip() == sub_locale:
+    if dates.ndim == 0:
+        return str(labels[0])
 
-                county_names_tmp.append(dtf.loc[i, 'county'])
+    return labels
 
-        county_names_set = set(county_names_tmp)
+class Dataset:
+    """Base class of the parsed datasets; persistence in a binary store.
 
-        county_names = list(county_names_set)
-        county_names = sorted(county_names)
+    A store is a directory with one `.npy` file for each array attribute
+    listed in `ARRAY_ATTRIBUTES` and a `meta.json` file for the attributes
+    listed in `JSON_ATTRIBUTES`. Opening a store memory-maps the arrays
+    read-only; no CSV parsing takes place and processes opening the same
+    store share the operating system page cache.
+    """
 
-        population = [0]*len(county_names)
+    LOCALE = None
+    INFO_COLUMNS = ()  # columns of the data file other than dates
+    KEY_COLUMNS = ()   # columns needed to aggregate the date columns
+    ARRAY_ATTRIBUTES = ('cases',)
+    JSON_ATTRIBUTES = ('case_type', 'data_source', 'dates')
+    COUNT_DTYPE = np.int32  # type of the date columns when parsing
 
-        cases = np.zeros((len(dtf.columns[3:]), len(county_names)),
-                         dtype=np.float64)
+    def read_header(self, data_source=None, cache_dir=None, offline=False):
+        """Return the date columns of the data file; only the header is read.
 
-        for (i, istate) in enumerate(dtf['state/province']):
+        Parameters
+        ----------
+        data_source: str
+            Location of the data file; see `get_data_file`.
+        cache_dir: str
+            Directory of the download cache; see `get_cache_dir`.
+        offline: bool
+            Use cached or local files only. Default: False.
 
-            if istate.strip() == 'Wyoming' and dtf.loc[i, 'county'] == 'Weston':
-                break
+        Returns
+        -------
+        date_columns: list(str)
+        """
 
-            icounty = dtf.loc[i, 'county']
+        columns = read_covid_csv(self.LOCALE, self.case_type, data_source,
+                                 cache_dir, offline, nrows=0).columns
 
-            if istate.strip() == sub_locale:
+        return [col for col in columns if col not in self.INFO_COLUMNS]
 
-                county_id = county_names.index(icounty)
+    def read_columns(self, date_columns, columns=(), data_source=None,
+                     cache_dir=None, offline=False):
+        """Read the key columns, `columns` and `date_columns` of the data file.
 
-                if case_type == 'confirmed':
-                    population[county_id] += int(dtf_pop.loc[i, 'Population'])
-                else:
-                    population[county_id] += int(dtf.loc[i, 'Population'])
+        The date columns are parsed as `COUNT_DTYPE`; all other columns of
+        the file are skipped.
 
-                cases[:, county_id] = \
-                        np.array(list(dtf.loc[i, dtf.columns[3:]]))
+        Parameters
+        ----------
+        date_columns: list(str)
+            Date columns to read.
+        columns: list(str)
+            Other columns to read in addition to `KEY_COLUMNS`.
+        data_source: str
+            Location of the data file; see `get_data_file`.
+        cache_dir: str
+            Directory of the download cache; see `get_cache_dir`.
+        offline: bool
+            Use cached or local files only. Default: False.
 
-        return (county_names, population, dates, cases)
+        Returns
+        -------
+        dtf: pandas.DataFrame
+        """
 
-    else:
-        assert_in(sub_locale, state_names)
+        return read_covid_csv(self.LOCALE, self.case_type, data_source,
+                              cache_dir, offline,
+                              usecols=list(self.KEY_COLUMNS)+list(columns)+
+                              list(date_columns),
+                              dtype=dict.fromkeys(date_columns,
+                                                  self.COUNT_DTYPE))
 
-    return
+    def refresh(self, data_source=None, cache_dir=None, offline=False):
+        """Append the dates added to the data file since the last load.
 
-def get_covid_global_data(case_type='deaths', distribution=True,
-                          cumulative=False, save_html=False):
-    """COVID-19 data loader.
+        Only the header and the new date columns of the data file are
+        parsed. If the communities in the file changed, the whole file is
+        parsed again. Revisions of past dates are not picked up; construct
+        a new dataset for that.
 
-    Load COVID-19 pandemic cumulative data from:
+        Parameters
+        ----------
+        data_source: str
+            Location of the data file; see `get_data_file`. `None` will use
+            the data source of the dataset.
+        cache_dir: str
+            Directory of the download cache; see `get_cache_dir`.
+        offline: bool
+            Use cached or local files only. Default: False.
 
-        https://github.com/CSSEGISandData/COVID-19
+        Returns
+        -------
+        changed: list
+            Keys (see `keys`) of the communities with new cases in the
+            appended dates.
 
-    Parameters
-    ----------
-    case_type: str, optional
-        Type of data. Deaths ('deaths') and confirmed cases ('confirmed').
-        Default: 'deaths'.
+        Examples
+        --------
+        >>> dataset = UsDataset.open('us_deaths_store')
+        >>> changed = dataset.refresh()
+        >>> dataset.save('us_deaths_store')
+        """
 
-    distribution: bool, optional
-        Distribution of new cases over dates.
-        Default: True
+        if data_source is None:
+            data_source = self.data_source
 
-    cumulative: bool, optional
-        Cumulative number of cases over dates.
-        Default: False
+        dates = set(self.dates)
+        new_dates = [col for col in
+                     self.read_header(data_source, cache_dir, offline)
+                     if col not in dates]
 
-    Returns
-    -------
-    data: tuple(int, list(str), list(int))
-           (contry_names, dates, cases)
-    """
+        if not new_dates:
+            return list()
 
-    if cumulative is True:
-        distribution = False
+        dtf = self.read_columns(new_dates, data_source=data_source,
+                                cache_dir=cache_dir, offline=offline)
 
-    if case_type == 'deaths':
-        dtf = pd.read_csv('https://raw.githubusercontent.com/CSSEGISandData/COVID-19/master/csse_covid_19_data/csse_covid_19_time_series/time_series_covid19_deaths_global.csv')
-        if save_html:
-            dtf.to_html('covid_19_global_deaths.html')
+        (keys, cases, population) = self.aggregate(dtf, new_dates)
 
-    else:
-        assert_true(False, 'invalid query type: %r (valid: "deaths"'%(case_type))
+        if keys != self.keys():
+            self.__init__(self.case_type, data_source, cache_dir, offline,
+                          dtype=self.dtype,
+                          population_source=self.population_source)
+            return self.keys()
 
-    dtf = dtf.drop(['Lat', 'Long'], axis=1)
-    dtf = dtf.rename(columns={'Province/State':'state/province', 'Country/Region':'country/region'})
+        (changed,) = np.where(np.any(cases != self.cases[-1, :], axis=0))
 
-    country_names = list()
+        self.append(np.array(new_dates), cases)
 
-    country_names_tmp = list()
+        return [keys[i] for i in changed]
 
-    for (i, icountry) in enumerate(dtf['country/region']):
-        country_names_tmp.append(icountry)
+    def keys(self):
+        """Return the keys of the communities in the columns of `cases`."""
 
-    country_names_set = set(country_names_tmp)
+        raise NotImplementedError
 
-    country_names = list(country_names_set)
-    country_names = sorted(country_names)
+    def aggregate(self, dtf, date_columns, population=None):
+        """Aggregate the rows of a data file into community columns.
 
-    dates = np.array(list(dtf.columns[2:]))
+        Parameters
+        ----------
+        dtf: pandas.DataFrame
+            Data file contents with at least the `KEY_COLUMNS` and
+            `date_columns`.
+        date_columns: list(str)
+            Columns of dates to aggregate.
+        population: numpy.ndarray(int)
+            Population of each row of `dtf` or `None`.
 
-    cases = np.zeros((len(dtf.columns[2:]), len(country_names)),
-                     dtype=np.float64)
+        Returns
+        -------
+        data: tuple(list, numpy.ndarray, numpy.ndarray)
+            (keys, cases, population). `population` is `None` if not given.
+        """
 
-    for (i, icountry) in enumerate(dtf['country/region']):
+        raise NotImplementedError
 
-        country_id = country_names.index(icountry)
+    def append(self, dates, cases):
+        """Append rows of `dates` and `cases` to the dataset."""
 
-        cases[:, country_id] += np.array(list(dtf.loc[i, dtf.columns[2:]]))
+        self.dates = np.append(self.dates, dates)
+        self.cases = np.concatenate((self.cases, cases))
 
-    if distribution:
+        return
 
-        for j in range(cases.shape[1]):
-            cases[:, j] = np.round(np.gradient(cases[:, j]), 0)
+    def save(self, path):
+        """Save the dataset in a binary store.
 
-    return (country_names, dates, cases)
+        Parameters
+        ----------
+        path: str
+            Directory of the store; created if needed.
+        """
 
-def newton_nlls_solve(x_vec, y_vec, fit_func, grad_p_fit_func,
-                      param_vec_0,
-                      k_max=10, rel_tol=1.0e-3, verbose=True):
-    """Newton's nonlinear least-squares fitting method.
+        os.makedirs(path, exist_ok=True)
 
-    Parameters
-    ----------
-    x_vec: numpy.ndarray(float)
-        Values of the independent variable.
-    y_vec: numpy.ndarray(float)
-        Values of the dependent variable.
-    fit_func: def f(x,p):
+        # Replace files; processes may have the store memory-mapped
+        for name in self.ARRAY_ATTRIBUTES:
+            tmp_file = os.path.join(path, name+'.tmp%i.npy'%os.getpid())
+            np.save(tmp_file, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_file, os.path.join(path, name+'.npy'))
+
+        meta = {name: getattr(self, name) for name in self.JSON_ATTRIBUTES}
+        meta['dates'] = [str(date) for date in self.dates]
+        meta['class'] = type(self).__name__
+
+        tmp_file = os.path.join(path, 'meta.json.tmp%i'%os.getpid())
+        with open(tmp_file, 'w') as fh:
+            json.dump(meta, fh)
+        os.replace(tmp_file, os.path.join(path, 'meta.json'))
+
+        return
+
+    @classmethod
+    def open(cls, path):
+        """Open a binary store created with `save`.
+
+        Parameters
+        ----------
+        path: str
+            Directory of the store.
+
+        Returns
+        -------
+        dataset: Dataset
+            Dataset with memory-mapped (read-only) array attributes.
+        """
+
+        with open(os.path.join(path, 'meta.json'), 'r') as fh:
+            meta = json.load(fh)
+
+        assert_equal(meta.pop('class'), cls.__name__)
+
+        dataset = cls.__new__(cls)
+        for (name, value) in meta.items():
+            setattr(dataset, name, value)
+        dataset.dates = np.array(dataset.dates)
+
+        for name in cls.ARRAY_ATTRIBUTES:
+            setattr(dataset, name, np.load(os.path.join(path, name+'.npy'),
+                                           mmap_mode='r'))
+        dataset.dtype = dataset.cases.dtype
+
+        return dataset
+
+def open_dataset(path):
+    """Open a binary store of a `UsDataset` or `GlobalDataset`.
+
+    Parameters
+    ----------
+    path: str
+        Directory of the store. See `Dataset.save`.
+
+    Returns
+    -------
+    dataset: UsDataset or GlobalDataset
+    """
+
+    with open(os.path.join(path, 'meta.json'), 'r') as fh:
+        class_name = json.load(fh)['class']
+
+    classes = {'UsDataset': UsDataset, 'GlobalDataset': GlobalDataset}
+    assert_in(class_name, classes)
+
+    return classes[class_name].open(path)
+
+class UsDataset(Dataset):
+    """Parsed US county data shared by `Surge` objects.
+
+    The data file is parsed once into a matrix of cases with one column per
+    county. Columns are sorted by state and county so that the counties of a
+    state occupy a contiguous range of columns; `counties` hands out views of
+    that range and `states` the columnwise sums over each range.
+
+    Notes
+    -----
+    Use `get_covid_us_dataset` to obtain a dataset shared by all `Surge`
+    objects created from the same data file. Use `save` and `open` for a
+    binary store of the dataset.
+    """
+
+    LOCALE = 'US'
+    INFO_COLUMNS = ('UID', 'iso2', 'iso3', 'code3', 'FIPS', 'Admin2',
+                    'Province_State', 'Country_Region', 'Lat', 'Long_',
+                    'Combined_Key', 'Population')
+    KEY_COLUMNS = ('Admin2', 'Province_State')
+    ARRAY_ATTRIBUTES = ('cases', 'county_populations', 'state_cases',
+                        'state_populations')
+    JSON_ATTRIBUTES = ('case_type', 'data_source', 'population_source',
+                       'dates', 'state_names', 'county_names', 'state_index')
+
+    population_source = None  # stores saved without it
+
+    def __init__(self, case_type='deaths', data_source=None, cache_dir=None,
+                 offline=False, save_html=False, dtype=np.float64,
+                 population_source=None):
+        """Construct a UsDataset object.
+
+        Parameters
+        ----------
+        case_type: str
+            Type of data. Deaths ('deaths') and confirmed cases
+            ('confirmed'). Default: 'deaths'.
+        data_source: str
+            Location of the `case_type` data file; see `get_data_file`.
+            Default: None (Johns Hopkins CSSE repository).
+        cache_dir: str
+            Directory of the download cache; see `get_cache_dir`.
+        offline: bool
+            Use cached or local files only. Default: False.
+        save_html: bool
+            Save in a file, an `html` version of the data file.
+        dtype: numpy.dtype
+            Floating point type of the `cases` matrices. `numpy.float32`
+            halves their size. Default: `numpy.float64`.
+        population_source: str
+            Location of the deaths data file with the population of the
+            counties of confirmed cases; see `get_us_population_table`.
+            Default: None (Johns Hopkins CSSE repository).
+
+        Attributes
+        ----------
+        dates: numpy.ndarray(str)
+            Vector of `str` for dates in the numeric form MM/DD/YY.
+        state_names: list(str)
+            Sorted list of state names.
+        county_names: list(str)
+            List of county names sorted by state and county.
+        county_populations: numpy.ndarray(int)
+            Population of each county; `float` with `nan` for counties of
+            confirmed cases missing in the population table.
+        cases: numpy.ndarray(float)
+            Matrix of cases. Rows: `dates`; columns: `county_names`.
+        state_index: dict
+            Keys are state names and values are the `(start, stop)` range of
+            the state counties in the columns of `cases`.
+        state_cases: numpy.ndarray(float)
+            Matrix of cases. Rows: `dates`; columns: `state_names`.
+        state_populations: numpy.ndarray(int)
+            Population of each state.
+        data_source: str
+            Location of the data file. See `refresh`.
+        population_source: str
+            Location of the population data file of confirmed cases.
+        """
+
+        assert_in(case_type, ('deaths', 'confirmed'))
+
+        self.case_type = case_type
+        self.data_source = data_source
+        self.population_source = population_source
+        self.dtype = np.dtype(dtype)
+
+        if save_html:
+            dtf = read_covid_csv('US', case_type, data_source, cache_dir,
+                                 offline)
+            dtf.to_html('covid_19_%s.html'%case_type)
+
+        date_columns = self.read_header(data_source, cache_dir, offline)
+
+        if case_type == 'deaths':
+
+            dtf = self.read_columns(date_columns, ['Population'],
+                                    data_source, cache_dir, offline)
+            population = dtf['Population'].to_numpy()
+
+        else:
+
+            dtf = self.read_columns(date_columns, ['UID'], data_source,
+                                    cache_dir, offline)
+            population = get_us_population_table(cache_dir, offline,
+                                                  population_source)
+            population = population.reindex(dtf['UID']).to_numpy()
+            n_missing = np.sum(np.isnan(population))
+            if n_missing > 0:
+                print('WARNING: %i rows of %r not in the population table; '
+                      'their communities have no population.'%
+                      (n_missing, data_source))
+
+        (keys, cases, population) = self.aggregate(dtf, date_columns,
+                                                   population)
+
+        states = np.array([state for (state, county) in keys], dtype=object)
+        starts = np.flatnonzero(np.concatenate(([True],
+                                                states[1:] != states[:-1])))
+        stops = np.append(starts[1:], states.size)
+
+        self.dates = np.array(date_columns)
+        self.state_names = [str(states[i]) for i in starts]
+        self.state_index = {name: (int(i), int(j)) for (name, i, j) in
+                            zip(self.state_names, starts, stops)}
+        self.county_names = [county for (state, county) in keys]
+        self.county_populations = population
+        self.cases = cases
+
+        self.state_cases = np.add.reduceat(self.cases, starts, axis=1,
+                                           dtype=np.float64).astype(dtype)
+        self.state_populations = np.add.reduceat(self.county_populations,
+                                                 starts)
+
+    def aggregate(self, dtf, date_columns, population=None):
+        """Aggregate rows into county columns; see `Dataset.aggregate`."""
+
+        dtf = dtf.rename(columns={'Province_State':'state/province', 'Admin2':'county'})
+
+        # Communities are listed up to (excluding) the Wyoming/Weston row
+        sentinel = (dtf['state/province'].str.strip() == 'Wyoming') & \
+                   (dtf['county'].str.strip() == 'Weston')
+        if sentinel.any():
+            n_rows = int(np.argmax(sentinel.to_numpy()))
+        else:
+            n_rows = len(dtf)
+
+        # Rows of a whole state or territory have no county name; use '' so
+        # that the keys survive a `save`/`open` round trip (NaN != NaN)
+        dtf = dtf.iloc[:n_rows].assign(county=dtf['county'].iloc[:n_rows]
+                                       .fillna(''))
+
+        # Add counties/city/towns columnwise in one pass; sorted by state
+        keys = [dtf['state/province'].to_numpy(), dtf['county'].to_numpy()]
+        groups = dtf[date_columns].groupby(keys, sort=True, dropna=False).sum()
+
+        if population is not None:
+            population = pd.Series(population[:n_rows]).groupby(
+                keys, sort=True, dropna=False).sum(min_count=1)
+            if population.isna().any():
+                population = population.to_numpy(dtype=np.float64)
+            else:
+                population = population.to_numpy(dtype=np.int64)
+
+        cases = np.ascontiguousarray(
+            groups.to_numpy(dtype=self.dtype).transpose())
+
+        return (list(groups.index), cases, population)
+
+    def keys(self):
+        """Return the `(state, county)` keys of the columns of `cases`."""
+
+        return [(state, county) for (state, (start, stop)) in
+                self.state_index.items()
+                for county in self.county_names[start:stop]]
+
+    def append(self, dates, cases):
+        """Append rows of `dates` and `cases`; see `Dataset.append`."""
+
+        super().append(dates, cases)
+
+        starts = [start for (start, stop) in self.state_index.values()]
+        state_cases = np.add.reduceat(cases, starts, axis=1, dtype=np.float64)
+        self.state_cases = np.concatenate(
+            (self.state_cases, state_cases.astype(self.dtype)))
+
+        return
+
+    @classmethod
+    def open(cls, path):
+        """Open a binary store created with `save`; see `Dataset.open`."""
+
+        dataset = super().open(path)
+        dataset.state_index = {name: tuple(index) for (name, index) in
+                               dataset.state_index.items()}
+
+        return dataset
+
+    def states(self):
+        """Return the data of all states.
+
+        Returns
+        -------
+        data: tuple(list(str), list(int), numpy.ndarray(str), numpy.ndarray)
+            (state_names, populations, dates, cases)
+        """
+
+        return (list(self.state_names), self.state_populations.tolist(),
+                self.dates, self.state_cases)
+
+    def counties(self, state):
+        """Return the data of the counties of a state.
+
+        Parameters
+        ----------
+        state: str
+            Name of the state.
+
+        Returns
+        -------
+        data: tuple(list(str), list(int), numpy.ndarray(str), numpy.ndarray)
+            (county_names, populations, dates, cases). `cases` is a view of
+            the columns of the dataset `cases`.
+        """
+
+        assert_in(state, self.state_index)
+        (start, stop) = self.state_index[state]
+
+        return (self.county_names[start:stop],
+                self.county_populations[start:stop].tolist(),
+                self.dates, self.cases[:, start:stop])
+
+class GlobalDataset(Dataset):
+    """Parsed global country data shared by `Surge` objects.
+
+    Notes
+    -----
+    Use `get_covid_global_dataset` to obtain a dataset shared by all `Surge`
+    objects created from the same data file. Use `save` and `open` for a
+    binary store of the dataset.
+    """
+
+    LOCALE = 'global'
+    INFO_COLUMNS = ('Province/State', 'Country/Region', 'Lat', 'Long')
+    KEY_COLUMNS = ('Country/Region',)
+    JSON_ATTRIBUTES = ('case_type', 'data_source', 'dates', 'country_names')
+
+    def __init__(self, case_type='deaths', data_source=None, cache_dir=None,
+                 offline=False, save_html=False, dtype=np.float64):
+        """Construct a GlobalDataset object.
+
+        Parameters
+        ----------
+        case_type: str
+            Type of data. Deaths ('deaths') and confirmed cases
+            ('confirmed'). Default: 'deaths'.
+        data_source: str
+            Location of the data file; see `get_data_file`.
+            Default: None (Johns Hopkins CSSE repository).
+        cache_dir: str
+            Directory of the download cache; see `get_cache_dir`.
+        offline: bool
+            Use cached or local files only. Default: False.
+        save_html: bool
+            Save in a file, an `html` version of the data file.
+        dtype: numpy.dtype
+            Floating point type of the `cases` matrix. `numpy.float32`
+            halves its size. Default: `numpy.float64`.
+
+        Attributes
+        ----------
+        dates: numpy.ndarray(str)
+            Vector of `str` for dates in the numeric form MM/DD/YY.
+        country_names: list(str)
+            Sorted list of country names.
+        cases: numpy.ndarray(float)
+            Matrix of cumulative cases. Rows: `dates`; columns:
+            `country_names`.
+        data_source: str
+            Location of the data file. See `refresh`.
+        """
+
+        assert_in(case_type, ('deaths', 'confirmed'))
+
+        self.case_type = case_type
+        self.data_source = data_source
+        self.dtype = np.dtype(dtype)
+
+        if save_html:
+            dtf = read_covid_csv('global', case_type, data_source, cache_dir,
+                                 offline)
+            dtf.to_html('covid_19_global_%s.html'%case_type)
+
+        date_columns = self.read_header(data_source, cache_dir, offline)
+
+        dtf = self.read_columns(date_columns, (), data_source, cache_dir,
+                                offline)
+
+        (country_names, cases, dummy) = self.aggregate(dtf, date_columns)
+
+        self.dates = np.array(date_columns)
+        self.country_names = country_names
+        self.cases = cases
+
+    def aggregate(self, dtf, date_columns, population=None):
+        """Aggregate rows into country columns; see `Dataset.aggregate`."""
+
+        dtf = dtf.rename(columns={'Province/State':'state/province', 'Country/Region':'country/region'})
+
+        # Add provinces of a country columnwise in one pass; sorted by country
+        groups = dtf[date_columns].groupby(dtf['country/region'].to_numpy(),
+                                           sort=True).sum()
+
+        country_names = list(groups.index)
+
+        cases = np.ascontiguousarray(
+            groups.to_numpy(dtype=self.dtype).transpose())
+
+        return (country_names, cases, population)
+
+    def keys(self):
+        """Return the names of the countries in the columns of `cases`."""
+
+        return list(self.country_names)
+
+    def countries(self, distribution=False):
+        """Return the data of all countries.
+
+        Parameters
+        ----------
+        distribution: bool
+            Distribution of new cases over dates instead of cumulative
+            cases. Default: False
+
+        Returns
+        -------
+        data: tuple(list(str), numpy.ndarray(str), numpy.ndarray)
+            (country_names, dates, cases)
+        """
+
+        cases = self.cases
+
+        if distribution:
+
+            cases = np.round(np.gradient(cases, axis=0), 0)
+
+        return (list(self.country_names), self.dates, cases)
+
+DATASETS = dict()  # datasets shared across Surge objects; see `get_dataset`
+
+def get_dataset(dataset_class, case_type='deaths', data_source=None,
+                cache_dir=None, offline=False, dtype=np.float64,
+                population_source=None):
+    """Return a dataset shared by all callers with the same data file.
+
+    Datasets are kept in the module dictionary `DATASETS` keyed by the class,
+    the type of data and the local data file (its path, size and
+    modification time). Clear `DATASETS` to release the memory. A
+    `data_source` directory is opened as a binary store; see `Dataset.save`.
+
+    Parameters
+    ----------
+    dataset_class: UsDataset or GlobalDataset
+        Class of the dataset.
+    case_type: str
+        Type of data. Deaths ('deaths') and confirmed cases ('confirmed').
+    data_source: str
+        Location of the data file; see `get_data_file`.
+    cache_dir: str
+        Directory of the download cache; see `get_cache_dir`.
+    offline: bool
+        Use cached or local files only. Default: False.
+    dtype: numpy.dtype
+        Floating point type of the cases. A binary store of another type is
+        converted in memory. Default: `numpy.float64`.
+    population_source: str
+        Location of the population data file of US confirmed cases; see
+        `UsDataset`. Default: None.
+
+    Returns
+    -------
+    dataset: UsDataset or GlobalDataset
+    """
+
+    dtype = np.dtype(dtype)
+
+    if dataset_class is UsDataset:
+        locale = 'US'
+    else:
+        locale = 'global'
+
+    if data_source is None:
+        assert_in((locale, case_type), JHU_FILENAMES)
+        data_source = JHU_TIME_SERIES_URL + JHU_FILENAMES[(locale, case_type)]
+
+    path = get_data_file(data_source, cache_dir=cache_dir, offline=offline)
+
+    if os.path.isdir(path):  # binary store; see `Dataset.save`
+        stat = os.stat(os.path.join(path, 'meta.json'))
+    else:
+        stat = os.stat(path)
+
+    key = (dataset_class.__name__, case_type, os.path.abspath(path),
+           stat.st_size, stat.st_mtime_ns, dtype.str, population_source)
+
+    kwargs = dict()
+    if population_source is not None:
+        kwargs['population_source'] = population_source
+
+    if key not in DATASETS:
+        if os.path.isdir(path):
+            dataset = dataset_class.open(path)
+            assert_equal(dataset.case_type, case_type)
+            if dataset.dtype != dtype:
+                for name in dataset.ARRAY_ATTRIBUTES:
+                    array = getattr(dataset, name)
+                    if array.dtype.kind == 'f':
+                        setattr(dataset, name, array.astype(dtype))
+                dataset.dtype = dtype
+        else:
+            dataset = dataset_class(case_type, data_source, cache_dir,
+                                    offline, dtype=dtype, **kwargs)
+        DATASETS[key] = dataset
+
+    return DATASETS[key]
+
+def get_covid_us_dataset(case_type='deaths', data_source=None,
+                         cache_dir=None, offline=False, dtype=np.float64,
+                         population_source=None):
+    """Return the shared `UsDataset` of a data file; see `get_dataset`."""
+
+    return get_dataset(UsDataset, case_type, data_source, cache_dir, offline,
+                       dtype, population_source)
+
+def get_covid_global_dataset(case_type='deaths', data_source=None,
+                             cache_dir=None, offline=False, dtype=np.float64):
+    """Return the shared `GlobalDataset` of a data file; see `get_dataset`."""
+
+    return get_dataset(GlobalDataset, case_type, data_source, cache_dir,
+                       offline, dtype)
+
+def get_covid_us_data(sub_locale=None, case_type='deaths', save_html=False,
+                      data_source=None, cache_dir=None, offline=False,
+                      population_source=None):
+    """COVID-19 data loader.
+
+    Load COVID-19 pandemic cumulative data from:
+
+     `https://github.com/CSSEGISandData/COVID-19`.
+
+    Parameters
+    ----------
+    case_type:  str, optional
+            Type of data. Deaths ('deaths') and confirmed cases
+            ('confirmed'). Default: 'deaths'.
+    data_source: str, optional
+            Location of the `case_type` data file; see `get_data_file`.
+            Default: None (Johns Hopkins CSSE repository).
+    cache_dir: str, optional
+            Directory of the download cache; see `get_cache_dir`.
+    offline: bool, optional
+            Use cached or local files only. Default: False.
+    population_source: str, optional
+            Location of the deaths data file with the population of
+            confirmed cases; see `UsDataset`. Default: None.
+
+    Returns
+    -------
+    data: tuple(int, list(str), list(int))
+           (population, dates, cases)
+    """
+
+    if save_html:
+        dataset = UsDataset(case_type, data_source, cache_dir, offline,
+                            save_html=True,
+                            population_source=population_source)
+    else:
+        dataset = get_covid_us_dataset(case_type, data_source, cache_dir,
+                                       offline,
+                                       population_source=population_source)
+
+    if sub_locale is None:
+        (names, population, dates, cases) = dataset.states()
+    else:
+        (names, population, dates, cases) = dataset.counties(sub_locale)
+
+    return (names, population, dates, np.copy(cases))
+
+def get_covid_global_data(case_type='deaths', distribution=True,
+                          cumulative=False, save_html=False,
+                          data_source=None, cache_dir=None, offline=False):
+    """COVID-19 data loader.
+
+    Load COVID-19 pandemic cumulative data from:
+
+        https://github.com/CSSEGISandData/COVID-19
+
+    Parameters
+    ----------
+    case_type: str, optional
+        Type of data. Deaths ('deaths') and confirmed cases ('confirmed').
+        Default: 'deaths'.
+
+    distribution: bool, optional
+        Distribution of new cases over dates.
+        Default: True
+
+    cumulative: bool, optional
+        Cumulative number of cases over dates.
+        Default: False
+
+    data_source: str, optional
+        Location of the data file; see `get_data_file`.
+        Default: None (Johns Hopkins CSSE repository).
+
+    cache_dir: str, optional
+        Directory of the download cache; see `get_cache_dir`.
+
+    offline: bool, optional
+        Use cached or local files only. Default: False.
+
+    Returns
+    -------
+    data: tuple(int, list(str), list(int))
+           (contry_names, dates, cases)
+    """
+
+    if cumulative is True:
+        distribution = False
+
+    if save_html:
+        dataset = GlobalDataset(case_type, data_source, cache_dir, offline,
+                                save_html=True)
+    else:
+        dataset = get_covid_global_dataset(case_type, data_source, cache_dir,
+                                           offline)
+
+    (country_names, dates, cases) = dataset.countries(distribution)
+
+    return (country_names, dates, np.copy(cases))
+
+def cholesky_solve(a_mtrx, b_vec):
+    """Solve symmetric positive definite systems by Cholesky factorization.
+
+    The square-root free (LDL^T) factorization is unrolled over the small
+    size of the system, e.g. the 3 sigmoid parameters, so stacked systems are
+    solved together and a single system costs no LAPACK call.
+
+    The rank test of `numpy.linalg.matrix_rank`, smallest singular value not
+    larger than `p*eps` times the largest, is done in closed form from the
+    factors: the smallest eigenvalue is estimated by `1/trace(A^-1)` and the
+    largest by `trace(A)`.
+
+    Parameters
+    ----------
+    a_mtrx: numpy.ndarray(float)
+        Matrix of shape (..., p, p); e.g. J^T J of a least-squares problem.
+    b_vec: numpy.ndarray(float)
+        Right side of shape (..., p).
+
+    Returns
+    -------
+    solution: tuple(numpy.ndarray(float), bool or numpy.ndarray(bool))
+        (x_vec, singular); `singular` flags rank deficient systems. Their
+        `x_vec` is meaningless.
+    """
+
+    a_mtrx = np.asarray(a_mtrx, dtype=np.float64)
+    b_vec = np.asarray(b_vec, dtype=np.float64)
+    n_dim = a_mtrx.shape[-1]
+
+    # a single system is factorized with Python floats
+    single = a_mtrx.ndim == 2
+
+    if single:
+        a_ij = a_mtrx.tolist()
+        b_i = b_vec.tolist()
+    else:
+        a_ij = [[a_mtrx[..., i, j] for j in range(n_dim)]
+                for i in range(n_dim)]
+        b_i = [b_vec[..., i] for i in range(n_dim)]
+
+    l_ij = [[None]*n_dim for i in range(n_dim)]
+    d_i = [None]*n_dim
+    singular = False
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+
+        # factorization A = L D L^T
+        for j in range(n_dim):
+            d_j = a_ij[j][j]
+            for k in range(j):
+                d_j = d_j - l_ij[j][k]**2 * d_i[k]
+            d_i[j] = d_j
+            if single and not d_j > 0.0:
+                return (np.full(n_dim, np.nan), True)
+            singular = singular | ~(d_j > 0.0)
+            for i in range(j+1, n_dim):
+                l_ij_ = a_ij[i][j]
+                for k in range(j):
+                    l_ij_ = l_ij_ - l_ij[i][k]*l_ij[j][k]*d_i[k]
+                l_ij[i][j] = l_ij_/d_j
+
+        # rank test: trace(A^-1) = sum_j |row j of L^-1|^2 / d_j
+        trace = a_ij[0][0]
+        trace_inv = 1.0/d_i[0]
+        linv_ij = [[1.0]]
+        for i in range(1, n_dim):
+            row = list()
+            for j in range(i):
+                linv_ij_ = -l_ij[i][j]
+                for k in range(j+1, i):
+                    linv_ij_ = linv_ij_ - l_ij[i][k]*linv_ij[k][j]
+                row.append(linv_ij_)
+            row.append(1.0)
+            linv_ij.append(row)
+            trace = trace + a_ij[i][i]
+            trace_inv = trace_inv + sum(v**2 for v in row)/d_i[i]
+
+        full_rank = trace_inv*trace < 1.0/(n_dim*np.finfo(np.float64).eps)
+        singular = not full_rank if single else singular | ~full_rank
+
+        # forward and backward substitution
+        z_i = list()
+        for i in range(n_dim):
+            z_i_ = b_i[i]
+            for k in range(i):
+                z_i_ = z_i_ - l_ij[i][k]*z_i[k]
+            z_i.append(z_i_)
+
+        x_i = [None]*n_dim
+        for i in reversed(range(n_dim)):
+            x_i_ = z_i[i]/d_i[i]
+            for k in range(i+1, n_dim):
+                x_i_ = x_i_ - l_ij[k][i]*x_i[k]
+            x_i[i] = x_i_
+
+    if single:
+        return (np.array(x_i), singular)
+
+    return (np.stack(np.broadcast_arrays(*x_i), axis=-1), singular)
+
+def grad_p_sigmoid_func(x, param_vec):
+    """Gradient of the sigmoid `a_0/(1 + a_1 exp(a_2 x))` with respect to its
+    parameters.
+
+    With `fit_kernel` it is the reference of `sigmoid_residual_jacobian`.
+
+    Parameters
+    ----------
+    x: float, int, or numpy.ndarray
+        Values of the argument of the function.
+    param_vec: numpy.ndarray(float)
+        Vector of sigmoid parameters `a_0`, `a_1`, `a_2`.
+
+    Returns
+    -------
+    grad_p_f: tuple(numpy.ndarray(float))
+        Partial derivatives with respect to `a_0`, `a_1` and `a_2`.
+    """
+
+    a_0 = param_vec[0]
+    a_1 = param_vec[1]
+    a_2 = param_vec[2]
+
+    grad_p_f_0 = 1./(1. + a_1 * np.exp(a_2*x))
+    grad_p_f_1 = - a_0/(1. + a_1 * np.exp(a_2*x))**2 * np.exp(a_2*x)
+    grad_p_f_2 = - a_0/(1. + a_1 * np.exp(a_2*x))**2 * a_1 * x*np.exp(a_2*x)
+
+    return (grad_p_f_0, grad_p_f_1, grad_p_f_2)
+
+def fit_kernel(fit_func, grad_p_fit_func):
+    """Return a residual and Jacobian kernel of a fit and gradient function.
+
+    The kernel has the interface of `sigmoid_residual_jacobian`; it is used
+    by the solvers when no fused kernel is given.
+    """
+
+    def kernel(x_vec, y_vec, param_vec, r_vec, j_mtrx=None, work=None):
+        """Residual and Jacobian from `fit_func` and `grad_p_fit_func`."""
+
+        np.subtract(y_vec, fit_func(x_vec, param_vec), out=r_vec)
+
+        if j_mtrx is not None:
+            for (i, grad_p_f_i) in enumerate(grad_p_fit_func(x_vec,
+                                                             param_vec)):
+                np.negative(grad_p_f_i, out=j_mtrx[..., i])
+
+    return kernel
+
+def sigmoid_residual_jacobian(x_vec, y_vec, param_vec, r_vec, j_mtrx=None,
+                              work=None):
+    """Residual and Jacobian of a sigmoid fit with one exponential evaluation.
+
+    Computes `r = y - a_0/(1 + a_1 exp(a_2 x))` and its Jacobian `J = dr/dp`
+    into the arrays of the caller; with `work` given no array is allocated.
+
+    Parameters
+    ----------
+    x_vec: numpy.ndarray(float)
+        Values of the independent variable.
+    y_vec: numpy.ndarray(float)
+        Values of the dependent variable; shape of `r_vec`.
+    param_vec: numpy.ndarray(float)
+        Vector of sigmoid parameters `a_0`, `a_1`, `a_2`. For a batch of fits
+        each entry is a column vector; see `newton_nlls_batch_solve`.
+    r_vec: numpy.ndarray(float)
+        Output residual.
+    j_mtrx: numpy.ndarray(float)
+        Output Jacobian of shape `r_vec.shape + (3,)`. Default: None
+        (residual only).
+    work: tuple(numpy.ndarray(float), numpy.ndarray(float))
+        Two work arrays of the shape of `r_vec`. Default: None (allocated).
+    """
+
+    a_0 = param_vec[0]
+    a_1 = param_vec[1]
+    a_2 = param_vec[2]
+
+    if work is None:
+        work = (np.empty_like(r_vec), np.empty_like(r_vec))
+    (exp_x, inv_d) = work
+
+    np.multiply(x_vec, a_2, out=exp_x)
+    np.exp(exp_x, out=exp_x)                    # e^{a_2 x}
+
+    np.multiply(exp_x, a_1, out=inv_d)
+    inv_d += 1.0
+    np.reciprocal(inv_d, out=inv_d)             # 1/(1 + a_1 e^{a_2 x})
+
+    np.multiply(inv_d, a_0, out=r_vec)
+    np.subtract(y_vec, r_vec, out=r_vec)
+
+    if j_mtrx is not None:
+
+        np.negative(inv_d, out=j_mtrx[..., 0])
+
+        j_1 = j_mtrx[..., 1]
+        np.multiply(inv_d, inv_d, out=j_1)
+        j_1 *= exp_x
+        j_1 *= a_0                              # a_0 e^{a_2 x}/(1 + ...)^2
+
+        j_2 = j_mtrx[..., 2]
+        np.multiply(j_1, x_vec, out=j_2)
+        j_2 *= a_1
+
+    return
+
+def gompertz_residual_jacobian(x_vec, y_vec, param_vec, r_vec, j_mtrx=None,
+                               work=None):
+    """Residual and Jacobian of a Gompertz fit `a_0 exp(-a_1 exp(a_2 x))`.
+
+    Interface of `sigmoid_residual_jacobian`.
+    """
+
+    a_0 = param_vec[0]
+    a_1 = param_vec[1]
+    a_2 = param_vec[2]
+
+    if work is None:
+        work = (np.empty_like(r_vec), np.empty_like(r_vec))
+    (exp_x, u_x) = work
+
+    np.multiply(x_vec, a_2, out=exp_x)
+    np.exp(exp_x, out=exp_x)                    # e^{a_2 x}
+    np.multiply(exp_x, a_1, out=u_x)            # u = a_1 e^{a_2 x}
+
+    np.negative(u_x, out=r_vec)
+    np.exp(r_vec, out=r_vec)                    # e^{-u}
+
+    if j_mtrx is not None:
+
+        np.negative(r_vec, out=j_mtrx[..., 0])
+
+        j_1 = j_mtrx[..., 1]
+        np.multiply(r_vec, exp_x, out=j_1)
+        j_1 *= a_0                              # a_0 e^{-u} e^{a_2 x}
+
+        j_2 = j_mtrx[..., 2]
+        np.multiply(j_1, x_vec, out=j_2)
+        j_2 *= a_1
+
+    r_vec *= a_0
+    np.subtract(y_vec, r_vec, out=r_vec)
+
+    return
+
+def richards_residual_jacobian(x_vec, y_vec, param_vec, r_vec, j_mtrx=None,
+                               work=None):
+    """Residual and Jacobian of a Richards fit `a_0/(1 + a_1 exp(a_2 x))^(1/nu)`.
+
+    Interface of `sigmoid_residual_jacobian`; parameters `a_0`, `a_1`,
+    `a_2`, `nu`.
+    """
+
+    a_0 = param_vec[0]
+    a_1 = param_vec[1]
+    a_2 = param_vec[2]
+    nu = param_vec[3]
+
+    if work is None:
+        work = (np.empty_like(r_vec), np.empty_like(r_vec))
+    (exp_x, d_x) = work
+
+    np.multiply(x_vec, a_2, out=exp_x)
+    np.exp(exp_x, out=exp_x)                    # e^{a_2 x}
+    np.multiply(exp_x, a_1, out=d_x)
+    d_x += 1.0                                  # d = 1 + a_1 e^{a_2 x}
+
+    log_d = np.empty_like(r_vec) if j_mtrx is None else j_mtrx[..., 3]
+    np.log(d_x, out=log_d)
+    np.divide(log_d, -nu, out=r_vec)
+    np.exp(r_vec, out=r_vec)                    # d^{-1/nu}
+
+    if j_mtrx is not None:
+
+        np.negative(r_vec, out=j_mtrx[..., 0])
+
+        j_1 = j_mtrx[..., 1]
+        np.divide(r_vec, d_x, out=j_1)
+        j_1 *= exp_x
+        j_1 *= a_0/nu                           # a_0 e^{a_2 x}/(nu d^{1/nu+1})
+
+        j_2 = j_mtrx[..., 2]
+        np.multiply(j_1, x_vec, out=j_2)
+        j_2 *= a_1
+
+        log_d *= r_vec
+        log_d *= -a_0/nu**2                     # -a_0 ln(d)/(nu^2 d^{1/nu})
+
+    r_vec *= a_0
+    np.subtract(y_vec, r_vec, out=r_vec)
+
+    return
+
+class GrowthModel:
+    """Growth model of cumulative cases for `Surge` fits.
+
+    A model is `a_0 g(u)` of `u = a_1 exp(a_2 t)` (and shape parameters):
+    `a_0 > 0` is the final size, `a_1 > 0` and `a_2 < 0` set the time scale,
+    so `shift_sigmoid_params` and variable projection apply to all models.
+    A model supplies its function, a fused residual/Jacobian kernel (the
+    interface of `sigmoid_residual_jacobian`), its first and second time
+    derivatives, the analytic critical times and an initial guess. The
+    functions accept arrays of parameters in their first axis.
+    """
+
+    n_params = 3
+    formula = None
+
+    def func(self, x, param_vec):
+        """Values of the function at `x`."""
+        r_vec = np.empty(np.broadcast_shapes(np.shape(x),
+                                             np.shape(param_vec[0])))
+        self.kernel(x, np.zeros(r_vec.shape), param_vec, r_vec)
+        return -r_vec
+
+    def kernel(self, x_vec, y_vec, param_vec, r_vec, j_mtrx=None, work=None):
+        """Residual `y - f` and its Jacobian; see `sigmoid_residual_jacobian`."""
+        raise NotImplementedError
+
+    def derivatives(self, x, param_vec):
+        """First and second time derivatives at `x`."""
+        raise NotImplementedError
+
+    def critical_times(self, param_vec):
+        """Times of maximum growth rate and of maximum and minimum growth
+        acceleration."""
+        raise NotImplementedError
+
+    def initial_guess(self, cases):
+        """Initial guess of the parameters of scaled data."""
+        a_0 = cases[-1]
+        return np.array([a_0, a_0/cases[0] - 1, -0.15])
+
+    def valid(self, param_vec):
+        """Parameters of a growing model."""
+        return (param_vec[0] > 0.0) & (param_vec[1] > 0.0) & \
+               (param_vec[2] < 0.0)
+
+class LogisticModel(GrowthModel):
+    """Logistic model `a_0/(1 + a_1 exp(a_2 t))`; the `Surge` sigmoid."""
+
+    formula = r'$y = \frac{\alpha_0}{1 + \alpha_1 \, e^{\alpha_2\,t}  }$'
+
+    def func(self, x, param_vec):
+        return param_vec[0] / (1 + param_vec[1] * np.exp(param_vec[2]*x))
+
+    def kernel(self, x_vec, y_vec, param_vec, r_vec, j_mtrx=None, work=None):
+        sigmoid_residual_jacobian(x_vec, y_vec, param_vec, r_vec, j_mtrx,
+                                  work)
+
+    def derivatives(self, x, param_vec):
+        (a_0, a_1, a_2) = param_vec[:3]
+        f_x = a_0 / (1 + a_1 * np.exp(a_2*x))
+        g_x = (-1) * a_1 * a_2 * np.exp(a_2*x) / (1.0 + a_1 * np.exp(a_2*x))
+        g_prime_x = (-1) * a_1 * a_2**2 * np.exp(a_2*x) / \
+                    (1.0 + a_1 * np.exp(a_2*x))**2
+        return (g_x * f_x, (g_prime_x + g_x**2)*f_x)
+
+    def critical_times(self, param_vec):
+        (a_1, a_2) = param_vec[1:3]
+        return (-np.log(a_1)/a_2,
+                -np.log(a_1/(2+math.sqrt(3)))/a_2,
+                -np.log(a_1/(2-math.sqrt(3)))/a_2)
+
+class GompertzModel(GrowthModel):
+    """Gompertz model `a_0 exp(-a_1 exp(a_2 t))`."""
+
+    formula = r'$y = \alpha_0 \, e^{-\alpha_1 \, e^{\alpha_2\,t}}$'
+
+    def kernel(self, x_vec, y_vec, param_vec, r_vec, j_mtrx=None, work=None):
+        gompertz_residual_jacobian(x_vec, y_vec, param_vec, r_vec, j_mtrx,
+                                   work)
+
+    def derivatives(self, x, param_vec):
+        (a_0, a_1, a_2) = param_vec[:3]
+        u_x = a_1 * np.exp(a_2*x)
+        f_prime = -a_0 * a_2 * u_x * np.exp(-u_x)
+        return (f_prime, a_2 * (1 - u_x) * f_prime)
+
+    def critical_times(self, param_vec):
+        # u = 1 at the inflection; u = (3 +- sqrt(5))/2 at the extrema of f''
+        (a_1, a_2) = param_vec[1:3]
+        return (-np.log(a_1)/a_2,
+                np.log((3+math.sqrt(5))/2/a_1)/a_2,
+                np.log((3-math.sqrt(5))/2/a_1)/a_2)
+
+    def initial_guess(self, cases):
+        a_0 = cases[-1]
+        return np.array([a_0, math.log(a_0/cases[0]), -0.15])
+
+class RichardsModel(GrowthModel):
+    """Richards (generalized logistic) model `a_0/(1 + a_1 exp(a_2 t))^(1/nu)`.
+
+    The shape parameter `nu > 0` moves the inflection point; `nu = 1` is
+    the logistic model and `nu -> 0` the Gompertz model.
+    """
+
+    n_params = 4
+    formula = r'$y = \frac{\alpha_0}{(1 + \alpha_1 \, e^{\alpha_2\,t})^{1/\nu}}$'
+
+    def kernel(self, x_vec, y_vec, param_vec, r_vec, j_mtrx=None, work=None):
+        richards_residual_jacobian(x_vec, y_vec, param_vec, r_vec, j_mtrx,
+                                   work)
+
+    def derivatives(self, x, param_vec):
+        (a_0, a_1, a_2, nu) = param_vec[:4]
+        u_x = a_1 * np.exp(a_2*x)
+        f_prime = -a_0 * a_2 * u_x / nu * (1 + u_x)**(-1/nu - 1)
+        return (f_prime, a_2 * (1 - u_x/nu) / (1 + u_x) * f_prime)
+
+    def critical_times(self, param_vec):
+        # u = nu at the inflection; the extrema of f'' are the roots of
+        # c^2 u^2 - (3c + 1) u + 1 = 0, c = 1/nu
+        (a_1, a_2, nu) = param_vec[1:4]
+        c = 1/nu
+        root = np.sqrt((3*c + 1)**2 - 4*c**2)
+        return (np.log(nu/a_1)/a_2,
+                np.log((3*c + 1 + root)/(2*c**2)/a_1)/a_2,
+                np.log((3*c + 1 - root)/(2*c**2)/a_1)/a_2)
+
+    def initial_guess(self, cases):
+        # the logistic fit (nu = 1); the Gauss-Newton steps from the
+        # logistic guess overshoot along the correlated a_1 and nu
+        param_vec_0 = GrowthModel.initial_guess(self, cases)
+        (param_vec, _, k) = newton_nlls_solve(
+            np.array(range(cases.size), dtype=np.float64), cases, None, None,
+            param_vec_0, 25, 1.0e-4, verbose=False,
+            kernel=sigmoid_residual_jacobian)
+        if k > 25 or not GrowthModel.valid(self, param_vec):
+            param_vec = param_vec_0
+        return np.append(param_vec, 1.0)
+
+    def valid(self, param_vec):
+        return GrowthModel.valid(self, param_vec) & (param_vec[3] > 0.0)
+
+# Growth models of `Surge.model`
+GROWTH_MODELS = {'logistic': LogisticModel(),
+                 'gompertz': GompertzModel(),
+                 'richards': RichardsModel()}
+
+class WavesModel(GrowthModel):
+    """Sum of logistic models, one per wave of a series.
+
+    Each wave is `a_0/(1 + exp(a_2 (t - t_c)))` with parameters `a_0`,
+    `t_c`, `a_2` in turn: the logistic model of `a_1 = exp(-a_2 t_c)`,
+    whose `a_1` is too large to scale well for the later waves. The
+    critical times are those of each wave (arrays over the waves). Not
+    registered in `GROWTH_MODELS`: see `Surge.multi_fit_waves`.
+    """
+
+    formula = r'$y = \sum_w \frac{\alpha_{0,w}}{1 + e^{\alpha_{2,w}\,(t - t_{c,w})}}$'
+
+    def __init__(self, n_waves):
+        assert_true(n_waves >= 1)
+        self.n_waves = n_waves
+        self.n_params = 3*n_waves
+
+    def __waves(self, param_vec):
+        """Parameters of the waves along a second axis."""
+        param_vec = np.asarray(param_vec)
+        return param_vec.reshape((self.n_waves, 3) +
+                                 param_vec.shape[1:]).swapaxes(0, 1)
+
+    def kernel(self, x_vec, y_vec, param_vec, r_vec, j_mtrx=None, work=None):
+
+        if work is None:
+            work = (np.empty_like(r_vec), np.empty_like(r_vec))
+        (exp_x, inv_d) = work
+
+        np.copyto(r_vec, y_vec)
+
+        for wave in range(self.n_waves):
+
+            (a_0, t_c, a_2) = param_vec[3*wave:3*wave+3]
+
+            # x - t_c; kept for the Jacobian
+            x_t = exp_x if j_mtrx is None else j_mtrx[..., 3*wave+2]
+            np.subtract(x_vec, t_c, out=x_t)
+            np.multiply(x_t, a_2, out=exp_x)
+            np.exp(exp_x, out=exp_x)                # e^{a_2 (x - t_c)}
+
+            np.add(exp_x, 1.0, out=inv_d)
+            np.reciprocal(inv_d, out=inv_d)         # 1/(1 + e^{a_2 (x - t_c)})
+
+            if j_mtrx is not None:
+
+                np.negative(inv_d, out=j_mtrx[..., 3*wave])
+
+                j_1 = j_mtrx[..., 3*wave+1]
+                np.multiply(inv_d, inv_d, out=j_1)
+                j_1 *= exp_x
+                j_1 *= a_0                          # a_0 e^{..}/(1 + e^{..})^2
+
+                x_t *= j_1
+                j_1 *= -a_2
+
+            inv_d *= a_0
+            r_vec -= inv_d
+
+    def derivatives(self, x, param_vec):
+        # waves along a first axis
+        (a_0, t_c, a_2) = np.reshape(self.__waves(param_vec),
+                                     (3, self.n_waves) + (1,)*np.ndim(x))
+        exp_x = np.exp(a_2*(x - t_c))
+        f_x = a_0 / (1 + exp_x)
+        g_x = (-1) * a_2 * exp_x / (1.0 + exp_x)
+        g_prime_x = (-1) * a_2**2 * exp_x / (1.0 + exp_x)**2
+        return (np.sum(g_x * f_x, axis=0),
+                np.sum((g_prime_x + g_x**2)*f_x, axis=0))
+
+    def critical_times(self, param_vec):
+        (_, t_c, a_2) = self.__waves(param_vec)
+        return (t_c,
+                t_c + math.log(2+math.sqrt(3))/a_2,
+                t_c - math.log(2+math.sqrt(3))/a_2)
+
+    def initial_guess(self, cases, starts=None, window=7):
+        """Initial guess of the parameters of scaled data.
+
+        Each wave is a logistic of the cases added between its start and
+        the start of the next wave, maximum growth rate at the peak of the
+        smoothed daily increments and growth rate matching that peak.
+        `starts` are the indices of the first day of the waves after the
+        first; default: waves of equal duration.
+        """
+
+        if starts is None:
+            starts = np.arange(1, self.n_waves)*cases.size//self.n_waves
+        assert_equal(len(starts), self.n_waves - 1)
+        bounds = np.concatenate(([0], starts, [cases.size])).astype(int)
+
+        increments = np.diff(cases, prepend=0.0)
+        increments = np.convolve(increments, np.ones(window)/window, 'same')
+
+        param_vec = np.empty(self.n_params)
+        level = 0.0
+        for (wave, (begin, end)) in enumerate(zip(bounds[:-1], bounds[1:])):
+            a_0 = max(cases[end-1] - level, 1e-3*cases[-1])
+            peak = begin + np.argmax(increments[begin:end])
+            a_2 = min(max(-4*increments[peak]/a_0, -0.5), -0.02)
+            param_vec[3*wave:3*wave+3] = (a_0, peak, a_2)
+            level = cases[end-1]
+
+        return param_vec
+
+    def valid(self, param_vec):
+        (a_0, _, a_2) = self.__waves(param_vec)
+        return np.all((a_0 > 0.0) & (a_2 < 0.0), axis=0)
+
+def get_growth_model(model):
+    """Growth model of a key of `GROWTH_MODELS` or a `GrowthModel`."""
+
+    if isinstance(model, GrowthModel):
+        return model
+
+    assert_in(model, GROWTH_MODELS)
+
+    return GROWTH_MODELS[model]
+
+def newton_nlls_solve(x_vec, y_vec, fit_func, grad_p_fit_func,
+                      param_vec_0,
+                      k_max=10, rel_tol=1.0e-3, verbose=True,
+                      mode='cholesky', kernel=None):
+    """Newton's nonlinear least-squares fitting method.
+
+    Parameters
+    ----------
+    x_vec: numpy.ndarray(float)
+        Values of the independent variable.
+    y_vec: numpy.ndarray(float)
+        Values of the dependent variable.
+    fit_func: def f(x,p):
         Function definitio of the sigma function.
     grad_p_fit_func: def f_p(x,p):
         Gradient of f wrt to the parameter vector.
@@ -1837,122 +4119,1657 @@ def newton_nlls_solve(x_vec, y_vec, fit_func, grad_p_fit_func,
         Relative tolerance for convergence of Newton's method
     verbose: bool
         Flag for print out of internal information.
+    mode: str
+        Solution of the normal equations J^T J delta = -J^T r. 'cholesky':
+        `cholesky_solve` and its closed-form rank test. 'svd': rank of
+        J^T J with `numpy.linalg.matrix_rank` and `numpy.linalg.solve`
+        (versions up to 0.0.41). Default: 'cholesky'.
+    kernel: def k(x,y,p,r,J,work):
+        Fused residual and Jacobian evaluation into preallocated arrays; see
+        `sigmoid_residual_jacobian`. When given, `fit_func` and
+        `grad_p_fit_func` are not used. Default: None.
+    """
+
+    assert_equal(x_vec.size, y_vec.size)
+    assert_in(mode, ('cholesky', 'svd'))
+
+    if kernel is None:
+        kernel = fit_kernel(fit_func, grad_p_fit_func)
+
+    # Other initialization
+    n_params = param_vec_0.size
+    delta_norm_k = 1e10
+    param_vec = np.array(param_vec_0, dtype=np.float64)
+
+    # Work arrays; the iterations allocate no array of the data size
+    r_vec_k = np.empty(x_vec.size, dtype=np.float64)      # r(p_k)
+    r_vec_t = np.empty(x_vec.size, dtype=np.float64)      # r(p_k + s del p_k)
+    j_mtrx_k = np.empty((x_vec.size, n_params), dtype=np.float64)
+    jtj_mtrx_k = np.empty((n_params, n_params), dtype=np.float64)
+    jtr_vec_k = np.empty(n_params, dtype=np.float64)
+    param_vec_t = np.empty(n_params, dtype=np.float64)
+    work = (np.empty(x_vec.size, dtype=np.float64),
+            np.empty(x_vec.size, dtype=np.float64))
+
+    if verbose is True:
+        print('\n')
+        print('**************************************************************************')
+        print("                      Newton's Method Iterations                          ")
+        print('**************************************************************************')
+        print('k  ||r(p_k)||  ||J(p_k)||  ||J^T r(p_k)||  ||del p_k||   ||p_k||  |convg| ')
+        print('--------------------------------------------------------------------------')
+    #         1234567890 12345678901 123456789012345 123456789012 123456789 12345678
+
+    assert_true(k_max >= 1)
+    k = 1
+    converged = False
+
+    while not converged and k <= k_max:
+
+        # build the residual vector and the Jacobian matrix
+        kernel(x_vec, y_vec, param_vec, r_vec_k, j_mtrx_k, work)
+
+        # normal equations; formed once per iteration
+        np.matmul(j_mtrx_k.transpose(), j_mtrx_k, out=jtj_mtrx_k)
+        np.matmul(j_mtrx_k.transpose(), r_vec_k, out=jtr_vec_k)
+
+        if mode == 'cholesky':
+            (delta_vec_k, singular) = cholesky_solve(jtj_mtrx_k, -jtr_vec_k)
+        else:
+            rank = numpy.linalg.matrix_rank(jtj_mtrx_k)
+            singular = rank != n_params
+            if not singular:
+                delta_vec_k = numpy.linalg.solve(jtj_mtrx_k, -jtr_vec_k)
+
+        if singular:
+            if verbose is True:
+                print('')
+                print('*********************************************************************')
+                print('                             RANK DEFICIENCY')
+                print('*********************************************************************')
+                print('rank(JTJ) = %3i; shape(JTJ) = (%3i,%3i)'%
+                      (numpy.linalg.matrix_rank(jtj_mtrx_k), n_params, n_params))
+                print('JTJ = \n', jtj_mtrx_k)
+                print('*********************************************************************')
+                print('')
+            a_mtrx_k = jtj_mtrx_k
+            b_vec_k = -jtr_vec_k
+            delta_vec_k = numpy.linalg.solve(a_mtrx_k.transpose()@a_mtrx_k +
+                                             1e-3*np.eye(n_params),
+                                             a_mtrx_k.transpose()@b_vec_k)
+
+        r_norm_k = np.linalg.norm(r_vec_k)
+        step_size = 1.0
+        np.add(param_vec, delta_vec_k, out=param_vec_t)
+        kernel(x_vec, y_vec, param_vec_t, r_vec_t, None, work)
+        r_norm_t = np.linalg.norm(r_vec_t)
+
+        # halve also steps to undefined (nan) residuals
+        n_steps_max = 5
+        n_steps = 0
+        while not r_norm_t <= r_norm_k and n_steps <= n_steps_max:
+            step_size *= 0.5
+            np.multiply(delta_vec_k, step_size, out=param_vec_t)
+            param_vec_t += param_vec
+            kernel(x_vec, y_vec, param_vec_t, r_vec_t, None, work)
+            r_norm_t = np.linalg.norm(r_vec_t)
+            n_steps += 1
+
+        if step_size != 1.0 and verbose is True:
+            print('Step_size = ', step_size, ' n_steps = ', n_steps,
+                  ' n_steps_max = ', n_steps_max)
+
+        # compute the update to the root candidate
+        param_vec += step_size * delta_vec_k
+
+        np.matmul(j_mtrx_k.transpose(), r_vec_t, out=jtr_vec_k)
+        grad_norm_k = np.linalg.norm(jtr_vec_k)
+        converged = not (np.linalg.norm(delta_vec_k/param_vec) > rel_tol or
+                         grad_norm_k > 1e-3)
+
+        if verbose is True:
+
+            delta_norm_k_old = delta_norm_k
+            delta_norm_k = np.linalg.norm(delta_vec_k)
+
+            if delta_norm_k != 0.0 and delta_norm_k_old != 0.0:
+                convergence_factor = math.log(delta_norm_k, 10) / \
+                                     math.log(delta_norm_k_old, 10)
+            else:
+                convergence_factor = 0.0
+
+            print('%2i %+10.2e %+11.2e %+15.2e %+12.2e %+9.2e %8.2f'%\
+                  (k, r_norm_t, np.linalg.norm(j_mtrx_k), grad_norm_k,
+                   delta_norm_k, np.linalg.norm(param_vec),
+                   convergence_factor))
+
+        k = k + 1
+
+    rr2 = 1.0 - np.sum(r_vec_t**2) / np.sum((y_vec-np.mean(y_vec))**2)
+
+    if verbose is True:
+        print('******************************************************')
+        print('Root = ', param_vec)
+        print('R2   = ', rr2)
+
+    if k > k_max:
+        print('')
+        print('******************************************************')
+        print('WARNING: Convergence failure k > k_max                ')
+        print('******************************************************')
+        print('')
+
+    return (param_vec, rr2, k)
+
+def newton_nlls_batch_solve(x_vec, y_mtrx, fit_func, grad_p_fit_func,
+                            param_mtrx_0, mask=None,
+                            k_max=10, rel_tol=1.0e-3, verbose=False,
+                            mode='cholesky', kernel=None, normal_eqs=False):
+    """Newton's nonlinear least-squares fitting method for many data sets.
+
+    All rows of `y_mtrx` are fitted simultaneously. Each iteration stacks the
+    normal equations of the rows not yet converged and solves them with one
+    `numpy.linalg.solve` call; the step-halving line search and the
+    convergence test of `newton_nlls_solve` are applied row by row.
+
+    Parameters
+    ----------
+    x_vec: numpy.ndarray(float)
+        Values of the independent variable; shared by all rows.
+    y_mtrx: numpy.ndarray(float)
+        Values of the dependent variable; one row per data set padded to the
+        size of `x_vec`.
+    fit_func: def f(x,p):
+        Function definitio of the sigma function. `p[i]` is the column
+        vector of the i-th parameter of the rows.
+    grad_p_fit_func: def f_p(x,p):
+        Gradient of f wrt to the parameter vector; `p` as in `fit_func`.
+    param_mtrx_0: numpy.ndarray(float)
+        Parameter vector initial guess; one row per data set.
+    mask: numpy.ndarray(bool)
+        Valid entries of `y_mtrx`; padding is `False`. Default: all entries.
+    k_max: int
+        Maximum number of iterations.
+    rel_tol: float
+        Relative tolerance for convergence of Newton's method
+    verbose: bool
+        Flag for print out of internal information.
+    mode: str
+        Solution of the normal equations; see `newton_nlls_solve`.
+        Default: 'cholesky'.
+    kernel: def k(x,y,p,r,J,work):
+        Fused residual and Jacobian evaluation; see `newton_nlls_solve`.
+        `p` as in `fit_func`. Default: None.
+    normal_eqs: bool
+        Also return the J^T J of the last iteration of each row and the
+        squared norm of its final residual; see
+        `sigmoid_param_covariances`. Default: False.
+
+    Returns
+    -------
+    fit: tuple(numpy.ndarray(float), numpy.ndarray(float), numpy.ndarray(int))
+        (param_mtrx, rr2_vec, k_vec); one entry per row. `k_vec > k_max`
+        flags a convergence failure. With `normal_eqs`,
+        (param_mtrx, rr2_vec, k_vec, jtj_mtrx, rr_vec).
+    """
+
+    (n_rows, n_params) = param_mtrx_0.shape
+    assert_equal(y_mtrx.shape, (n_rows, x_vec.size))
+    assert_in(mode, ('cholesky', 'svd'))
+
+    if mask is None:
+        mask = np.ones(y_mtrx.shape, dtype=bool)
+    assert_equal(mask.shape, y_mtrx.shape)
+
+    if kernel is None:
+        kernel = fit_kernel(fit_func, grad_p_fit_func)
+
+    # Work arrays; the first rows are used for the rows not yet converged
+    r_buff = np.empty(y_mtrx.shape, dtype=np.float64)     # r(p_k)
+    r_t_buff = np.empty(y_mtrx.shape, dtype=np.float64)   # r(p_k + s del p_k)
+    j_buff = np.empty(y_mtrx.shape + (n_params,), dtype=np.float64)
+    work_buff = (np.empty(y_mtrx.shape, dtype=np.float64),
+                 np.empty(y_mtrx.shape, dtype=np.float64))
+
+    def evaluate(y_k, pad_k, param_k, r_k, j_k=None):
+        """Residual (and Jacobian) of rows at `param_k`; zero on padding."""
+        n_k = param_k.shape[0]
+        kernel(x_vec, y_k, param_k.transpose()[:, :, np.newaxis], r_k, j_k,
+               (work_buff[0][:n_k], work_buff[1][:n_k]))
+        np.copyto(r_k, 0.0, where=pad_k)
+        if j_k is not None:
+            np.copyto(j_k, 0.0, where=pad_k[:, :, np.newaxis])
+
+    # Other initialization
+    param_mtrx = np.array(param_mtrx_0, dtype=np.float64)
+    r_mtrx = np.zeros(y_mtrx.shape, dtype=np.float64)
+    k_vec = np.ones(n_rows, dtype=int)
+    active = np.ones(n_rows, dtype=bool)
+    rows = None
+
+    if normal_eqs:
+        jtj_mtrx = np.empty((n_rows, n_params, n_params), dtype=np.float64)
+
+    if verbose is True:
+        print('\n')
+        print('**************************************************************************')
+        print("                  Batched Newton's Method Iterations                      ")
+        print('**************************************************************************')
+        print('k  # active  max||r(p_k)||  max||J^T r(p_k)||  max||del p_k||            ')
+        print('--------------------------------------------------------------------------')
+
+    assert_true(k_max >= 1)
+    k = 1
+
+    # Padded entries may overflow in the kernel; they are masked out
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+
+        while active.any():
+
+            # gather the data of the active rows when the set changes
+            if rows is None or rows.size != np.sum(active):
+                rows = np.flatnonzero(active)
+                y_k = y_mtrx[rows]
+                pad_k = ~mask[rows]
+                n_k = rows.size
+                r_k = r_buff[:n_k]
+                r_t = r_t_buff[:n_k]
+                j_k = j_buff[:n_k]
+                j_t_k = j_k.transpose(0, 2, 1)
+
+            param_k = param_mtrx[rows]
+
+            # build the residual vectors and the Jacobian matrices
+            evaluate(y_k, pad_k, param_k, r_k, j_k)
+
+            jtj_k = j_t_k @ j_k
+            jtr_k = (j_t_k @ r_k[:, :, np.newaxis])[:, :, 0]
+
+            if normal_eqs:
+                jtj_mtrx[rows] = jtj_k
+
+            if mode == 'cholesky':
+                (delta_k, singular) = cholesky_solve(jtj_k, -jtr_k)
+                full = ~singular
+            else:
+                full = numpy.linalg.matrix_rank(jtj_k) == n_params
+                delta_k = np.zeros((n_k, n_params), dtype=np.float64)
+                if full.any():
+                    delta_k[full] = numpy.linalg.solve(
+                        jtj_k[full], -jtr_k[full][:, :, np.newaxis])[:, :, 0]
+
+            if not full.all():
+                if verbose is True:
+                    print('RANK DEFICIENCY: %i rows'%np.sum(~full))
+                a_mtrx_k = jtj_k[~full]
+                a_t_mtrx_k = a_mtrx_k.transpose(0, 2, 1)
+                b_vec_k = -jtr_k[~full][:, :, np.newaxis]
+                a_mtrx_k = a_t_mtrx_k @ a_mtrx_k + 1e-3*np.eye(n_params)
+                b_vec_k = a_t_mtrx_k @ b_vec_k
+                try:
+                    delta_k[~full] = numpy.linalg.solve(a_mtrx_k,
+                                                        b_vec_k)[:, :, 0]
+                except numpy.linalg.LinAlgError:
+                    # rows still singular (overflown parameters) fail below
+                    delta_def = np.full((a_mtrx_k.shape[0], n_params), np.nan)
+                    for (i, (a_mtrx, b_vec)) in enumerate(zip(a_mtrx_k,
+                                                              b_vec_k)):
+                        try:
+                            delta_def[i] = numpy.linalg.solve(a_mtrx,
+                                                              b_vec)[:, 0]
+                        except numpy.linalg.LinAlgError:
+                            pass
+                    delta_k[~full] = delta_def
+
+            # step-halving line search of the rows with increased residual
+            r_norm_k = np.linalg.norm(r_k, axis=1)
+            step_size = np.ones(n_k)
+            evaluate(y_k, pad_k, param_k + delta_k, r_t)
+
+            n_steps_max = 5
+            halve = ~(np.linalg.norm(r_t, axis=1) <= r_norm_k)
+            for n_steps in range(n_steps_max+1):
+                if not halve.any():
+                    break
+                step_size[halve] *= 0.5
+                r_h = np.empty((np.sum(halve), x_vec.size), dtype=np.float64)
+                evaluate(y_k[halve], pad_k[halve],
+                         param_k[halve] +
+                         step_size[halve, np.newaxis] * delta_k[halve], r_h)
+                r_t[halve] = r_h
+                halve[halve] = ~(np.linalg.norm(r_h, axis=1) <=
+                                 r_norm_k[halve])
+
+            # compute the update to the root candidates
+            param_k += step_size[:, np.newaxis] * delta_k
+
+            param_mtrx[rows] = param_k
+            r_mtrx[rows] = r_t
+            k_vec[rows] += 1
+
+            grad_norm = np.linalg.norm((j_t_k @ r_t[:, :, np.newaxis])[:, :, 0],
+                                       axis=1)
+            not_converged = (np.linalg.norm(delta_k/param_k, axis=1) > rel_tol) | \
+                            (grad_norm > 1e-3)
+            failed = ~np.isfinite(param_k).all(axis=1)
+            k_vec[rows[failed]] = k_max + 1
+            active[rows] = not_converged & ~failed & (k_vec[rows] <= k_max)
+
+            if verbose is True:
+                print('%2i %9i %+14.2e %+18.2e %+15.2e'%\
+                      (k, n_k, np.max(np.linalg.norm(r_t, axis=1)),
+                       np.max(grad_norm),
+                       np.max(np.linalg.norm(delta_k, axis=1))))
+
+            k = k + 1
+
+    n_y = np.sum(mask, axis=1)
+    y_mean = np.sum(np.where(mask, y_mtrx, 0.0), axis=1)/n_y
+    ss_tot = np.sum(np.where(mask, y_mtrx-y_mean[:, np.newaxis], 0.0)**2,
+                    axis=1)
+    rr_vec = np.sum(r_mtrx**2, axis=1)
+    rr2_vec = 1.0 - rr_vec / ss_tot
+
+    if verbose is True:
+        print('******************************************************')
+        print('min R2 = ', np.min(rr2_vec))
+
+    if np.any(k_vec > k_max):
+        print('')
+        print('******************************************************')
+        print('WARNING: Convergence failure k > k_max for %i of %i    '%
+              (np.sum(k_vec > k_max), n_rows))
+        print('******************************************************')
+        print('')
+
+    if normal_eqs:
+        return (param_mtrx, rr2_vec, k_vec, jtj_mtrx, rr_vec)
+
+    return (param_mtrx, rr2_vec, k_vec)
+
+def levenberg_marquardt_batch_solve(x_vec, y_mtrx, fit_func,
+                                    grad_p_fit_func, param_mtrx_0, mask=None,
+                                    k_max=10, rel_tol=1.0e-3, verbose=False,
+                                    kernel=None):
+    """Levenberg-Marquardt nonlinear least-squares fitting of many data sets.
+
+    The Gauss-Newton step of `newton_nlls_batch_solve` is damped,
+    (J^T J + lambda diag(J^T J)) v = -J^T r, with a damping lambda of each
+    row (initially 1) adapted from the ratio of the actual to the predicted
+    reduction of ||r||^2 (Nielsen's update); there is no line search. The
+    step v + a/2 adds the geodesic acceleration a (Transtrum and Sethna),
+    which follows the curved valley of the sigmoid parameters a_1, a_2 when
+    the data stop short of the inflection point; steps with
+    2||a||/||v|| > 0.75 are rejected. An iteration costs two residual
+    evaluations and, if the step is accepted, one Jacobian. Arguments, the
+    convergence test and the returned values are those of
+    `newton_nlls_batch_solve`.
+
+    Returns
+    -------
+    fit: tuple(numpy.ndarray(float), numpy.ndarray(float), numpy.ndarray(int))
+        (param_mtrx, rr2_vec, k_vec); one entry per row. `k_vec > k_max`
+        flags a convergence failure.
     """
 
-    assert_equal(x_vec.size, y_vec.size)
+    (n_rows, n_params) = param_mtrx_0.shape
+    assert_equal(y_mtrx.shape, (n_rows, x_vec.size))
+
+    if mask is None:
+        mask = np.ones(y_mtrx.shape, dtype=bool)
+    assert_equal(mask.shape, y_mtrx.shape)
+
+    if kernel is None:
+        kernel = fit_kernel(fit_func, grad_p_fit_func)
+
+    pad = ~mask
+    work_buff = (np.empty(y_mtrx.shape, dtype=np.float64),
+                 np.empty(y_mtrx.shape, dtype=np.float64))
+
+    def evaluate(rows, param_k, r_k, j_k=None):
+        """Residual (and Jacobian) of `rows` at `param_k`; zero on padding."""
+        kernel(x_vec, y_mtrx[rows], param_k.transpose()[:, :, np.newaxis],
+               r_k, j_k, (work_buff[0][:rows.size], work_buff[1][:rows.size]))
+        np.copyto(r_k, 0.0, where=pad[rows])
+        if j_k is not None:
+            np.copyto(j_k, 0.0, where=pad[rows][:, :, np.newaxis])
 
     # Other initialization
-    delta_vec_k = np.ones(param_vec_0.size, dtype=np.float64)*1e10
-    r_vec_k = np.ones(x_vec.size, dtype=np.float64)*1e10
-    j_mtrx_k = np.ones((x_vec.size, param_vec_0.size), dtype=np.float64)*1e10
-    param_vec = np.copy(param_vec_0)
+    param_mtrx = np.array(param_mtrx_0, dtype=np.float64)
+    r_mtrx = np.empty(y_mtrx.shape, dtype=np.float64)
+    j_tnsr = np.empty(y_mtrx.shape + (n_params,), dtype=np.float64)
+    lambda_vec = np.ones(n_rows)
+    nu_vec = np.full(n_rows, 2.0)
+    k_vec = np.ones(n_rows, dtype=int)
+    active = np.ones(n_rows, dtype=bool)
+    diag_ids = np.arange(n_params)
+    (geo_h, geo_alpha) = (0.1, 0.75)  # finite difference step; max. ratio
 
     if verbose is True:
         print('\n')
         print('**************************************************************************')
-        print("                      Newton's Method Iterations                          ")
+        print("                  Levenberg-Marquardt Iterations                          ")
         print('**************************************************************************')
-        print('k  ||r(p_k)||  ||J(p_k)||  ||J^T r(p_k)||  ||del p_k||   ||p_k||  |convg| ')
+        print('k  # active  # accepted  max||r(p_k)||  median lambda                    ')
         print('--------------------------------------------------------------------------')
-    #         1234567890 12345678901 123456789012345 123456789012 123456789 12345678
 
     assert_true(k_max >= 1)
     k = 1
 
-    while (np.linalg.norm(delta_vec_k/param_vec) > rel_tol or np.linalg.norm(j_mtrx_k.transpose()@r_vec_k) > 1e-3) and k <= k_max:
-
-        # build the residual vector
-        r_vec_k = y_vec - fit_func(x_vec, param_vec)
-
-        # build the Jacobian matrix
-        grad_p_f = grad_p_fit_func(x_vec, param_vec)
-
-        j_mtrx_k = np.zeros((x_vec.size, param_vec.size), dtype=np.float64 )  # initialize matrix
-        for (i, grad_p_f_i) in enumerate(grad_p_f):
-            j_mtrx_k[:, i] = - grad_p_f_i
+    # Padded entries may overflow in the kernel; they are masked out
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+
+        evaluate(np.arange(n_rows), param_mtrx, r_mtrx, j_tnsr)
+        cost_vec = np.sum(r_mtrx**2, axis=1)
+
+        while active.any():
+
+            rows = np.flatnonzero(active)
+            j_k = j_tnsr[rows]
+            j_t_k = j_k.transpose(0, 2, 1)
+
+            jtj_k = j_t_k @ j_k
+            jtr_k = (j_t_k @ r_mtrx[rows][:, :, np.newaxis])[:, :, 0]
+
+            # damped normal equations; Marquardt's scaling by diag(J^T J)
+            diag_k = jtj_k[:, diag_ids, diag_ids]
+            diag_k = np.maximum(diag_k, 1e-12*np.max(diag_k, axis=1,
+                                                     keepdims=True))
+            lambda_k = lambda_vec[rows]
+            jtj_k[:, diag_ids, diag_ids] += lambda_k[:, np.newaxis]*diag_k
+
+            (delta_k, singular) = cholesky_solve(jtj_k, -jtr_k)
+
+            # geodesic acceleration: second directional derivative of r along
+            # the velocity delta_k by finite difference
+            r_t = np.empty((rows.size, x_vec.size), dtype=np.float64)
+            evaluate(rows, param_mtrx[rows] + geo_h*delta_k, r_t)
+            r_vv = 2.0/geo_h*((r_t - r_mtrx[rows])/geo_h -
+                              (j_k @ delta_k[:, :, np.newaxis])[:, :, 0])
+            (accel_k, _) = cholesky_solve(
+                jtj_k, -(j_t_k @ r_vv[:, :, np.newaxis])[:, :, 0])
+            geo_ratio = 2.0*np.sqrt(np.sum(diag_k*accel_k**2, axis=1) /
+                                    np.sum(diag_k*delta_k**2, axis=1))
+
+            param_t = param_mtrx[rows] + delta_k + 0.5*accel_k
+            evaluate(rows, param_t, r_t)
+            cost_t = np.sum(r_t**2, axis=1)
+
+            # gain ratio of the actual to the predicted reduction
+            predicted = np.sum(delta_k*(lambda_k[:, np.newaxis]*diag_k*delta_k
+                                        - jtr_k), axis=1)
+            rho = (cost_vec[rows] - cost_t)/predicted
+            accept = ~singular & (geo_ratio <= geo_alpha) & (rho > 0.0)
+            delta_k += 0.5*accel_k
+
+            rho_a = rho[accept]
+            lambda_vec[rows] = np.where(
+                accept, lambda_k*np.maximum(1.0/3.0, 1.0-(2.0*np.where(
+                    accept, rho, 0.5)-1.0)**3), lambda_k*nu_vec[rows])
+            nu_vec[rows] = np.where(accept, 2.0, 2.0*nu_vec[rows])
+
+            # accepted steps; same convergence test as Newton's method
+            rows_a = rows[accept]
+            param_mtrx[rows_a] = param_t[accept]
+            r_mtrx[rows_a] = r_t[accept]
+            cost_vec[rows_a] = cost_t[accept]
+
+            grad_norm = np.linalg.norm(
+                (j_t_k[accept] @ r_t[accept][:, :, np.newaxis])[:, :, 0],
+                axis=1)
+            converged = np.zeros(rows.size, dtype=bool)
+            converged[accept] = ~(
+                (np.linalg.norm(delta_k[accept]/param_t[accept], axis=1) >
+                 rel_tol) | (grad_norm > 1e-3))
+
+            k_vec[rows] += 1
+            active[rows] = ~converged & (k_vec[rows] <= k_max)
+
+            # Jacobian of the accepted rows still iterating
+            rows_j = rows[accept & active[rows]]
+            if rows_j.size:
+                j_new = np.empty((rows_j.size, x_vec.size, n_params),
+                                 dtype=np.float64)
+                evaluate(rows_j, param_mtrx[rows_j], r_t[:rows_j.size], j_new)
+                j_tnsr[rows_j] = j_new
+
+            if verbose is True:
+                print('%2i %9i %11i %+14.2e %+14.2e'%\
+                      (k, rows.size, rho_a.size,
+                       np.sqrt(np.max(cost_vec[rows])),
+                       np.median(lambda_vec[rows])))
+
+            k = k + 1
+
+    n_y = np.sum(mask, axis=1)
+    y_mean = np.sum(np.where(mask, y_mtrx, 0.0), axis=1)/n_y
+    ss_tot = np.sum(np.where(mask, y_mtrx-y_mean[:, np.newaxis], 0.0)**2,
+                    axis=1)
+    rr2_vec = 1.0 - cost_vec / ss_tot
 
-        delta_vec_k_old = np.copy(delta_vec_k)
+    if verbose is True:
+        print('******************************************************')
+        print('min R2 = ', np.min(rr2_vec))
 
-        rank = numpy.linalg.matrix_rank(j_mtrx_k.transpose()@j_mtrx_k)
+    if np.any(k_vec > k_max):
+        print('')
+        print('******************************************************')
+        print('WARNING: Convergence failure k > k_max for %i of %i    '%
+              (np.sum(k_vec > k_max), n_rows))
+        print('******************************************************')
+        print('')
 
-        if rank != param_vec.size and verbose == True:
-            print('')
-            print('*********************************************************************')
-            print('                             RANK DEFICIENCY')
-            print('*********************************************************************')
-            print('rank(JTJ) = %3i; shape(JTJ) = (%3i,%3i)'%
-                  (rank, (j_mtrx_k.transpose()@j_mtrx_k).shape[0],
-                         (j_mtrx_k.transpose()@j_mtrx_k).shape[1]))
-            print('JTJ = \n', j_mtrx_k.transpose()@j_mtrx_k)
-            print('*********************************************************************')
-            print('')
+    return (param_mtrx, rr2_vec, k_vec)
 
-        if rank == param_vec.size:
-            delta_vec_k = numpy.linalg.solve(j_mtrx_k.transpose()@j_mtrx_k,
-                                             -j_mtrx_k.transpose()@r_vec_k)
-        else:
-            a_mtrx_k = j_mtrx_k.transpose()@j_mtrx_k
-            b_vec_k = -j_mtrx_k.transpose()@r_vec_k
-            delta_vec_k = numpy.linalg.solve(a_mtrx_k.transpose()@a_mtrx_k +
-                                             1e-3*np.eye(param_vec.size),
-                                             a_mtrx_k.transpose()@b_vec_k)
+def levenberg_marquardt_solve(x_vec, y_vec, fit_func, grad_p_fit_func,
+                              param_vec_0,
+                              k_max=10, rel_tol=1.0e-3, verbose=True,
+                              kernel=None):
+    """Levenberg-Marquardt nonlinear least-squares fitting method.
 
-        r_vec_k_old = np.copy(r_vec_k)
-        step_size = 1.0
-        r_vec_k = y_vec - fit_func(x_vec, param_vec + delta_vec_k)
+    Single data set version of `levenberg_marquardt_batch_solve`; arguments
+    and returned values as in `newton_nlls_solve`.
+    """
 
-        n_steps_max = 5
-        n_steps = 0
-        while (np.linalg.norm(r_vec_k) > np.linalg.norm(r_vec_k_old)) \
-              and n_steps <= n_steps_max:
-            step_size *= 0.5
-            r_vec_k = y_vec - fit_func(x_vec, param_vec +
-                                       step_size*delta_vec_k)
-            n_steps += 1
+    assert_equal(x_vec.size, y_vec.size)
 
-        if step_size != 1.0 and verbose is True:
-            print('Step_size = ', step_size, ' n_steps = ', n_steps,
-                  ' n_steps_max = ', n_steps_max)
+    (param_mtrx, rr2_vec, k_vec) = \
+        levenberg_marquardt_batch_solve(x_vec, y_vec[np.newaxis, :],
+                                        fit_func, grad_p_fit_func,
+                                        param_vec_0[np.newaxis, :], None,
+                                        k_max, rel_tol, verbose, kernel)
+
+    return (param_mtrx[0], rr2_vec[0], int(k_vec[0]))
+
+def varpro_nlls_batch_solve(x_vec, y_mtrx, fit_func, grad_p_fit_func,
+                            param_mtrx_0, mask=None,
+                            k_max=10, rel_tol=1.0e-3, verbose=False,
+                            kernel=None):
+    """Variable projection fitting of f = a_0 g(x; a_1, a_2) to many data sets.
+
+    The function is linear in `a_0`; for given nonlinear parameters
+    q = (ln a_1, a_2) the optimal a_0 = g^T y / g^T g is eliminated and the
+    projected residual r(q) = y - a_0(q) g(q) is minimized over q alone by
+    the Gauss-Newton iteration, step-halving line search and convergence
+    test of `newton_nlls_batch_solve` (Golub and Pereyra). Iterating on
+    ln a_1 keeps a_1 > 0 (no pole of the sigmoid) and its step is the
+    relative change of a_1; a step moves a_2 at most half the way to 0, so
+    a_2 keeps its sign. A row whose residual does not decrease after 30 step
+    halvings stops as a convergence failure. The basis g and its gradient
+    are evaluated with `kernel` at a_0 = 1 and y = 0; the initial guess of
+    a_0 is not used. Arguments and returned values as in
+    `newton_nlls_batch_solve`.
 
-        # compute the update to the root candidate
-        param_vec += step_size * delta_vec_k
+    Returns
+    -------
+    fit: tuple(numpy.ndarray(float), numpy.ndarray(float), numpy.ndarray(int))
+        (param_mtrx, rr2_vec, k_vec); one entry per row. `k_vec > k_max`
+        flags a convergence failure.
+    """
 
-        if k > 0:
-            if np.linalg.norm(delta_vec_k) != 0.0 and \
-                    np.linalg.norm(delta_vec_k_old) != 0.0:
+    (n_rows, n_params) = param_mtrx_0.shape
+    assert_equal(y_mtrx.shape, (n_rows, x_vec.size))
+
+    if mask is None:
+        mask = np.ones(y_mtrx.shape, dtype=bool)
+    assert_equal(mask.shape, y_mtrx.shape)
+
+    if kernel is None:
+        kernel = fit_kernel(fit_func, grad_p_fit_func)
+
+    y_mtrx = np.where(mask, y_mtrx, 0.0)
+    zero_buff = np.zeros(y_mtrx.shape, dtype=np.float64)
+    g_buff = np.empty(y_mtrx.shape, dtype=np.float64)
+    # gradient of g by columns; the kernel writes through a transposed view
+    dg_buff = np.empty((n_params,) + y_mtrx.shape, dtype=np.float64)
+    work_buff = (np.empty(y_mtrx.shape, dtype=np.float64),
+                 np.empty(y_mtrx.shape, dtype=np.float64))
+
+    def project(y_k, pad_k, q_k, r_k, j_k=None):
+        """Projected residual (and Jacobian columns wrt q); returns a_0."""
+        n_k = q_k.shape[0]
+        g_k = g_buff[:n_k]
+        dg_k = dg_buff[:, :n_k].transpose(1, 2, 0) if j_k is not None else None
+        param_k = np.concatenate((np.ones((1, n_k)), q_k.transpose()))
+        param_k[1] = np.exp(param_k[1])
+        kernel(x_vec, zero_buff[:n_k], param_k[:, :, np.newaxis], g_k, dg_k,
+               (work_buff[0][:n_k], work_buff[1][:n_k]))
+        # r = -g and J = -grad_p g at a_0 = 1, y = 0
+        np.negative(g_k, out=g_k)
+        np.copyto(g_k, 0.0, where=pad_k)
+        g_g = np.einsum('ij,ij->i', g_k, g_k)
+        a_0 = np.einsum('ij,ij->i', g_k, y_k)/g_g
+        np.multiply(g_k, a_0[:, np.newaxis], out=r_k)
+        np.subtract(y_k, r_k, out=r_k)
+        if j_k is not None:
+            for (i, j_i) in enumerate(j_k):
+                dg_i = dg_buff[i+1, :n_k]
+                np.negative(dg_i, out=dg_i)
+                if i == 0:
+                    dg_i *= param_k[1][:, np.newaxis]  # d/d ln a_1
+                np.copyto(dg_i, 0.0, where=pad_k)
+                # derivative of a_0(q) from the normal equation g^T r = 0
+                da_0 = (np.einsum('ij,ij->i', dg_i, r_k) -
+                        a_0*np.einsum('ij,ij->i', dg_i, g_k))/g_g
+                np.multiply(dg_i, -a_0[:, np.newaxis], out=j_i)
+                j_i -= g_k*da_0[:, np.newaxis]
+        return a_0
 
-                convergence_factor = math.log(np.linalg.norm(delta_vec_k),
-                                              10) / \
-                math.log(np.linalg.norm(delta_vec_k_old), 10)
-            else:
-                convergence_factor = 0.0
-        else:
-            convergence_factor = 0.0
+    # Other initialization
+    assert_true(np.all(param_mtrx_0[:, 1] > 0.0))
+    q_mtrx = np.array(param_mtrx_0[:, 1:], dtype=np.float64)
+    q_mtrx[:, 0] = np.log(q_mtrx[:, 0])
+    a_0_vec = np.zeros(n_rows, dtype=np.float64)
+    r_mtrx = np.zeros(y_mtrx.shape, dtype=np.float64)
+    k_vec = np.ones(n_rows, dtype=int)
+    active = np.ones(n_rows, dtype=bool)
+    rows = None
 
-        if verbose is True:
-            print('%2i %+10.2e %+11.2e %+15.2e %+12.2e %+9.2e %8.2f'%\
-                  (k, np.linalg.norm(r_vec_k), np.linalg.norm(j_mtrx_k),
-                   np.linalg.norm(j_mtrx_k.transpose()@r_vec_k),
-                   np.linalg.norm(delta_vec_k), np.linalg.norm(param_vec),
-                   convergence_factor))
+    if verbose is True:
+        print('\n')
+        print('**************************************************************************')
+        print("                  Variable Projection Iterations                          ")
+        print('**************************************************************************')
+        print('k  # active  max||r(q_k)||  max||J^T r(q_k)||  max||del q_k||            ')
+        print('--------------------------------------------------------------------------')
 
-        k = k + 1
+    assert_true(k_max >= 1)
+    k = 1
 
-    rr2 = 1.0 - np.sum(r_vec_k**2) / np.sum((y_vec-np.mean(y_vec))**2)
+    # Padded entries may overflow in the kernel; they are masked out
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+
+        while active.any():
+
+            # gather the data of the active rows when the set changes
+            if rows is None or rows.size != np.sum(active):
+                rows = np.flatnonzero(active)
+                y_k = y_mtrx[rows]
+                pad_k = ~mask[rows]
+                n_k = rows.size
+                r_k = np.empty((n_k, x_vec.size), dtype=np.float64)
+                r_t = np.empty((n_k, x_vec.size), dtype=np.float64)
+                j_k = np.empty((n_params-1, n_k, x_vec.size),
+                               dtype=np.float64)
+
+            q_k = q_mtrx[rows]
+
+            a_0_k = project(y_k, pad_k, q_k, r_k, j_k)
+
+            jtj_k = np.einsum('kij,lij->ikl', j_k, j_k)
+            jtr_k = np.einsum('kij,ij->ik', j_k, r_k)
+
+            (delta_k, singular) = cholesky_solve(jtj_k, -jtr_k)
+
+            if singular.any():
+                if verbose is True:
+                    print('RANK DEFICIENCY: %i rows'%np.sum(singular))
+                a_mtrx_k = jtj_k[singular]
+                a_t_mtrx_k = a_mtrx_k.transpose(0, 2, 1)
+                b_vec_k = -jtr_k[singular][:, :, np.newaxis]
+                delta_k[singular] = numpy.linalg.solve(
+                    a_t_mtrx_k @ a_mtrx_k + 1e-3*np.eye(n_params-1),
+                    a_t_mtrx_k @ b_vec_k)[:, :, 0]
+
+            # a_2 keeps its sign: at most half the way to 0 per step
+            toward_0 = delta_k[:, 1]*q_k[:, 1] < 0.0
+            step_size = np.ones(n_k)
+            step_size[toward_0] = np.minimum(
+                1.0, -0.5*q_k[toward_0, 1]/delta_k[toward_0, 1])
+
+            # step-halving line search of the rows with increased residual;
+            # rows without decrease stay put and stop
+            r_norm_k = np.linalg.norm(r_k, axis=1)
+            a_0_t = project(y_k, pad_k,
+                            q_k + step_size[:, np.newaxis]*delta_k, r_t)
+
+            n_steps_max = 30
+            halve = ~(np.linalg.norm(r_t, axis=1) <= r_norm_k)
+            for n_steps in range(n_steps_max+1):
+                if not halve.any():
+                    break
+                step_size[halve] *= 0.5
+                r_h = np.empty((np.sum(halve), x_vec.size), dtype=np.float64)
+                a_0_t[halve] = project(
+                    y_k[halve], pad_k[halve],
+                    q_k[halve] + step_size[halve, np.newaxis]*delta_k[halve],
+                    r_h)
+                r_t[halve] = r_h
+                halve[halve] = ~(np.linalg.norm(r_h, axis=1) <=
+                                 r_norm_k[halve])
+
+            step_size[halve] = 0.0
+            a_0_t[halve] = a_0_k[halve]
+            r_t[halve] = r_k[halve]
+
+            # compute the update to the root candidates
+            delta_k *= step_size[:, np.newaxis]
+            q_k += delta_k
+
+            q_mtrx[rows] = q_k
+            a_0_vec[rows] = a_0_t
+            r_mtrx[rows] = r_t
+            k_vec[rows] += 1
+
+            grad_norm = np.linalg.norm(np.einsum('kij,ij->ik', j_k, r_t),
+                                       axis=1)
+            rel_delta_k = delta_k/q_k
+            rel_delta_k[:, 0] = delta_k[:, 0]
+            not_converged = (np.linalg.norm(rel_delta_k, axis=1) > rel_tol) | \
+                            (grad_norm > 1e-3)
+            k_vec[rows[halve & not_converged]] = k_max + 1
+            active[rows] = not_converged & (k_vec[rows] <= k_max)
+
+            if verbose is True:
+                print('%2i %9i %+14.2e %+18.2e %+15.2e'%\
+                      (k, n_k, np.max(np.linalg.norm(r_t, axis=1)),
+                       np.max(grad_norm),
+                       np.max(np.linalg.norm(delta_k, axis=1))))
+
+            k = k + 1
+
+    param_mtrx = np.column_stack((a_0_vec, np.exp(q_mtrx[:, 0]),
+                                  q_mtrx[:, 1:]))
+
+    n_y = np.sum(mask, axis=1)
+    y_mean = np.sum(y_mtrx, axis=1)/n_y
+    ss_tot = np.sum(np.where(mask, y_mtrx-y_mean[:, np.newaxis], 0.0)**2,
+                    axis=1)
+    rr2_vec = 1.0 - np.sum(r_mtrx**2, axis=1) / ss_tot
 
     if verbose is True:
         print('******************************************************')
-        print('Root = ', param_vec)
-        print('R2   = ', rr2)
+        print('min R2 = ', np.min(rr2_vec))
 
-    if k > k_max:
+    if np.any(k_vec > k_max):
         print('')
         print('******************************************************')
-        print('WARNING: Convergence failure k > k_max                ')
+        print('WARNING: Convergence failure k > k_max for %i of %i    '%
+              (np.sum(k_vec > k_max), n_rows))
         print('******************************************************')
         print('')
 
-    return (param_vec, rr2, k)
+    return (param_mtrx, rr2_vec, k_vec)
+
+def varpro_nlls_solve(x_vec, y_vec, fit_func, grad_p_fit_func, param_vec_0,
+                      k_max=10, rel_tol=1.0e-3, verbose=True, kernel=None):
+    """Variable projection fitting of f = a_0 g(x; a_1, a_2).
+
+    Single data set version of `varpro_nlls_batch_solve`; arguments and
+    returned values as in `newton_nlls_solve`.
+    """
+
+    assert_equal(x_vec.size, y_vec.size)
+
+    (param_mtrx, rr2_vec, k_vec) = \
+        varpro_nlls_batch_solve(x_vec, y_vec[np.newaxis, :],
+                                fit_func, grad_p_fit_func,
+                                param_vec_0[np.newaxis, :], None,
+                                k_max, rel_tol, verbose, kernel)
+
+    return (param_mtrx[0], rr2_vec[0], int(k_vec[0]))
+
+# Nonlinear least-squares solvers of `Surge`: (one data set, batch)
+NLLS_SOLVERS = {'newton': (newton_nlls_solve, newton_nlls_batch_solve),
+                'lm': (levenberg_marquardt_solve,
+                       levenberg_marquardt_batch_solve),
+                'varpro': (varpro_nlls_solve, varpro_nlls_batch_solve)}
+
+# Thread counts of BLAS and OpenMP libraries; set to 1 in worker processes
+BLAS_THREAD_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                    'MKL_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS',
+                    'NUMEXPR_NUM_THREADS')
+
+def detect_waves(cases_mtrx, window=7, min_wave_days=28, depth=0.5,
+                 min_wave_rel=5.0):
+    """First days of the waves of cumulative series.
+
+    The daily increments of all series (columns) are smoothed by a centered
+    moving average of `window` days at once. A new wave starts at a trough
+    of the smoothed increments: the smallest within `min_wave_days` days on
+    each side (the first day of a flat trough) and below `depth` times the
+    peaks before and after it. Troughs are then kept in date order when the
+    wave they end and the rest of the series each have at least
+    `min_wave_rel` percent of the cases of the series.
+
+    Parameters
+    ----------
+    cases_mtrx: numpy.ndarray
+        Cumulative cases; one series per column.
+    window: int
+        Days of the moving average of the daily increments. Default: 7.
+    min_wave_days: int
+        Days on each side of a trough. Default: 28.
+    depth: float
+        Largest ratio of a trough to the peaks on either side. Default: 0.5.
+    min_wave_rel: float
+        Smallest percentage of cases of a wave. Default: 5.
+
+    Returns
+    -------
+    wave_starts: numpy.ndarray(bool)
+        `True` on the first day of each wave after the first; shape of
+        `cases_mtrx`.
+    """
+
+    cases_mtrx = np.asarray(cases_mtrx, dtype=np.float64)
+    assert_equal(cases_mtrx.ndim, 2)
+    assert_true(window >= 1 and min_wave_days >= 1)
+    n_dates = cases_mtrx.shape[0]
+
+    increments = np.diff(cases_mtrx, axis=0, prepend=cases_mtrx[:1])
+    np.maximum(increments, 0.0, out=increments)  # downward data revisions
+
+    half = window//2
+    smooth = np.lib.stride_tricks.sliding_window_view(
+        np.pad(increments, ((half, window-1-half), (0, 0)), mode='edge'),
+        window, axis=0).mean(axis=-1)
+
+    # minima over the `min_wave_days` days before and after each day
+    span = min_wave_days
+    windows = np.lib.stride_tricks.sliding_window_view(
+        np.pad(smooth, ((span, span), (0, 0)), constant_values=np.inf),
+        span, axis=0)
+    min_before = np.min(windows[:n_dates], axis=-1)
+    min_after = np.min(windows[span+1:span+1+n_dates], axis=-1)
+
+    # peaks before and after each day
+    max_before = np.maximum.accumulate(smooth, axis=0)
+    max_after = np.maximum.accumulate(smooth[::-1], axis=0)[::-1]
+
+    troughs = (smooth < min_before) & (smooth <= min_after) & \
+              (smooth < depth*np.minimum(max_before, max_after))
+
+    wave_starts = np.zeros(cases_mtrx.shape, dtype=bool)
+    min_cases = min_wave_rel/100*cases_mtrx[-1]
+    (cols, days) = np.nonzero(troughs.transpose())
+    level = dict()
+    for (col, day) in zip(cols, days):
+        cases = cases_mtrx[day-1, col]
+        if cases - level.get(col, 0.0) >= min_cases[col] and \
+                cases_mtrx[-1, col] - cases >= min_cases[col]:
+            wave_starts[day, col] = True
+            level[col] = cases
+
+    return wave_starts
+
+def shift_sigmoid_params(param_vec, scale, shift):
+    """Sigmoid parameters of the data times `scale` and times minus `shift`.
+
+    Warm start of a fit whose data scaling and first (trimmed) date changed:
+    `a_0*scale/(1 + a_1*exp(a_2*(t + shift)))` of the new times `t`.
+
+    Parameters
+    ----------
+    param_vec: numpy.ndarray(float)
+        Sigmoid parameters `a_0`, `a_1`, `a_2` (shape parameters of the
+        growth model unchanged); or an array of them in its last axis.
+    scale: float or numpy.ndarray(float)
+        Ratio of the scaling of the data to the new scaling.
+    shift: float or numpy.ndarray(float)
+        Days from the first date of the data to the new first date.
+
+    Returns
+    -------
+    param_vec: numpy.ndarray(float)
+        New parameters (a copy).
+    """
+
+    param_vec = np.array(param_vec, dtype=np.float64)
+    param_vec[..., 0] *= scale
+    param_vec[..., 1] *= np.exp(param_vec[..., 2]*shift)
+
+    return param_vec
+
+def sigmoid_param_covariance(x_vec, y_vec, param_vec, model='logistic'):
+    """Asymptotic covariance of least-squares sigmoid parameters.
+
+    `sigma^2 (J^T J)^-1` with the Jacobian `J` and the residual variance
+    `sigma^2 = ||r||^2/(n - n_params)` at the solution; one evaluation of
+    the kernel of the growth model, whatever the solver. See
+    `sigmoid_param_covariances` for many fits.
+
+    Parameters
+    ----------
+    x_vec: numpy.ndarray(float)
+        Times of the data.
+    y_vec: numpy.ndarray(float)
+        Data fitted.
+    param_vec: numpy.ndarray(float)
+        Fitted sigmoid parameters `a_0`, `a_1`, `a_2` (and shape).
+    model: str or GrowthModel
+        Key of `GROWTH_MODELS` or a growth model. Default: 'logistic'.
+
+    Returns
+    -------
+    param_cov: numpy.ndarray(float)
+        Covariance matrix of the parameters.
+    sigma2: float
+        Residual variance.
+    """
+
+    (param_cov, sigma2) = sigmoid_param_covariances(
+        x_vec, y_vec[np.newaxis, :], np.asarray(param_vec)[np.newaxis, :],
+        model=model)
+
+    return (param_cov[0], float(sigma2[0]))
+
+def sigmoid_param_covariances(x_vec, y_mtrx, param_mtrx, mask=None,
+                              model='logistic', normal_eqs=None):
+    """Asymptotic covariances of the least-squares fits of many data sets.
+
+    As `sigmoid_param_covariance` for the padded rows of a batch: the
+    kernel is evaluated once for all rows and the stacked J^T J are
+    inverted together by `cholesky_solve`. Given the `normal_eqs` of
+    `newton_nlls_batch_solve`, the kernel is not evaluated.
+
+    Parameters
+    ----------
+    x_vec: numpy.ndarray(float)
+        Times of the data; shared by all rows.
+    y_mtrx: numpy.ndarray(float)
+        Data fitted; one row per data set padded to the size of `x_vec`.
+    param_mtrx: numpy.ndarray(float)
+        Fitted parameters; one row per data set.
+    mask: numpy.ndarray(bool)
+        Valid entries of `y_mtrx`; padding is `False`. Default: all entries.
+    model: str or GrowthModel
+        Key of `GROWTH_MODELS` or a growth model. Default: 'logistic'.
+    normal_eqs: tuple(numpy.ndarray(float), numpy.ndarray(float))
+        `(jtj_mtrx, rr_vec)`: J^T J and the squared residual norm of each
+        row. Default: None (evaluated at `param_mtrx`).
+
+    Returns
+    -------
+    param_cov: numpy.ndarray(float)
+        Covariance matrices of the parameters; shape (rows, p, p).
+    sigma2: numpy.ndarray(float)
+        Residual variance of each row.
+    """
+
+    (n_rows, n_params) = param_mtrx.shape
+
+    if mask is None:
+        mask = np.ones(y_mtrx.shape, dtype=bool)
+    n_y = np.sum(mask, axis=1)
+    assert_true(np.all(n_y > n_params))
+
+    if normal_eqs is None:
+        r_mtrx = np.empty(y_mtrx.shape, dtype=np.float64)
+        j_mtrx = np.empty(y_mtrx.shape + (n_params,), dtype=np.float64)
+        # padded entries may overflow in the kernel; they are masked out
+        with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+            get_growth_model(model).kernel(
+                x_vec, y_mtrx, param_mtrx.transpose()[:, :, np.newaxis],
+                r_mtrx, j_mtrx)
+        np.copyto(r_mtrx, 0.0, where=~mask)
+        np.copyto(j_mtrx, 0.0, where=~mask[:, :, np.newaxis])
+        jtj_mtrx = j_mtrx.transpose(0, 2, 1) @ j_mtrx
+        rr_vec = np.sum(r_mtrx**2, axis=1)
+    else:
+        (jtj_mtrx, rr_vec) = normal_eqs
+
+    sigma2 = rr_vec/(n_y - n_params)
+
+    # (J^T J)^-1 column by column; rank deficient rows by pseudo-inverse
+    identity = np.eye(n_params)
+    columns = list()
+    for i in range(n_params):
+        (column, singular) = cholesky_solve(
+            jtj_mtrx, np.broadcast_to(identity[i], (n_rows, n_params)))
+        columns.append(column)
+    jtj_inv = np.stack(columns, axis=-1)
+
+    pinv_rows = singular & np.isfinite(jtj_mtrx).all(axis=(1, 2))
+    if pinv_rows.any():
+        jtj_inv[pinv_rows] = np.linalg.pinv(jtj_mtrx[pinv_rows],
+                                            hermitian=True)
+    jtj_inv[singular & ~pinv_rows] = np.nan
+
+    return (sigma2[:, np.newaxis, np.newaxis]*jtj_inv, sigma2)
+
+def critical_times(param_mtrx, model='logistic', first_dates=None,
+                   gradients=False, debug=False):
+    """Critical times of the fits of many communities in one pass.
+
+    Parameters
+    ----------
+    param_mtrx: numpy.ndarray(float)
+        Fitted parameters; one row per community.
+    model: str
+        Key of `GROWTH_MODELS`. Default: 'logistic'.
+    first_dates: numpy.ndarray(datetime64[D])
+        First date of the data of each fit. If given, the dates of the
+        critical times (first day at or after each) are returned; `NaT`
+        for undefined times. Default: None.
+    gradients: bool
+        Return the gradients of `tcc` and `dtc` with respect to the
+        parameters, by central differences, for standard errors by the
+        delta method. Default: False.
+    debug: bool
+        Check the closed-form times against the derivatives of the model:
+        zero acceleration at `tcc` and `t_max_accel < tcc < t_min_accel`
+        for every fit of valid parameters. Default: False.
+
+    Returns
+    -------
+    times: dict(numpy.ndarray)
+        Time at maximum growth rate ('tcc'), half surge period ('dtc'),
+        surge period ('surge_period'), times of maximum and minimum growth
+        acceleration ('t_max_accel', 't_min_accel'), maximum growth rate
+        ('peak_rate') and the extreme accelerations ('max_accel',
+        'min_accel'); 'tcc_date', 't_max_accel_date', 't_min_accel_date'
+        with `first_dates`; 'tcc_grad', 'dtc_grad' with `gradients`.
+
+    Examples
+    --------
+    >>> fit_data = surge.multi_fit_data()
+    >>> times = critical_times(fit_data.param_mtrx, surge.model,
+    ...                        fit_data.dates[fit_data.offsets])
+    """
+
+    assert_in(model, GROWTH_MODELS)
+    growth_model = GROWTH_MODELS[model]
+
+    param_mtrx = np.asarray(param_mtrx, dtype=np.float64)
+    assert_equal(param_mtrx.ndim, 2)
+    assert_equal(param_mtrx.shape[1], growth_model.n_params)
+
+    # parameters along the first axis, as the models take them
+    param_vec = param_mtrx.T
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+
+        time_mtrx = np.array(growth_model.critical_times(param_vec))
+        (rate, accel) = growth_model.derivatives(time_mtrx, param_vec)
+
+        (tcc, t_max, t_min) = time_mtrx
+        dtc = (t_min - t_max)/2
+
+        times = {'tcc': tcc, 'dtc': dtc, 'surge_period': 2*dtc,
+                 't_max_accel': t_max, 't_min_accel': t_min,
+                 'peak_rate': rate[0], 'max_accel': accel[1],
+                 'min_accel': accel[2]}
+
+        if first_dates is not None:
+            days = np.ceil(time_mtrx).astype('timedelta64[D]')
+            (times['tcc_date'], times['t_max_accel_date'],
+             times['t_min_accel_date']) = np.asarray(first_dates) + days
+
+        if gradients:
+            # one step of each parameter along a last axis
+            step = 1.e-6*np.abs(param_mtrx)
+            delta = (step[:, :, np.newaxis] *
+                     np.eye(param_mtrx.shape[1])).transpose(1, 0, 2)
+            param_plus = param_vec[:, :, np.newaxis] + delta
+            param_minus = param_vec[:, :, np.newaxis] - delta
+            grad_times = (np.array(growth_model.critical_times(param_plus)) -
+                          np.array(growth_model.critical_times(param_minus)))\
+                          /(2*step)
+            times['tcc_grad'] = grad_times[0]
+            times['dtc_grad'] = (grad_times[2] - grad_times[1])/2
+
+    if debug:
+        valid = growth_model.valid(param_vec)
+        # inflection point of the fit at the maximum growth rate
+        assert_true(np.all(np.abs(accel[0][valid]) <=
+                           1.e-6*np.abs(accel[1][valid])))
+        assert_true(np.all(t_max[valid] < tcc[valid]))
+        assert_true(np.all(tcc[valid] < t_min[valid]))
+
+    return times
+
+def bootstrap_fit_sigmoid(cases, param_vec, n_replicates, k_max, rel_tol,
+                          solver='newton', seed=0, model='logistic'):
+    """Residual bootstrap of the sigmoid fit of scaled data.
+
+    Replicates of the data are the fitted sigmoid plus residuals of the fit
+    resampled with replacement. All replicates are fitted with one batch
+    solver call started from `param_vec`.
+
+    Parameters
+    ----------
+    cases: numpy.ndarray(float)
+        Scaled data; times start at 0.
+    param_vec: numpy.ndarray(float)
+        Sigmoid parameters fitted to `cases`.
+    n_replicates: int
+        Number of bootstrap replicates.
+    k_max: int
+        Maximum number of iterations.
+    rel_tol: float
+        Relative tolerance for convergence.
+    solver: str
+        Key of `NLLS_SOLVERS`. Default: 'newton'.
+    seed: int
+        Seed of the resampling. Default: 0.
+    model: str or GrowthModel
+        Key of `GROWTH_MODELS` or a growth model. Default: 'logistic'.
+
+    Returns
+    -------
+    param_mtrx: numpy.ndarray(float)
+        Sigmoid parameters of the replicates converged to a growing sigmoid
+        (one per row).
+    """
+
+    assert_true(n_replicates >= 1)
+
+    growth_model = get_growth_model(model)
+    times = np.array(range(cases.size), dtype=np.float64)
+    fit = growth_model.func(times, param_vec)
+
+    rng = np.random.default_rng(seed)
+    y_mtrx = fit + rng.choice(cases - fit, (n_replicates, cases.size))
+
+    (param_mtrx, _, k_vec) = NLLS_SOLVERS[solver][1](
+        times, y_mtrx, None, None, np.tile(param_vec, (n_replicates, 1)),
+        None, k_max, rel_tol, verbose=False, kernel=growth_model.kernel)
+
+    converged = (k_vec <= k_max) & growth_model.valid(param_mtrx.transpose())
+
+    return param_mtrx[converged]
+
+def pad_cases(cases_list, n_times=None):
+    """Pad a list of data to a matrix; times start at 0 in all rows.
+
+    Parameters
+    ----------
+    cases_list: list(numpy.ndarray(float))
+        Data of each community.
+    n_times: int
+        Padded size. Default: None (longest data).
+
+    Returns
+    -------
+    padded: tuple(numpy.ndarray(float), numpy.ndarray(float),
+                  numpy.ndarray(bool))
+        (times, cases_mtrx, mask); `mask` flags the data in `cases_mtrx`.
+    """
+
+    sizes = np.array([cases.size for cases in cases_list])
+    if n_times is None:
+        n_times = sizes.max()
+    times = np.array(range(n_times), dtype=np.float64)
+
+    mask = times < sizes[:, np.newaxis]
+    cases_mtrx = np.zeros(mask.shape, dtype=np.float64)
+    cases_mtrx[mask] = np.concatenate(cases_list)
+
+    return (times, cases_mtrx, mask)
+
+def fit_sigmoids(cases_list, param_vec_0_list, k_max, rel_tol, batch=True,
+                 solver='newton', n_times=None, model='logistic',
+                 covariance=False):
+    """Fit sigmoids to a list of scaled data; see `Surge.multi_fit_data`.
+
+    Parameters
+    ----------
+    cases_list: list(numpy.ndarray(float))
+        Scaled data of each community; times start at 0.
+    param_vec_0_list: list(numpy.ndarray(float))
+        Initial guess of each community.
+    k_max: int
+        Maximum number of iterations.
+    rel_tol: float
+        Relative tolerance for convergence.
+    batch: bool
+        Fit all data with one batch solver call. Default: True.
+    solver: str
+        Key of `NLLS_SOLVERS`. Default: 'newton'.
+    n_times: int
+        Padded size of the batch. Default: None (longest data).
+    model: str or GrowthModel
+        Key of `GROWTH_MODELS` or a growth model. Default: 'logistic'.
+    covariance: bool
+        Also return the covariance of the parameters and the residual
+        variance of each fit; see `sigmoid_param_covariances`. The batched
+        Newton solver provides its last J^T J; for the other solvers J^T J
+        is evaluated once for the whole padded batch. Default: False.
+
+    Returns
+    -------
+    fits: list(tuple)
+        `(param_vec, rr2, k)` of each data as in `newton_nlls_solve`;
+        `(param_vec, rr2, k, param_cov, sigma2)` with `covariance`.
+    """
+
+    if len(cases_list) == 0:
+        return list()
+
+    (solve, batch_solve) = NLLS_SOLVERS[solver]
+    kernel = get_growth_model(model).kernel
+
+    if not batch:
+        fits = [solve(np.array(range(cases.size), dtype=np.float64),
+                      cases, None, None, param_vec_0, k_max, rel_tol,
+                      verbose=False, kernel=kernel)
+                for (cases, param_vec_0) in zip(cases_list,
+                                                param_vec_0_list)]
+        if not covariance:
+            return fits
+
+    # Pad the data to the longest series; times start at 0 in all rows
+    (times, cases_mtrx, mask) = pad_cases(cases_list, n_times)
+
+    normal_eqs = None
+
+    if not batch:
+        param_mtrx = np.array([param_vec for (param_vec, _, _) in fits])
+    elif covariance and batch_solve is newton_nlls_batch_solve:
+        (param_mtrx, rr2_vec, k_vec, jtj_mtrx, rr_vec) = \
+            batch_solve(times, cases_mtrx, None, None,
+                        np.array(param_vec_0_list), mask,
+                        k_max, rel_tol, verbose=False, kernel=kernel,
+                        normal_eqs=True)
+        fits = list(zip(param_mtrx, rr2_vec, k_vec))
+        normal_eqs = (jtj_mtrx, rr_vec)
+    else:
+        (param_mtrx, rr2_vec, k_vec) = \
+            batch_solve(times, cases_mtrx, None, None,
+                        np.array(param_vec_0_list), mask,
+                        k_max, rel_tol, verbose=False, kernel=kernel)
+        fits = list(zip(param_mtrx, rr2_vec, k_vec))
+
+    if not covariance:
+        return fits
+
+    (param_covs, sigma2_vec) = sigmoid_param_covariances(
+        times, cases_mtrx, param_mtrx, mask, model, normal_eqs)
+
+    return [fit + (param_cov, sigma2) for (fit, param_cov, sigma2) in
+            zip(fits, param_covs, sigma2_vec)]
+
+def parallel_fit_sigmoids(cases_list, param_vec_0_list, k_max, rel_tol,
+                          batch=True, solver='newton', n_jobs=1,
+                          model='logistic', covariance=False):
+    """Fit sigmoids to a list of scaled data with a pool of processes.
+
+    The data are split in `n_jobs` contiguous chunks, each fitted by
+    `fit_sigmoids` in a spawned worker process. Only the data series are
+    sent to the workers; the batches of all chunks are padded to the same
+    size, so the fits are identical to a serial `fit_sigmoids` call and in
+    the same order. The workers start with one BLAS/OpenMP thread each.
+
+    Parameters
+    ----------
+    n_jobs: int
+        Number of worker processes; -1 uses all cores and 1 fits in this
+        process. Default: 1.
+
+    Other parameters and returned values as in `fit_sigmoids`.
+    """
+
+    assert_true(n_jobs == -1 or n_jobs >= 1)
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    n_jobs = min(n_jobs, len(cases_list))
+
+    if n_jobs <= 1:
+        return fit_sigmoids(cases_list, param_vec_0_list, k_max, rel_tol,
+                            batch, solver, model=model, covariance=covariance)
+
+    n_times = max(cases.size for cases in cases_list)
+    bounds = np.linspace(0, len(cases_list), n_jobs+1).astype(int)
+
+    # the environment of the parent is inherited when the workers spawn
+    saved_vars = {var: os.environ.get(var) for var in BLAS_THREAD_VARS}
+    os.environ.update({var: '1' for var in BLAS_THREAD_VARS})
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+                n_jobs, mp_context=multiprocessing.get_context('spawn')) \
+                as executor:
+            futures = [executor.submit(fit_sigmoids, cases_list[begin:end],
+                                       param_vec_0_list[begin:end], k_max,
+                                       rel_tol, batch, solver, n_times,
+                                       model, covariance)
+                       for (begin, end) in zip(bounds[:-1], bounds[1:])]
+            fits = [fit for future in futures for fit in future.result()]
+    finally:
+        for (var, value) in saved_vars.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+    return fits
+
+class FitCache:
+    """Persistent cache of the sigmoid fits of `Surge.multi_fit_data`.
+
+    A JSON file keeps the last fit of each community: the first (trimmed)
+    and last dates of its data, a SHA-1 digest of the counts between them,
+    the scaling of the data, the fit settings and `(param_vec, rr2, k)` of
+    the scaled data with the covariance of the parameters and the residual
+    variance. A fit of unchanged data is returned as is; for data
+    with one more day the cached parameters are a warm start of the solver.
+    The digest covers past dates, so revised data are fitted from scratch.
+    """
+
+    FILENAME = 'fit_cache.json'
+
+    def __init__(self, path=None, cache_dir=None):
+        """Load the cache file, if any.
+
+        Parameters
+        ----------
+        path: str
+            Cache file. `None` will use `fit_cache.json` in the cache
+            directory; see `get_cache_dir`.
+        cache_dir: str
+            Cache directory used when `path` is `None`.
+        """
+
+        if path is None:
+            path = os.path.join(get_cache_dir(cache_dir), self.FILENAME)
+
+        self.path = path
+        self.entries = dict()
+        self.stats = {'hit': 0, 'warm': 0, 'miss': 0}
+
+        if os.path.isfile(path):
+            with open(path, 'r') as fh:
+                self.entries = json.load(fh)
+
+    @staticmethod
+    def digest(counts):
+        """SHA-1 hex digest of the counts as float64 values."""
+        return hashlib.sha1(np.ascontiguousarray(counts, dtype=np.float64)
+                            .tobytes()).hexdigest()
+
+    def get(self, key, dates, counts, start, scaling, settings):
+        """Return the cached fit or a warm start of a community.
+
+        Parameters
+        ----------
+        key: str
+            Community key; e.g. locale, sub-locale, case type and name.
+        dates: numpy.ndarray(datetime64[D])
+            Dates of the data.
+        counts: numpy.ndarray
+            Data of the community at `dates` (not trimmed nor scaled).
+        start: int
+            Index of the first date of the trimmed data.
+        scaling: float
+            Scaling of the trimmed data.
+        settings: dict
+            Fit settings; a cached entry is used only if they are equal.
+
+        Returns
+        -------
+        cached: tuple
+            `(fit, param_vec_0)`: the cached `(param_vec, rr2, k)` of
+            unchanged data, with `(param_cov, sigma2)` appended if stored,
+            or the initial guess of the scaled data with one more day;
+            `None` otherwise.
+        """
+
+        entry = self.entries.get(key)
+
+        if entry is None or entry['settings'] != settings:
+            self.stats['miss'] += 1
+            return (None, None)
+
+        first_id = np.searchsorted(dates, np.datetime64(entry['first_date']))
+        end_id = np.searchsorted(dates, np.datetime64(entry['end_date']))
+
+        if end_id >= dates.size or \
+           dates[first_id] != np.datetime64(entry['first_date']) or \
+           dates[end_id] != np.datetime64(entry['end_date']) or \
+           self.digest(counts[first_id:end_id+1]) != entry['sha1']:
+            self.stats['miss'] += 1
+            return (None, None)
+
+        param_vec = np.array(entry['param_vec'])
+
+        if end_id == dates.size-1 and first_id == start:
+            self.stats['hit'] += 1
+            fit = (param_vec, entry['rr2'], entry['k'])
+            if 'param_cov' in entry:
+                fit += (np.array(entry['param_cov']), entry['sigma2'])
+            return (fit, None)
+
+        if end_id == dates.size-2 and entry['k'] <= settings['k_max']:
+            self.stats['warm'] += 1
+            return (None, shift_sigmoid_params(param_vec,
+                                               entry['scaling']/scaling,
+                                               start-first_id))
+
+        self.stats['miss'] += 1
+        return (None, None)
+
+    def put(self, key, dates, counts, start, scaling, settings, fit):
+        """Store the fit `(param_vec, rr2, k)` of a community, optionally
+        followed by `(param_cov, sigma2)`; see `get`."""
+
+        (param_vec, rr2, k) = fit[:3]
+
+        entry = {'first_date': str(dates[start]),
+                 'end_date': str(dates[-1]),
+                 'sha1': self.digest(counts[start:]),
+                 'scaling': float(scaling),
+                 'settings': settings,
+                 'param_vec': [float(p) for p in param_vec],
+                 'rr2': float(rr2), 'k': int(k)}
+
+        if len(fit) == 5:
+            (param_cov, sigma2) = fit[3:]
+            entry['param_cov'] = np.asarray(param_cov, dtype=float).tolist()
+            entry['sigma2'] = float(sigma2)
+
+        self.entries[key] = entry
+
+    def save(self):
+        """Write the cache file; replaced atomically."""
+
+        tmp_file = self.path+'.tmp%i'%os.getpid()
+        with open(tmp_file, 'w') as fh:
+            json.dump(self.entries, fh)
+        os.replace(tmp_file, self.path)
+
+class FitResults:
+    """Fits of communities by `Surge.multi_fit_data` held in columns.
+
+    Row `i` has the name of a community, its (unscaled) parameters, R2,
+    solver iterations, critical times `tcc`, `dtc`, a status code and the
+    column and first row of its data in the shared `cases_mtrx`; the data
+    are sliced from it on demand, not copied. A dictionary maps names to
+    rows. Iterating yields the `(surge period, [name, dates, cases,
+    param_vec, tcc, dtc, extras])` tuples of the former list of fits.
+
+    Examples
+    --------
+    >>> fit_data = surge.multi_fit_data()
+    >>> (name, dates, cases, param_vec, tcc, dtc, extras) = fit_data['Ohio']
+    >>> fast = fit_data[fit_data.surge_period < 30].sort('tcc')
+    >>> dtf = fit_data.to_dataframe()
+    """
+
+    OK = 0
+    NO_CONVERGENCE = 1
+    BEFORE_PEAK = 2
+    PAST_PEAK = 3
+    STATUS = ('ok', 'no convergence', 'before peak', 'past peak')
+
+    def __init__(self, names, param_mtrx, rr2, k, tcc, dtc, status, columns,
+                 offsets, extras, dates, cases_mtrx, trim_rel_small_n_cases):
+        """Build the columns.
+
+        Parameters
+        ----------
+        names: list(str)
+            Names of the communities; one per row.
+        param_mtrx: numpy.ndarray
+            Parameters of the fits; shape `(n_rows, n_params)`.
+        rr2: numpy.ndarray
+            Coefficients of determination of the fits.
+        k: numpy.ndarray
+            Solver iterations of the fits.
+        tcc: numpy.ndarray
+            Times at peak surge rate since the first date of the data.
+        dtc: numpy.ndarray
+            Half surge periods.
+        status: numpy.ndarray
+            Status codes; `FitResults.OK` and others in `STATUS`.
+        columns: numpy.ndarray
+            Columns of the communities in `cases_mtrx`.
+        offsets: numpy.ndarray
+            First row of the trimmed data of the communities.
+        extras: list(dict)
+            Extra results of each fit; see `Surge.multi_fit_data`.
+        dates: numpy.ndarray(datetime64[D])
+            Dates of the rows of `cases_mtrx`.
+        cases_mtrx: numpy.ndarray
+            Shared data matrix; one column per community.
+        trim_rel_small_n_cases: float
+            Percentage of the last count below which the data were trimmed.
+        """
+
+        self.names = np.array(names, dtype=object)
+        self.param_mtrx = np.asarray(param_mtrx, dtype=np.float64)
+        self.rr2 = np.asarray(rr2, dtype=np.float64)
+        self.k = np.asarray(k, dtype=np.int64)
+        self.tcc = np.asarray(tcc, dtype=np.float64)
+        self.dtc = np.asarray(dtc, dtype=np.float64)
+        self.status = np.asarray(status, dtype=np.int8)
+        self.columns = np.asarray(columns, dtype=np.int64)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.extras = list(extras)
+
+        self.dates = dates
+        self.cases_mtrx = cases_mtrx
+        self.trim_rel_small_n_cases = trim_rel_small_n_cases
+
+        assert_equal(self.param_mtrx.shape[0], self.names.size)
+        for column in (self.rr2, self.k, self.tcc, self.dtc, self.status,
+                       self.columns, self.offsets):
+            assert_equal(column.shape, self.names.shape)
+        assert_equal(len(self.extras), self.names.size)
+
+        self.rows = {name: i for (i, name) in enumerate(self.names)}
+
+    def __get_surge_period(self):
+
+        return 2*self.dtc
+    surge_period = property(__get_surge_period, None, None,
+                            'Surge periods (2*dtc) of the rows.')
+
+    def __len__(self):
+
+        return self.names.size
+
+    def __contains__(self, name):
+
+        return name in self.rows
+
+    def __iter__(self):
+
+        for (i, surge_period) in enumerate(self.surge_period):
+            yield (surge_period, self.record(i))
+
+    def __getitem__(self, key):
+        """Record of a name; otherwise the rows selected by NumPy indexing.
+
+        Parameters
+        ----------
+        key: str or int or slice or numpy.ndarray
+            A name returns its record (see `record`). An integer, slice,
+            index array or boolean mask returns a new `FitResults`.
+        """
+
+        if isinstance(key, str):
+            return self.record(self.row(key))
+
+        ids = np.atleast_1d(np.arange(len(self))[key])
+
+        return FitResults(self.names[ids], self.param_mtrx[ids],
+                          self.rr2[ids], self.k[ids], self.tcc[ids],
+                          self.dtc[ids], self.status[ids], self.columns[ids],
+                          self.offsets[ids],
+                          [self.extras[i] for i in ids],
+                          self.dates, self.cases_mtrx,
+                          self.trim_rel_small_n_cases)
+
+    def row(self, name):
+        """Row of `name`."""
+
+        assert_in(name, self.rows, msg_fmt='{first!r} not in the fits')
+
+        return self.rows[name]
+
+    def data(self, i):
+        """Trimmed dates and cases of row `i`, as fitted.
+
+        Returns
+        -------
+        data: tuple
+            `(dates, cases)`; the cases are `float64`.
+        """
+
+        icases = self.cases_mtrx[self.offsets[i]:, self.columns[i]]
+        ids = np.where(icases >
+                       self.trim_rel_small_n_cases/100*icases[-1])[0]
+
+        return (self.dates[self.offsets[i]+ids],
+                np.array(icases[ids], dtype=np.float64))
+
+    def record(self, i):
+        """Row `i` as `[name, dates, cases, param_vec, tcc, dtc, extras]`."""
+
+        (dates, icases) = self.data(i)
+
+        return [self.names[i], dates, icases, np.array(self.param_mtrx[i]),
+                self.tcc[i], self.dtc[i], self.extras[i]]
+
+    def sort(self, key='surge_period', reverse=False):
+        """Rows sorted by a column.
+
+        Parameters
+        ----------
+        key: str
+            Column name; e.g. 'surge_period', 'tcc', 'rr2' or 'names'.
+            Ties keep their order.
+        reverse: bool
+            Descending order.
+
+        Returns
+        -------
+        fit_results: FitResults
+        """
+
+        values = getattr(self, key)
+        assert_equal(np.shape(values), self.names.shape)
+
+        ids = np.argsort(values, kind='stable')
+        if reverse:
+            ids = ids[::-1]
+
+        return self[ids]
+
+    def to_dataframe(self):
+        """Columns as a `pandas.DataFrame` indexed by name.
+
+        The parameters are in columns `a_0`, `a_1`, ...; the status codes
+        are given by their `STATUS` labels.
+        """
+
+        dtf = pd.DataFrame(self.param_mtrx,
+                           index=pd.Index(self.names, name='name'),
+                           columns=['a_%i'%i for i in
+                                    range(self.param_mtrx.shape[1])])
+
+        dtf['rr2'] = self.rr2
+        dtf['k'] = self.k
+        dtf['tcc'] = self.tcc
+        dtf['dtc'] = self.dtc
+        dtf['surge_period'] = self.surge_period
+        dtf['status'] = [self.STATUS[s] for s in self.status]
+        dtf['first_date'] = self.dates[self.offsets]
+        dtf['column'] = self.columns
+
+        return dtf
 
 def color_map(num_colors):
     """Nice colormap internal helper method for plotting.
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Pytest fixtures with synthetic data files in the Johns Hopkins format."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+N_DAYS = 120
+
+def jhu_dates(n_days):
+    """Dates in the Johns Hopkins column format M/D/YY."""
+    dates = pd.date_range('2020-01-22', periods=n_days, freq='D')
+    return ['%i/%i/%s'%(d.month, d.day, d.strftime('%y')) for d in dates]
+
+def sigmoid_series(rng, a_0, n_days, n_waves=1):
+    """Integer cumulative series following a noisy sigmoid per wave."""
+    times = np.arange(n_days)
+    cases = np.zeros(n_days)
+    for wave in range(n_waves):
+        a_2 = -rng.uniform(0.08, 0.16)
+        tcc = rng.uniform(55, 75) + 120*wave
+        cases += a_0/(1 + np.exp(-a_2*tcc)*np.exp(a_2*times))
+    cases *= 1 + rng.normal(0, 0.01, n_days)
+    return np.maximum.accumulate(np.floor(cases)).astype(int)
+
+def write_us_csv(path, n_days=N_DAYS, confirmed=False, seed=0, n_waves=1,
+                 territory=False):
+    """Write a US county file with a few states.
+
+    A `territory` adds Guam; a row with an empty Admin2 (county) column.
+    """
+    rng = np.random.default_rng(seed)
+    states = {'Massachusetts': ['Essex', 'Middlesex', 'Suffolk'],
+              'New York': ['Albany', 'Kings', 'Queens', 'Westchester'],
+              'Wyoming': ['Albany', 'Teton', 'Weston']}
+    if territory:
+        states = {'Guam': [None], **states}
+    columns = ['UID', 'iso2', 'iso3', 'code3', 'FIPS', 'Admin2',
+               'Province_State', 'Country_Region', 'Lat', 'Long_',
+               'Combined_Key']
+    if not confirmed:
+        columns.append('Population')
+    rows = list()
+    uid = 84000000
+    for (state, counties) in states.items():
+        for county in counties:
+            uid += 1
+            population = int(rng.integers(50000, 2000000))
+            cases = sigmoid_series(rng, population*1e-3, n_days, n_waves)
+            combined_key = (county+', ' if county else '')+state+', US'
+            row = [uid, 'US', 'USA', 840, float(uid%100000), county, state,
+                   'US', 42.0, -71.0, combined_key]
+            if confirmed:
+                row += list(20*cases)
+            else:
+                row += [population] + list(cases)
+            rows.append(row)
+    pd.DataFrame(rows, columns=columns+jhu_dates(n_days)).to_csv(path,
+                                                                 index=False)
+    return str(path)
+
+def write_global_csv(path, n_days=N_DAYS, seed=1):
+    """Write a global file; one country with several provinces."""
+    rng = np.random.default_rng(seed)
+    rows = list()
+    for country in ['Brazil', 'Canada', 'Italy', 'Spain']:
+        provinces = ['Ontario', 'Quebec'] if country == 'Canada' else [None]
+        for province in provinces:
+            cases = sigmoid_series(rng, rng.uniform(5000, 30000), n_days)
+            rows.append([province, country, 1.0, 2.0] + list(cases))
+    pd.DataFrame(rows, columns=['Province/State', 'Country/Region', 'Lat',
+                                'Long']+jhu_dates(n_days)).to_csv(path,
+                                                                  index=False)
+    return str(path)
+
+@pytest.fixture
+def us_deaths_csv(tmp_path):
+    """Synthetic `time_series_covid19_deaths_US.csv`."""
+    return write_us_csv(tmp_path/'deaths_US.csv')
+
+@pytest.fixture
+def us_territory_csv(tmp_path):
+    """Synthetic `time_series_covid19_deaths_US.csv` with a territory."""
+    return write_us_csv(tmp_path/'territory_US.csv', territory=True)
+
+@pytest.fixture
+def us_waves_csv(tmp_path):
+    """Synthetic `time_series_covid19_deaths_US.csv` of two waves."""
+    return write_us_csv(tmp_path/'waves_US.csv', n_days=2*N_DAYS, n_waves=2)
+
+@pytest.fixture
+def us_confirmed_csv(tmp_path):
+    """Synthetic `time_series_covid19_confirmed_US.csv`; 20 x deaths."""
+    return write_us_csv(tmp_path/'confirmed_US.csv', confirmed=True)
+
+@pytest.fixture
+def global_deaths_csv(tmp_path):
+    """Synthetic `time_series_covid19_deaths_global.csv`."""
+    return write_global_csv(tmp_path/'deaths_global.csv')
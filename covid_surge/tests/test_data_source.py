@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Pytest of Surge data sources and the download cache (no network)."""
+
+import datetime
+import functools
+import http.server
+import os
+import pathlib
+import threading
+
+import numpy as np
+import pandas as pd
+from asserts import (assert_equal, assert_is, assert_raises, assert_true)
+
+from covid_surge import Surge
+from covid_surge.src.surge import (UsDataset, get_covid_us_dataset,
+                                   format_dates, get_data_file,
+                                   get_us_population_table)
+
+def test_local_data_source(us_deaths_csv, global_deaths_csv):
+    """Local paths and file:// URLs."""
+    us_surge = Surge(data_source=us_deaths_csv)
+    assert_equal(us_surge.names, ['Massachusetts', 'New York', 'Wyoming'])
+
+    ny_surge = Surge(locale='US', sub_locale='New York',
+                     data_source=pathlib.Path(us_deaths_csv).as_uri())
+    assert_equal(ny_surge.names, ['Albany', 'Kings', 'Queens', 'Westchester'])
+
+    global_surge = Surge(locale='global', data_source=global_deaths_csv)
+    assert_equal(len(global_surge.names), 4)
+
+    us32_surge = Surge(data_source=us_deaths_csv, dtype=np.float32)
+    assert_equal(us32_surge.cases.dtype, np.float32)
+    assert_true(np.array_equal(us32_surge.cases, us_surge.cases))
+
+def test_shared_dataset(us_deaths_csv):
+    """Surge objects of the same file share one parsed dataset."""
+    dataset = get_covid_us_dataset(data_source=us_deaths_csv)
+    assert_is(get_covid_us_dataset(data_source=us_deaths_csv), dataset)
+
+    us_surge = Surge(data_source=us_deaths_csv)
+    assert_is(us_surge.dataset, dataset)
+
+    # Wyoming stops at the Weston row
+    assert_equal(dataset.state_index, {'Massachusetts': (0, 3),
+                                       'New York': (3, 7), 'Wyoming': (7, 9)})
+
+    for (state_id, state) in enumerate(us_surge.names):
+        c_surge = Surge(locale='US', sub_locale=state, dataset=dataset)
+        (names, populations, dates, cases) = dataset.counties(state)
+        assert_true(np.shares_memory(cases, dataset.cases))
+        assert_equal(c_surge.names, names)
+        assert_true(np.array_equal(np.sum(c_surge.cases, axis=1),
+                                   us_surge.cases[:, state_id]))
+        assert_equal(sum(c_surge.populations), us_surge.populations[state_id])
+
+def test_confirmed_cases(tmp_path, us_deaths_csv, us_confirmed_csv):
+    """Confirmed cases use the population table of a local deaths file."""
+    cache_dir = str(tmp_path/'cache')
+
+    us_surge = Surge(data_source=us_deaths_csv)
+    c_surge = Surge(data_source=us_confirmed_csv, cache_dir=cache_dir,
+                    offline=True, case_type='confirmed',
+                    population_source=us_deaths_csv)
+    assert_equal(c_surge.names, us_surge.names)
+    assert_true(np.array_equal(c_surge.populations, us_surge.populations))
+    assert_true(np.array_equal(c_surge.cases, 20*us_surge.cases))
+
+    tables = list(pathlib.Path(cache_dir).glob('us_population_*.csv'))
+    assert_equal(len(tables), 1)
+    population = get_us_population_table(cache_dir, offline=True,
+                                         data_source=us_deaths_csv)
+    assert_equal(len(population), 10)
+
+    # an updated deaths file gets a new table
+    dtf = pd.read_csv(us_deaths_csv)
+    dtf['Population'] *= 2
+    dtf.to_csv(us_deaths_csv, index=False)
+    assert_true(np.array_equal(
+        get_us_population_table(cache_dir, offline=True,
+                                data_source=us_deaths_csv),
+        2*population))
+
+    # counties missing in the table have no population and are not fitted
+    dtf = pd.read_csv(us_confirmed_csv)
+    dtf.loc[dtf['Admin2'] == 'Kings', 'UID'] = 1
+    dtf.to_csv(us_confirmed_csv, index=False)
+    c_surge = Surge(sub_locale='New York', data_source=us_confirmed_csv,
+                    cache_dir=cache_dir, offline=True, case_type='confirmed',
+                    population_source=us_deaths_csv)
+    kings = c_surge.names.index('Kings')
+    assert_true(np.isnan(c_surge.populations[kings]))
+    assert_equal(np.sum(np.isnan(c_surge.populations)), 1)
+    fit_data = c_surge.multi_fit_data(rejected=True)
+    assert_true('Kings' not in fit_data.names)
+    assert_equal(len(fit_data), 3)
+
+def test_date_range(us_deaths_csv):
+    """Start and end dates as str, date or datetime64."""
+    us_surge = Surge(data_source=us_deaths_csv)
+    assert_equal(us_surge.dates.dtype, np.dtype('datetime64[D]'))
+    assert_equal(us_surge.dates[0], np.datetime64('2020-01-22'))
+
+    us_surge.end_date = '4/20/20'
+    assert_equal(us_surge.dates[-1], np.datetime64('2020-04-20'))
+    assert_equal(us_surge.cases.shape[0], 90)
+
+    us_surge.start_date = datetime.date(2020, 3, 1)
+    assert_equal(us_surge.dates[0], np.datetime64('2020-03-01'))
+    assert_equal(us_surge.cases.shape[0], 51)
+
+    us_surge.end_date = np.datetime64('2020-04-10')
+    assert_equal(format_dates(us_surge.dates[[0, -1]]).tolist(),
+                 ['3/1/20', '4/10/20'])
+
+    # read-only views of the shared dataset
+    assert_true(np.shares_memory(us_surge.cases, us_surge.dataset.state_cases))
+    assert_true(not us_surge.cases.flags.writeable)
+
+    us_surge.start_date = None
+    us_surge.end_date = None
+    us_surge.ignore_last_n_days = 5
+    assert_equal(us_surge.cases.shape[0], 115)
+
+    # the earlier of end_date and ignore_last_n_days ends the range
+    us_surge.end_date = '5/10/20'
+    assert_equal(us_surge.cases.shape[0], 110)
+    us_surge.end_date = '5/20/20'
+    assert_equal(us_surge.cases.shape[0], 115)
+
+    with assert_raises(AssertionError):
+        us_surge.end_date = '1/1/21'
+
+def test_binary_store(tmp_path, us_deaths_csv):
+    """Datasets saved in a binary store reopen memory-mapped."""
+    us_surge = Surge(data_source=us_deaths_csv)
+    store = str(tmp_path/'us_store')
+    us_surge.dataset.save(store)
+
+    m_surge = Surge(data_source=store)
+    assert_true(isinstance(m_surge.dataset.cases, np.memmap))
+    assert_equal(m_surge.names, us_surge.names)
+    assert_true(np.array_equal(m_surge.populations, us_surge.populations))
+    assert_true(np.array_equal(m_surge.cases, us_surge.cases))
+
+    ny_surge = Surge(locale='US', sub_locale='New York', data_source=store)
+    assert_equal(ny_surge.names, ['Albany', 'Kings', 'Queens', 'Westchester'])
+
+def test_refresh(tmp_path, us_territory_csv):
+    """Refresh of a stored dataset parses the new dates only."""
+    us_deaths_csv = us_territory_csv  # Guam has no county name
+    old_csv = str(tmp_path/'old_deaths_US.csv')
+    pd.read_csv(us_deaths_csv).iloc[:, :-5].to_csv(old_csv, index=False)
+
+    store = str(tmp_path/'us_store')
+    UsDataset(data_source=old_csv).save(store)
+
+    dataset = UsDataset.open(store)
+    changed = dataset.refresh(data_source=us_deaths_csv)
+    dataset.save(store)
+
+    full = UsDataset(data_source=us_deaths_csv)
+    assert_equal(full.keys()[0], ('Guam', ''))
+    dataset = UsDataset.open(store)
+    assert_equal(dataset.keys(), full.keys())
+    assert_true(np.array_equal(dataset.dates, full.dates))
+    assert_true(np.array_equal(dataset.cases, full.cases))
+    assert_true(np.array_equal(dataset.state_cases, full.state_cases))
+
+    (ids,) = np.where(full.cases[-1, :] != full.cases[-6, :])
+    assert_equal(changed, [full.keys()[i] for i in ids])
+    assert_equal(dataset.refresh(data_source=us_deaths_csv), [])
+
+def test_download_cache(tmp_path, us_deaths_csv):
+    """Remote file is downloaded once and is available offline."""
+    requests = list()
+
+    class Handler(http.server.SimpleHTTPRequestHandler):
+        """Record requests instead of logging them."""
+        def log_message(self, fmt, *args):
+            requests.append(args)
+
+    handler = functools.partial(Handler,
+                                directory=os.path.dirname(us_deaths_csv))
+    server = http.server.ThreadingHTTPServer(('localhost', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        url = 'http://localhost:%i/deaths_US.csv'%server.server_address[1]
+        cache_dir = str(tmp_path/'cache')
+
+        path = get_data_file(url, cache_dir=cache_dir)
+        assert_equal(get_data_file(url, cache_dir=cache_dir), path)
+        assert_equal(len(requests), 1)  # within the time to live
+
+        assert_equal(get_data_file(url, cache_dir=cache_dir, ttl=-1), path)
+        assert_equal(len(requests), 2)
+        assert_true('304' in requests[-1])  # validated, not downloaded
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    us_surge = Surge(data_source=url, cache_dir=cache_dir, offline=True)
+    assert_equal(len(us_surge.names), 3)
+
+    with assert_raises(AssertionError):
+        get_data_file(url+'.missing', cache_dir=cache_dir, offline=True)
@@ -0,0 +1,384 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# This file is part of the COVID-surge application.
+# https://github/dpploy/covid-surge
+"""Pytest of Surge fitting on synthetic data (no network)."""
+
+import numpy as np
+import pandas as pd
+from asserts import assert_equal, assert_raises, assert_true
+
+from covid_surge import Surge
+from covid_surge.src.surge import (GROWTH_MODELS, NLLS_SOLVERS, FitCache,
+                                   FitResults, critical_times, fit_kernel,
+                                   grad_p_sigmoid_func,
+                                   sigmoid_param_covariance,
+                                   sigmoid_residual_jacobian)
+
+def fit_summary(fit_data):
+    """Names and parameter vectors of `multi_fit_data` results."""
+    names = [data[0] for (key, data) in fit_data]
+    return (names, np.array([data[3] for (key, data) in fit_data]))
+
+def test_batch_fit(us_deaths_csv):
+    """Batched and one-by-one fits agree."""
+    for sub_locale in (None, 'New York'):
+        surge = Surge(locale='US', sub_locale=sub_locale,
+                      data_source=us_deaths_csv)
+        surge.min_n_cases_abs = 50
+
+        (names, params) = fit_summary(surge.multi_fit_data(batch=False))
+        (b_names, b_params) = fit_summary(surge.multi_fit_data(batch=True))
+
+        assert_true(len(names) > 0)
+        assert_equal(b_names, names)
+        assert_true(np.allclose(b_params, params, rtol=1e-8))
+
+def test_combined_cases(us_deaths_csv):
+    """Combined cases over date ranges; names not in the data."""
+    us_surge = Surge(locale='US', data_source=us_deaths_csv)
+    ny_surge = Surge(locale='US', sub_locale='New York',
+                     dataset=us_surge.dataset)
+
+    for end_date in (None, us_surge.dates[100], us_surge.dates[90], None):
+        us_surge.end_date = end_date
+        ny_surge.end_date = end_date
+        assert_true(np.array_equal(ny_surge.fit_data(),
+                                   us_surge.fit_data('New York')))
+
+    with assert_raises(AssertionError):
+        us_surge.fit_data('Atlantis')
+
+def test_short_series(us_deaths_csv):
+    """Series too short for the parameter covariance are not fitted."""
+    dtf = pd.read_csv(us_deaths_csv)
+    kings = dtf.index[dtf['Admin2'] == 'Kings'][0]
+    dtf.iloc[kings, 12:] = 0
+    dtf.iloc[kings, -3:] = [100, 200, 300]
+    dtf.to_csv(us_deaths_csv, index=False)
+
+    surge = Surge(locale='US', sub_locale='New York',
+                  data_source=us_deaths_csv)
+
+    for solver in NLLS_SOLVERS:
+        (names, _) = fit_summary(surge.multi_fit_data(solver=solver))
+        assert_equal(sorted(names), ['Albany', 'Queens', 'Westchester'])
+
+    backtest = surge.backtest(start=surge.dates[-1])
+    assert_equal(backtest['k'][0, surge.names.index('Kings')], 0)
+    assert_true('Kings' not in surge.compare_models())
+
+    with assert_raises(AssertionError):
+        surge.fit_data('Kings')
+    with assert_raises(AssertionError):
+        surge.bootstrap_intervals('Kings', n_replicates=10)
+
+def test_sigmoid_kernel():
+    """Fused kernel against the sigmoid function and its gradient."""
+    sigmoid_func = GROWTH_MODELS['logistic'].func
+    kernel = fit_kernel(sigmoid_func, grad_p_sigmoid_func)
+
+    times = np.arange(60, dtype=np.float64)
+    param_mtrx = np.array([[1.0, 500.0, -0.12], [0.8, 40.0, -0.2]])
+    cases = np.array([sigmoid_func(times, p) for p in param_mtrx])
+
+    for (y_vec, param_vec) in [(cases[0], param_mtrx[0]),
+                               (cases, param_mtrx.T[:, :, np.newaxis])]:
+        r_ref = np.empty(y_vec.shape)
+        j_ref = np.empty(y_vec.shape + (3,))
+        kernel(times, y_vec + 0.01, param_vec, r_ref, j_ref)
+
+        r_vec = np.empty(y_vec.shape)
+        j_mtrx = np.empty(y_vec.shape + (3,))
+        sigmoid_residual_jacobian(times, y_vec + 0.01, param_vec, r_vec,
+                                  j_mtrx)
+
+        assert_true(np.allclose(r_vec, r_ref, rtol=1e-12))
+        assert_true(np.allclose(j_mtrx, j_ref, rtol=1e-12, atol=1e-300))
+
+def test_lm_solver(us_deaths_csv):
+    """Levenberg-Marquardt and Newton fits agree on well-posed data."""
+    surge = Surge(locale='US', data_source=us_deaths_csv)
+    surge.min_n_cases_abs = 50
+
+    (names, params) = fit_summary(surge.multi_fit_data())
+    for batch in (True, False):
+        (lm_names, lm_params) = fit_summary(
+            surge.multi_fit_data(batch=batch, solver='lm'))
+        assert_equal(lm_names, names)
+        assert_true(np.allclose(lm_params, params, rtol=1e-3))
+
+    assert_true(np.allclose(surge.fit_data('Wyoming', solver='lm'),
+                            surge.fit_data('Wyoming'), rtol=1e-3))
+
+def test_varpro_solver(us_deaths_csv):
+    """Variable projection and Newton fits agree on well-posed data."""
+    surge = Surge(locale='US', sub_locale='New York',
+                  data_source=us_deaths_csv)
+
+    (names, params) = fit_summary(surge.multi_fit_data())
+    for batch in (True, False):
+        (vp_names, vp_params) = fit_summary(
+            surge.multi_fit_data(batch=batch, solver='varpro'))
+        assert_equal(vp_names, names)
+        assert_true(np.allclose(vp_params, params, rtol=1e-3))
+
+    assert_true(np.allclose(surge.fit_data(solver='varpro'),
+                            surge.fit_data(), rtol=1e-3))
+
+def test_parallel_fit(us_deaths_csv):
+    """Fits over worker processes equal the serial fits."""
+    surge = Surge(locale='US', sub_locale='New York',
+                  data_source=us_deaths_csv)
+
+    fit_data = surge.multi_fit_data()
+    pool_fit_data = surge.multi_fit_data(n_jobs=2)
+
+    assert_equal([data[0] for (key, data) in pool_fit_data],
+                 [data[0] for (key, data) in fit_data])
+    for ((key, data), (pool_key, pool_data)) in zip(fit_data, pool_fit_data):
+        assert_equal(pool_key, key)
+        assert_true(np.array_equal(pool_data[3], data[3]))
+
+def test_fit_cache(us_deaths_csv, tmp_path):
+    """Cached fits of unchanged data; warm started fits of one more day."""
+    surge = Surge(locale='US', data_source=us_deaths_csv)
+    surge.min_n_cases_abs = 50
+    fit_cache = FitCache(str(tmp_path/'fit_cache.json'))
+
+    surge.end_date = surge.dates[-2]
+    surge.multi_fit_data(fit_cache=fit_cache)
+    surge.end_date = None
+    (names, params) = fit_summary(surge.multi_fit_data())
+
+    warm_fit_data = surge.multi_fit_data(fit_cache=fit_cache)
+    (warm_names, warm_params) = fit_summary(warm_fit_data)
+    assert_true(fit_cache.stats['warm'] > 0)
+    assert_equal(warm_names, names)
+    assert_true(np.allclose(warm_params, params, rtol=1e-3))
+
+    # hits reuse the stored covariances
+    fit_cache = FitCache(str(tmp_path/'fit_cache.json'))
+    assert_true(all('param_cov' in entry for entry in
+                    fit_cache.entries.values()))
+    hit_fit_data = surge.multi_fit_data(fit_cache=fit_cache)
+    (hit_names, hit_params) = fit_summary(hit_fit_data)
+    assert_equal(fit_cache.stats['miss'], 0)
+    assert_equal(hit_names, warm_names)
+    assert_true(np.array_equal(hit_params, warm_params))
+    for (hit_extras, warm_extras) in zip(hit_fit_data.extras,
+                                         warm_fit_data.extras):
+        assert_true(np.allclose(hit_extras['param_cov'],
+                                warm_extras['param_cov'], rtol=1e-12))
+        assert_equal(hit_extras['forecast'], warm_extras['forecast'])
+
+def test_backtest(us_deaths_csv):
+    """Backtest fits of the last end date against `multi_fit_data`."""
+    surge = Surge(locale='US', data_source=us_deaths_csv)
+    surge.min_n_cases_abs = 50
+
+    backtest = surge.backtest(start=surge.dates[-40], step=3, n_forecast=30)
+    assert_equal(backtest['end_dates'][-1], surge.dates[-1])
+    assert_equal(backtest['tcc'].shape, (14, len(surge.names)))
+    forecast = surge.backtest(start=surge.dates[-1])['forecast'][-1]
+
+    for (key, data) in surge.multi_fit_data():
+        name_id = surge.names.index(data[0])
+        first_id = np.searchsorted(surge.dates, data[1][0])
+        assert_true(np.isclose(backtest['tcc'][-1, name_id],
+                               first_id + data[4], rtol=1e-3))
+        assert_true(np.isclose(backtest['dtc'][-1, name_id], data[5],
+                               rtol=1e-3))
+        # both look 60 days past the last date
+        assert_true(np.isclose(forecast[name_id], data[6]['forecast'],
+                               rtol=1e-4, atol=1))
+
+    forecast_ids = np.searchsorted(surge.dates, backtest['end_dates']) + 30
+    past = forecast_ids >= surge.dates.size
+    errors = backtest['forecast'][~past] - surge.cases[forecast_ids[~past]]
+    assert_true(np.all(np.isnan(backtest['forecast_error'][past])))
+    assert_true(np.allclose(backtest['forecast_error'][~past], errors,
+                            equal_nan=True))
+
+def test_bootstrap(us_deaths_csv):
+    """Bootstrap intervals and standard errors of the critical times."""
+    surge = Surge(locale='US', sub_locale='New York',
+                  data_source=us_deaths_csv)
+
+    fit_data = surge.multi_fit_data()
+    boot_fit_data = surge.multi_fit_data(bootstrap=100)
+    assert_true(all('n_bootstrap' not in data[6] for (key, data) in fit_data))
+
+    assert_equal(len(boot_fit_data), len(fit_data))
+    for ((key, data), (boot_key, boot_data)) in zip(fit_data, boot_fit_data):
+        assert_true(np.array_equal(boot_data[3], data[3]))
+        extras = boot_data[6]
+        assert_true(extras['n_bootstrap'] > 90)
+        assert_true(extras['tcc_ci'][0] <= data[4] <= extras['tcc_ci'][1])
+        assert_true(extras['surge_period_ci'][0] <= 2*data[5] <=
+                    extras['surge_period_ci'][1])
+
+        # delta method standard errors of the same size as the intervals
+        tcc_se = np.diff(extras['tcc_ci'])[0]/3.92
+        assert_true(0.5 < extras['tcc_se']/tcc_se < 2)
+        forecast_se = np.diff(extras['forecast_ci'])[0]/3.92
+        assert_true(0.5 < extras['forecast_se']/forecast_se < 2)
+
+    intervals = surge.bootstrap_intervals(n_replicates=100)
+    assert_true(intervals['tcc_ci'][0] < intervals['tcc_ci'][1])
+    assert_true(intervals['forecast_ci'][0] < intervals['forecast_ci'][1])
+
+def test_param_covariances(us_deaths_csv):
+    """Batched covariances against the one-by-one evaluation."""
+    surge = Surge(locale='US', data_source=us_deaths_csv)
+    surge.min_n_cases_abs = 50
+
+    for (solver, batch) in [('newton', True), ('newton', False),
+                            ('lm', True)]:
+        fit_data = surge.multi_fit_data(solver=solver, batch=batch)
+        for i in range(len(fit_data)):
+            (name, dates, cases, param_vec) = fit_data.record(i)[:4]
+            scaling = cases.max()
+            scaled_vec = np.array(param_vec)
+            scaled_vec[0] /= scaling
+            (param_cov, sigma2) = sigmoid_param_covariance(
+                np.arange(cases.size, dtype=np.float64), cases/scaling,
+                scaled_vec)
+            scaling_mtrx = np.outer([scaling, 1, 1], [scaling, 1, 1])
+            # Newton's J^T J is of its last iterate
+            assert_true(np.allclose(fit_data.extras[i]['param_cov'],
+                                    param_cov*scaling_mtrx, rtol=1e-3))
+
+def test_growth_models(us_deaths_csv):
+    """Fits of each growth model; ranking of the models by AIC."""
+    surge = Surge(locale='US', data_source=us_deaths_csv)
+    surge.min_n_cases_abs = 50
+
+    ranking = surge.compare_models()
+    assert_true(len(ranking) > 0)
+
+    for model in GROWTH_MODELS:
+        surge.model = model
+        (names, params) = fit_summary(surge.multi_fit_data())
+        assert_equal(params.shape[1], GROWTH_MODELS[model].n_params)
+        for (name, param_vec) in zip(names, params):
+            fits = {entry[1]: entry[2] for entry in ranking[name]}
+            assert_true(np.allclose(fits[model], param_vec, rtol=1e-8))
+
+        (vp_names, vp_params) = fit_summary(
+            surge.multi_fit_data(solver='varpro'))
+        assert_equal(vp_names, names)
+        assert_true(np.allclose(vp_params, params, rtol=1e-3))
+
+    # the logistic data are closer to the logistic (and the nesting
+    # Richards) model than to the Gompertz model
+    for entries in ranking.values():
+        aic = {model: aic for (aic, model, _, _) in entries}
+        assert_true(aic['logistic'] < aic['gompertz'])
+        assert_true(aic['richards'] <= aic['logistic'] + 2)
+
+def test_waves(us_waves_csv, us_deaths_csv):
+    """Waves detected and fitted by a sum of sigmoids."""
+    surge = Surge(locale='US', data_source=us_waves_csv)
+    surge.min_n_cases_abs = 50
+
+    waves = surge.multi_fit_waves()
+    assert_equal(sorted(waves), sorted(surge.names))
+    for (name, fit) in waves.items():
+        assert_equal(fit['tcc'].size, 2)
+        assert_true(fit['rr2'] > 0.99)
+        # days since the first date of the file
+        tcc = np.searchsorted(surge.dates, fit['dates'][0]) + fit['tcc']
+        assert_true(np.all(np.abs(tcc - [65, 185]) < 15))
+        assert_true(fit['start_dates'][1] - surge.dates[0] <
+                    np.timedelta64(int(tcc[1]), 'D'))
+
+    # one community at a time; detection by column
+    fit = surge.fit_waves('Wyoming', solver='lm')
+    assert_true(np.array_equal(fit['start_dates'],
+                               waves['Wyoming']['start_dates']))
+    assert_true(np.allclose(fit['param_vec'], waves['Wyoming']['param_vec'],
+                            rtol=1e-3))
+
+    # one wave: the logistic fit
+    surge = Surge(locale='US', data_source=us_deaths_csv)
+    surge.min_n_cases_abs = 50
+    waves = surge.multi_fit_waves()
+    for (key, data) in surge.multi_fit_data():
+        fit = waves[data[0]]
+        assert_equal(fit['tcc'].size, 1)
+        assert_true(np.isclose(fit['param_vec'][0], data[3][0], rtol=1e-3))
+        assert_true(np.isclose(fit['tcc'][0], data[4], rtol=1e-3))
+        assert_true(np.isclose(fit['dtc'][0], data[5], rtol=1e-3))
+
+def test_fit_results(us_deaths_csv):
+    """Lookup, sorting, filtering and export of the fit results."""
+    surge = Surge(locale='US', sub_locale='New York',
+                  data_source=us_deaths_csv)
+
+    fit_data = surge.multi_fit_data()
+    assert_equal(len(fit_data), 4)
+    assert_true(np.all(np.diff(fit_data.surge_period) >= 0))
+    for (key, data) in fit_data:
+        assert_true(data[0] in fit_data)
+        record = fit_data[data[0]]
+        assert_equal(key, 2*record[5])
+        assert_true(np.array_equal(record[3], data[3]))
+        # the data sliced from the shared matrix, as fitted
+        name_id = surge.names.index(data[0])
+        assert_true(np.array_equal(
+            data[2], surge.cases[-data[1].size:, name_id]))
+
+    by_tcc = fit_data.sort('tcc', reverse=True)
+    assert_true(np.all(np.diff(by_tcc.tcc) <= 0))
+    fast = fit_data[fit_data.surge_period < np.median(fit_data.surge_period)]
+    assert_equal(list(fast.names), list(fit_data.names[:2]))
+    assert_equal(fast[fast.names[1]][0], fit_data.names[1])
+
+    dtf = fit_data.to_dataframe()
+    assert_equal(list(dtf.index), list(fit_data.names))
+    assert_true(np.array_equal(dtf[['a_0', 'a_1', 'a_2']].values,
+                               fit_data.param_mtrx))
+    assert_true(np.array_equal(dtf['surge_period'], fit_data.surge_period))
+
+    # fits rejected before the end of the surge
+    surge.end_date = surge.dates[75]
+    accepted = surge.multi_fit_data()
+    fit_data = surge.multi_fit_data(rejected=True)
+    assert_equal(len(fit_data), 4)
+    assert_true(np.any(fit_data.status != FitResults.OK))
+    ok = fit_data[fit_data.status == FitResults.OK]
+    assert_equal(list(ok.names), list(accepted.names))
+    assert_true(np.array_equal(ok.param_mtrx, accepted.param_mtrx))
+
+def test_critical_times(us_deaths_csv):
+    """Critical times of all fits in one pass against one fit at a time."""
+    surge = Surge(locale='US', data_source=us_deaths_csv)
+    surge.min_n_cases_abs = 50
+    surge.debug = True
+
+    for model in GROWTH_MODELS:
+        surge.model = model
+        fit_data = surge.multi_fit_data()
+        times = critical_times(fit_data.param_mtrx, model,
+                               fit_data.dates[fit_data.offsets],
+                               gradients=True, debug=True)
+        assert_true(np.array_equal(times['tcc'], fit_data.tcc))
+        assert_true(np.array_equal(times['dtc'], fit_data.dtc))
+
+        for (i, (key, data)) in enumerate(fit_data):
+            (tcc, t_max, t_min) = GROWTH_MODELS[model].critical_times(data[3])
+            assert_true(np.isclose(times['t_max_accel'][i], t_max))
+            assert_true(np.isclose(times['t_min_accel'][i], t_min))
+            (rate, accel) = GROWTH_MODELS[model].derivatives(
+                np.array([tcc, t_max]), data[3])
+            assert_true(np.isclose(times['peak_rate'][i], rate[0]))
+            assert_true(np.isclose(times['max_accel'][i], accel[1]))
+            assert_equal(times['tcc_date'][i], data[1][int(np.ceil(tcc))])
+
+            assert_equal(surge.report_critical_times(data[3], data[0]),
+                         (data[4], data[5]))
+            (tcc_se, dtc_se) = surge.report_critical_times_se(
+                data[3], data[6]['param_cov'])
+            assert_equal(tcc_se, data[6]['tcc_se'])
+            assert_equal(dtc_se, data[6]['dtc_se'])